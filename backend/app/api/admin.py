@@ -0,0 +1,98 @@
+"""
+Admin API endpoints for inspecting in-process caches and resources.
+"""
+
+import logging
+from typing import Any, Dict, List
+
+from fastapi import APIRouter
+
+from ..models.playback import PlaybackSessionListResponse
+from ..services.dataset_registry import dataset_registry
+from ..services.playback_scheduler import playback_scheduler
+from ..services.playback_service import playback_service
+from ..utils.executor import upstream_executor
+from ..utils.stock_fetcher import current_bar_cache, stock_data_cache
+from ..utils.symbol_resolver import symbol_resolver
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api/admin", tags=["admin"])
+
+
+@router.get("/cache")
+async def get_cache_stats() -> Dict[str, Any]:
+    """
+    Get stock data cache statistics.
+
+    Returns:
+        Hit, miss and coalesced counts plus memory usage in bytes, with the
+        hot current-bar tier under ``current_bar`` and ticker resolutions
+        under ``symbols``
+    """
+    return {
+        **stock_data_cache.stats(),
+        "current_bar": current_bar_cache.stats(),
+        "symbols": symbol_resolver.stats(),
+    }
+
+
+@router.get("/executor")
+async def get_executor_stats() -> Dict[str, Any]:
+    """
+    Get upstream thread pool statistics.
+
+    Returns:
+        Active workers, queue depth and timeout/rejection counters
+    """
+    return upstream_executor.stats()
+
+
+@router.get("/scheduler")
+async def get_scheduler_stats() -> Dict[str, Any]:
+    """
+    Get streaming playback scheduler statistics.
+
+    Returns:
+        Active streams, tick lag, late and deferred (back-pressured) frame counts
+    """
+    return playback_scheduler.stats()
+
+
+@router.get("/sessions", response_model=PlaybackSessionListResponse)
+async def list_playback_sessions() -> PlaybackSessionListResponse:
+    """
+    List live playback sessions with last-access time and memory footprint.
+
+    Returns:
+        PlaybackSessionListResponse, least recently used first
+    """
+    sessions = playback_service.list_sessions()
+    return PlaybackSessionListResponse(
+        sessions=sessions,
+        total_count=len(sessions),
+        total_bytes=playback_service.get_total_bytes(),
+        dataset_count=len(dataset_registry.list_datasets()),
+        max_bytes=playback_service.max_bytes,
+        evicted_count=playback_service.evicted_count,
+    )
+
+
+@router.get("/datasets")
+async def list_datasets() -> List[Dict[str, Any]]:
+    """
+    List shared bar datasets with their reference counts.
+
+    Returns:
+        One entry per distinct (symbol, range) dataset
+    """
+    return [
+        {
+            "key": str(dataset.key),
+            "bars": len(dataset.bars),
+            "refcount": dataset.refcount,
+            "bytes": dataset.nbytes,
+            "created_at": dataset.created_at,
+        }
+        for dataset in dataset_registry.list_datasets()
+    ]
@@ -2,13 +2,41 @@
 Data API endpoints for fetching stock historical data.
 """
 
+import asyncio
+import json
 import logging
-from typing import Optional
+from typing import AsyncIterator, Optional
 
-from fastapi import APIRouter, HTTPException, Query
+import pandas as pd
+from fastapi import APIRouter, Header, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
 
-from ..models.playback import CandleData, StockDataResponse
-from ..utils.stock_fetcher import fetch_stock_data, fetch_stock_data_by_period
+from ..config import settings
+from ..helpers.yfinance import EmptyDataError
+from ..models.playback import HistoricalBatchRequest, StockDataResponse
+from ..services.resample import (
+    TIMEFRAME_QUERY_DESCRIPTION,
+    ResampleError,
+    fetch_resampled_data,
+    parse_rule,
+)
+from ..utils.bar_store import period_to_date_range
+from ..utils.executor import UpstreamSaturatedError, UpstreamTimeoutError, upstream_executor
+from ..utils.stock_fetcher import (
+    complete_batch,
+    download_batch,
+    fetch_stock_data,
+    fetch_stock_data_by_period,
+    plan_batch,
+    read_stored,
+)
+from ..utils.wire_formats import (
+    JSON,
+    WireFormatUnavailableError,
+    encode_frame,
+    negotiate_format,
+    to_records,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -21,51 +49,188 @@ async def get_historical_data(
     start_date: Optional[str] = Query(None, description="Start date (YYYY-MM-DD)"),
     end_date: Optional[str] = Query(None, description="End date (YYYY-MM-DD)"),
     period: Optional[str] = Query("3mo", description="Period (e.g., '1mo', '3mo', '1y')"),
+    timeframe: Optional[str] = Query(None, description=TIMEFRAME_QUERY_DESCRIPTION),
+    format: Optional[str] = Query(
+        None, description="Wire format: json (default), columnar, msgpack or arrow"
+    ),
+    accept: Optional[str] = Header(None),
 ) -> StockDataResponse:
     """
     Get historical stock data for the given symbol.
 
+    Besides the default row JSON, the data can be returned column-oriented
+    (``format=columnar``), as msgpack or as an Arrow IPC stream. Binary formats
+    can also be selected with the Accept header. ``timeframe`` aggregates
+    the cached daily bars locally instead of requesting another interval.
+
     Args:
         symbol: Stock ticker symbol (e.g., 'AAPL', '2330.TW')
         start_date: Start date (YYYY-MM-DD), optional if period is provided
         end_date: End date (YYYY-MM-DD), optional if period is provided
         period: Period string (default: '3mo')
+        timeframe: Candle timeframe, e.g. W, M, Q or 5D
+        format: Wire format, takes precedence over the Accept header
+        accept: Accept header
 
     Returns:
-        StockDataResponse with historical data
+        StockDataResponse with historical data, or the encoded body for other formats
     """
     try:
-        logger.info(f"[get_historical_data] symbol={symbol}, period={period}, start_date={start_date}, end_date={end_date}")
-        
-        # Fetch data
-        if start_date and end_date:
-            df = fetch_stock_data(symbol, start_date, end_date)
+        wire_format = negotiate_format(format, accept)
+    except WireFormatUnavailableError as e:
+        raise HTTPException(status_code=406, detail=str(e))
+
+    try:
+        rule = parse_rule(timeframe) if timeframe else "D"
+    except ResampleError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    try:
+        logger.info(
+            f"[get_historical_data] symbol={symbol}, period={period}, start_date={start_date}, end_date={end_date}"
+        )
+
+        # Fetch data off the event loop
+        if rule != "D":
+            df = await upstream_executor.run(
+                fetch_resampled_data, symbol, rule, start_date, end_date, period
+            )
+        elif start_date and end_date:
+            df = await upstream_executor.run(fetch_stock_data, symbol, start_date, end_date)
         else:
-            df = fetch_stock_data_by_period(symbol, period or "3mo")
-        
+            df = await upstream_executor.run(fetch_stock_data_by_period, symbol, period or "3mo")
+
         logger.info(f"[get_historical_data] Fetched {len(df) if df is not None else 0} rows")
 
         if df is None or df.empty:
             raise HTTPException(status_code=404, detail=f"No data found for symbol {symbol}")
 
-        # Convert to response model
-        candles = []
-        for timestamp, row in df.iterrows():
-            candles.append(
-                CandleData(
-                    timestamp=timestamp.to_pydatetime(),
-                    open=float(row["Open"]),
-                    high=float(row["High"]),
-                    low=float(row["Low"]),
-                    close=float(row["Close"]),
-                    volume=int(row["Volume"]),
-                )
-            )
+        if wire_format != JSON:
+            body, media_type = encode_frame(df, symbol, wire_format)
+            return Response(content=body, media_type=media_type)
 
+        candles = to_records(df)
         return StockDataResponse(symbol=symbol, data=candles, total_count=len(candles))
 
     except HTTPException:
         raise
+    except WireFormatUnavailableError as e:
+        raise HTTPException(status_code=406, detail=str(e))
+    except UpstreamTimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    except UpstreamSaturatedError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         logger.error(f"Error fetching historical data for {symbol}: {e}")
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+
+def _batch_line(symbol: str, df: Optional[pd.DataFrame], error: Optional[str] = None) -> str:
+    """Encode one symbol of a batch as an NDJSON line."""
+    if df is None or df.empty:
+        return json.dumps(
+            {"symbol": symbol, "error": error or f"No data found for symbol {symbol}"}
+        )
+    candles = to_records(df)
+    return StockDataResponse(
+        symbol=symbol, data=candles, total_count=len(candles)
+    ).model_dump_json()
+
+
+@router.post("/historical/batch")
+async def get_historical_batch(request: HistoricalBatchRequest) -> StreamingResponse:
+    """
+    Get historical daily data for many symbols as a stream of NDJSON lines.
+
+    Symbols whose range is already in the local bar store are read locally
+    and streamed first, while everything missing is fetched with a single
+    multi-ticker download; each of those symbols is stored and streamed as
+    soon as its share is written. Every line is a StockDataResponse, or
+    ``{"symbol": ..., "error": ...}`` for a symbol without data.
+
+    Args:
+        request: Symbols and a date range or period
+
+    Returns:
+        Streaming response with one JSON object per symbol
+    """
+    if len(set(request.symbols)) > settings.data_batch_max_symbols:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Batch exceeds {settings.data_batch_max_symbols} symbols",
+        )
+
+    if request.start_date and request.end_date:
+        start, end = pd.to_datetime(request.start_date), pd.to_datetime(request.end_date)
+    else:
+        date_range = period_to_date_range(request.period or "3mo")
+        if date_range is None:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Period {request.period!r} is not a date range; pass start_date and end_date",
+            )
+        start, end = (pd.Timestamp(day) for day in date_range)
+    start_date, end_date = start.strftime("%Y-%m-%d"), end.strftime("%Y-%m-%d")
+
+    try:
+        hits, misses = await upstream_executor.run(plan_batch, request.symbols, start, end)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except UpstreamTimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    except UpstreamSaturatedError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+    logger.info(
+        f"[get_historical_batch] {len(hits)} stored, {len(misses)} to download, "
+        f"{start_date}~{end_date}"
+    )
+
+    async def stream() -> AsyncIterator[str]:
+        # The download runs while the stored symbols are streamed
+        download = (
+            asyncio.ensure_future(
+                upstream_executor.run(
+                    download_batch, misses, timeout=settings.data_batch_timeout_seconds
+                )
+            )
+            if misses
+            else None
+        )
+        try:
+            for symbol in hits:
+                # Stored symbols never go upstream; a range reaching today is a miss
+                try:
+                    df = await upstream_executor.run(read_stored, symbol, start, end)
+                    yield _batch_line(symbol, df) + "\n"
+                except EmptyDataError:
+                    yield _batch_line(symbol, None) + "\n"
+                except (UpstreamTimeoutError, UpstreamSaturatedError) as e:
+                    yield _batch_line(symbol, None, str(e)) + "\n"
+
+            if download is None:
+                return
+            try:
+                frames = await download
+            except Exception as e:
+                logger.error(f"Batch download of {len(misses)} symbols failed: {e}")
+                for symbol in misses:
+                    yield _batch_line(symbol, None, f"Download failed: {e}") + "\n"
+                return
+
+            for symbol, ranges in misses.items():
+                try:
+                    df = await upstream_executor.run(
+                        complete_batch, symbol, ranges, frames.get(symbol), start, end
+                    )
+                    yield _batch_line(symbol, df) + "\n"
+                except EmptyDataError:
+                    yield _batch_line(symbol, None) + "\n"
+                except Exception as e:
+                    logger.error(f"Error storing batch data for {symbol}: {e}")
+                    yield _batch_line(symbol, None, str(e)) + "\n"
+        finally:
+            if download is not None:
+                download.cancel()
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
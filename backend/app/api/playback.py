@@ -3,38 +3,139 @@ Playback API endpoints for controlling data playback sessions.
 """
 
 import logging
+from functools import partial
+from typing import Any, Callable, List, Optional, TypeVar
 
 from fastapi import APIRouter, HTTPException, Path, Query
 
+from ..config import settings
 from ..models.playback import (
     PlaybackCreateRequest,
+    PlaybackForkResponse,
+    PlaybackIndicatorResponse,
+    PlaybackIntrabarResponse,
     PlaybackSeekRequest,
     PlaybackStatusResponse,
+    PlaybackWindowResponse,
 )
-from ..services.playback_service import playback_service
+from ..services.indicators import IndicatorError, IndicatorSpec, parse_indicators
+from ..services.intraday import INTRADAY_LOOKBACK_DAYS
+from ..services.playback_service import PlaybackSession, playback_service
+from ..services.resample import TIMEFRAME_QUERY_DESCRIPTION, ResampleError, parse_rule
+from ..services.trading_service import trading_service
+from ..utils.cursor_token import is_cursor_token, stateless_cursors_available
+from ..utils.executor import UpstreamSaturatedError, UpstreamTimeoutError, upstream_executor
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/playback", tags=["playback"])
 
+T = TypeVar("T")
+
+INDICATOR_QUERY_DESCRIPTION = (
+    "Indicator as name[:params], repeatable: sma:20, ema:50, rsi:14, macd:12,26,9, bbands:20,2"
+)
+
+
+def _parse_indicators(indicator: Optional[List[str]]) -> List[IndicatorSpec]:
+    """
+    Parse the repeated ``indicator`` query parameter.
+
+    Raises:
+        HTTPException: 400 if an indicator is unknown or malformed
+    """
+    try:
+        return parse_indicators(indicator)
+    except IndicatorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+async def _run(func: Callable[..., T], *args: Any) -> T:
+    """
+    Run a blocking call, such as a session store read or write, off the event loop.
+
+    Raises:
+        HTTPException: 503/504 if the upstream pool is saturated or slow
+    """
+    try:
+        return await upstream_executor.run(func, *args)
+    except UpstreamTimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e)) from e
+    except UpstreamSaturatedError as e:
+        raise HTTPException(status_code=503, detail=str(e)) from e
+
+
+async def _get_session(playback_id: str) -> PlaybackSession:
+    """
+    Look up a session off the event loop.
+
+    The lookup reads the session store and may reload bars for a session
+    created on another worker.
+
+    Raises:
+        HTTPException: 404 if not found, 503/504 if the upstream pool is saturated or slow
+    """
+    session = await _run(playback_service.get_session, playback_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Playback session not found or cursor invalid")
+    return session
+
 
 @router.post("/start", response_model=PlaybackStatusResponse)
 async def start_playback(request: PlaybackCreateRequest) -> PlaybackStatusResponse:
     """
     Start a new playback session.
 
+    With ``stateless`` the returned playback_id is a signed cursor token; every
+    response carries the token for the next request and nothing is kept on
+    the server. With ``symbols`` the session replays a basket: one cursor
+    advances every symbol and responses carry each symbol's bar in ``basket``.
+
     Args:
         request: Playback creation request with symbol and date range
 
     Returns:
         PlaybackStatusResponse with session info
     """
+    if (
+        request.symbols
+        and len(set(request.symbols) | {request.symbol}) > settings.playback_max_basket_size
+    ):
+        raise HTTPException(
+            status_code=400,
+            detail=f"Basket exceeds {settings.playback_max_basket_size} symbols",
+        )
+    if request.interval != "1d":
+        if request.interval not in INTRADAY_LOOKBACK_DAYS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unsupported interval {request.interval!r}, expected 1d or one of "
+                f"{', '.join(INTRADAY_LOOKBACK_DAYS)}",
+            )
+        if request.stateless or request.symbols:
+            raise HTTPException(
+                status_code=400,
+                detail="Intraday playback supports neither stateless cursors nor baskets",
+            )
+    if request.stateless and not stateless_cursors_available():
+        raise HTTPException(
+            status_code=503,
+            detail="Stateless playback needs CURSOR_TOKEN_SECRET when several workers run",
+        )
+
     try:
-        session = playback_service.create_session(
+        create = (
+            playback_service.create_cursor_session
+            if request.stateless
+            else partial(playback_service.create_session, interval=request.interval)
+        )
+        session = await upstream_executor.run(
+            create,
             symbol=request.symbol,
             start_date=request.start_date,
             end_date=request.end_date,
             period=request.period,
+            symbols=request.symbols,
         )
 
         if session is None:
@@ -51,11 +152,17 @@ async def start_playback(request: PlaybackCreateRequest) -> PlaybackStatusRespon
             has_more=session.has_more(),
             current_data=session.get_current(),
             price_range=session.get_price_range(),
+            stats=session.get_stats(),
+            basket=session.get_basket(),
             all_dates=session.get_all_dates(),  # Include all trading dates for news mapping
         )
 
     except HTTPException:
         raise
+    except UpstreamTimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    except UpstreamSaturatedError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         logger.error(f"Error starting playback: {e}")
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
@@ -64,19 +171,20 @@ async def start_playback(request: PlaybackCreateRequest) -> PlaybackStatusRespon
 @router.get("/{playback_id}/status", response_model=PlaybackStatusResponse)
 async def get_playback_status(
     playback_id: str = Path(..., description="Playback session ID"),
+    indicator: Optional[List[str]] = Query(None, description=INDICATOR_QUERY_DESCRIPTION),
 ) -> PlaybackStatusResponse:
     """
     Get current playback status.
 
     Args:
         playback_id: Unique playback session identifier
+        indicator: Indicators to evaluate at the current candle
 
     Returns:
         PlaybackStatusResponse with current status
     """
-    session = playback_service.get_session(playback_id)
-    if session is None:
-        raise HTTPException(status_code=404, detail="Playback session not found")
+    specs = _parse_indicators(indicator)
+    session = await _get_session(playback_id)
 
     return PlaybackStatusResponse(
         playback_id=session.playback_id,
@@ -86,6 +194,9 @@ async def get_playback_status(
         has_more=session.has_more(),
         current_data=session.get_current(),
         price_range=session.get_price_range(),
+        stats=session.get_stats(),
+        basket=session.get_basket(),
+        indicators=session.indicator_values(specs),
     )
 
 
@@ -93,6 +204,8 @@ async def get_playback_status(
 async def get_next_candle(
     playback_id: str = Path(..., description="Playback session ID"),
     count: int = Query(1, description="Number of candles to retrieve", ge=1, le=100),
+    return_all: bool = Query(False, description="Return every candle passed, not only the last"),
+    indicator: Optional[List[str]] = Query(None, description=INDICATOR_QUERY_DESCRIPTION),
 ) -> PlaybackStatusResponse:
     """
     Get next N candles and advance playback position.
@@ -100,18 +213,20 @@ async def get_next_candle(
     Args:
         playback_id: Unique playback session identifier
         count: Number of candles to retrieve (default: 1)
+        return_all: Include all N candles in ``candles``
+        indicator: Indicators to evaluate at the last candle returned
 
     Returns:
         PlaybackStatusResponse with next candle(s)
     """
-    session = playback_service.get_session(playback_id)
-    if session is None:
-        raise HTTPException(status_code=404, detail="Playback session not found")
+    specs = _parse_indicators(indicator)
+    session = await _get_session(playback_id)
 
     # Get next candles (this also advances the position)
     candles = session.next(count)
+    await _run(playback_service.save_session, session)
 
-    if not candles:
+    if len(candles) == 0:
         raise HTTPException(status_code=404, detail="No more data available")
 
     # Return the last candle as current_data
@@ -121,8 +236,71 @@ async def get_next_candle(
         current_index=session.current_index,
         total_count=session.get_total_count(),
         has_more=session.has_more(),
-        current_data=candles[-1] if candles else None,
+        current_data=candles.last(),
         price_range=session.get_price_range(),
+        candles=candles.to_records() if return_all else None,
+        stats=session.get_stats(session.current_index - 1),
+        basket=session.get_basket(session.current_index - 1),
+        indicators=session.indicator_values(specs, session.current_index - 1),
+    )
+
+
+@router.get("/{playback_id}/window", response_model=PlaybackWindowResponse)
+async def get_candle_window(
+    playback_id: str = Path(..., description="Playback session ID"),
+    from_index: int = Query(0, alias="from", description="First index (inclusive)", ge=0),
+    to_index: Optional[int] = Query(
+        None, alias="to", description="Last index (exclusive), defaults to the cursor", ge=0
+    ),
+    timeframe: Optional[str] = Query(None, description=TIMEFRAME_QUERY_DESCRIPTION),
+) -> PlaybackWindowResponse:
+    """
+    Get already revealed candles between two positions without advancing playback.
+
+    The range is clamped to the bars up to the current position, so the
+    window never exposes future candles. With ``timeframe`` the daily bars
+    in the range are returned as coarser candles aggregated locally; the
+    candle holding the cursor only includes bars revealed so far.
+
+    Args:
+        playback_id: Unique playback session identifier
+        from_index: First index (inclusive)
+        to_index: Last index (exclusive)
+        timeframe: Candle timeframe, e.g. W, M, Q or 5D
+
+    Returns:
+        PlaybackWindowResponse with the candles in the clamped range
+    """
+    session = await _get_session(playback_id)
+
+    if to_index is not None and to_index < from_index:
+        raise HTTPException(
+            status_code=400, detail=f"Invalid range: from={from_index} > to={to_index}"
+        )
+
+    # Intraday chunks behind the cursor may have been dropped and reload upstream
+    candles = await _run(session.window, from_index, to_index)
+    start = min(from_index, session.get_revealed_count())
+    stop = start + len(candles)
+
+    rule = None
+    if timeframe:
+        try:
+            rule = parse_rule(timeframe)
+            candles = session.resampled_window(rule, start, stop)
+        except ResampleError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    return PlaybackWindowResponse(
+        playback_id=session.playback_id,
+        symbol=session.symbol,
+        from_index=start,
+        to_index=stop,
+        current_index=session.current_index,
+        total_count=session.get_total_count(),
+        candles=candles.to_records(),
+        price_range=session.get_window_price_range(start, stop),
+        timeframe=rule,
     )
 
 
@@ -130,6 +308,7 @@ async def get_next_candle(
 async def seek_playback(
     playback_id: str = Path(..., description="Playback session ID"),
     request: PlaybackSeekRequest = ...,
+    indicator: Optional[List[str]] = Query(None, description=INDICATOR_QUERY_DESCRIPTION),
 ) -> PlaybackStatusResponse:
     """
     Seek to a specific position in the playback.
@@ -137,15 +316,24 @@ async def seek_playback(
     Args:
         playback_id: Unique playback session identifier
         request: Seek request with target index
+        indicator: Indicators to evaluate at the new position
 
     Returns:
         PlaybackStatusResponse at the new position
     """
-    session = playback_service.get_session(playback_id)
-    if session is None:
-        raise HTTPException(status_code=404, detail="Playback session not found")
-
-    success = session.seek(request.index)
+    specs = _parse_indicators(indicator)
+    session = await _get_session(playback_id)
+
+    def seek() -> bool:
+        # Seeking may learn chunk lengths up to the target and load the chunks around it
+        if not session.seek(request.index):
+            return False
+        session.ensure_ready()
+        return True
+
+    success = await _run(seek)
+    if success:
+        await _run(playback_service.save_session, session)
     if not success:
         raise HTTPException(
             status_code=400,
@@ -160,6 +348,147 @@ async def seek_playback(
         has_more=session.has_more(),
         current_data=session.get_current(),
         price_range=session.get_price_range(),
+        stats=session.get_stats(),
+        basket=session.get_basket(),
+        indicators=session.indicator_values(specs),
+    )
+
+
+@router.post("/{playback_id}/fork", response_model=PlaybackForkResponse)
+async def fork_playback(
+    playback_id: str = Path(..., description="Playback session ID"),
+) -> PlaybackForkResponse:
+    """
+    Branch a playback session at its current cursor, with its trading accounts.
+
+    The child shares the parent's bars and the accounts share their trade
+    history copy-on-write, so a fork costs the same for any data size.
+
+    Args:
+        playback_id: Parent playback session identifier
+
+    Returns:
+        PlaybackForkResponse with the child session and account IDs
+    """
+    if is_cursor_token(playback_id):
+        raise HTTPException(
+            status_code=400, detail="Stateless cursors are forked by reusing the token"
+        )
+
+    def fork() -> Optional[tuple]:
+        child = playback_service.fork_session(playback_id)
+        if child is None:
+            return None
+        return child, trading_service.fork_accounts_for_playback(playback_id, child.playback_id)
+
+    forked = await _run(fork)
+    if forked is None:
+        raise HTTPException(status_code=404, detail="Playback session not found")
+    child, accounts = forked
+
+    return PlaybackForkResponse(
+        playback_id=child.playback_id,
+        parent_id=playback_id,
+        symbol=child.symbol,
+        current_index=child.current_index,
+        total_count=child.get_total_count(),
+        current_data=child.get_current(),
+        accounts=accounts,
+    )
+
+
+@router.get("/{playback_id}/indicators", response_model=PlaybackIndicatorResponse)
+async def get_indicators(
+    playback_id: str = Path(..., description="Playback session ID"),
+    indicator: List[str] = Query(..., description=INDICATOR_QUERY_DESCRIPTION),
+    from_index: int = Query(0, alias="from", description="First index (inclusive)", ge=0),
+    to_index: Optional[int] = Query(
+        None, alias="to", description="Last index (exclusive), defaults to the cursor", ge=0
+    ),
+) -> PlaybackIndicatorResponse:
+    """
+    Get indicator series over already revealed candles without advancing playback.
+
+    Indicators are computed once over the whole shared dataset and sliced at
+    the cursor; every formula is causal, so no future bar affects a value.
+
+    Args:
+        playback_id: Unique playback session identifier
+        indicator: Indicators to return
+        from_index: First index (inclusive)
+        to_index: Last index (exclusive)
+
+    Returns:
+        PlaybackIndicatorResponse aligned with /window over the same range
+    """
+    specs = _parse_indicators(indicator)
+    session = await _get_session(playback_id)
+
+    if to_index is not None and to_index < from_index:
+        raise HTTPException(
+            status_code=400, detail=f"Invalid range: from={from_index} > to={to_index}"
+        )
+
+    revealed = session.get_revealed_count()
+    stop = revealed if to_index is None else min(to_index, revealed)
+    start = min(from_index, stop)
+
+    return PlaybackIndicatorResponse(
+        playback_id=session.playback_id,
+        symbol=session.symbol,
+        from_index=start,
+        to_index=stop,
+        current_index=session.current_index,
+        indicators=session.indicator_window(specs, start, stop),
+    )
+
+
+@router.get("/{playback_id}/intrabar", response_model=PlaybackIntrabarResponse)
+async def get_intrabar(
+    playback_id: str = Path(..., description="Playback session ID"),
+    index: Optional[int] = Query(
+        None, description="Candle index, defaults to the candle at the cursor", ge=0
+    ),
+    steps: Optional[int] = Query(None, description="Ticks in the path", ge=4, le=1000),
+) -> PlaybackIntrabarResponse:
+    """
+    Get the synthetic tick path of a revealed candle for sub-bar replay.
+
+    The path is seeded by the configured seed, the symbol and the index, so
+    it is identical on every request and is the one resting orders fill on.
+
+    Args:
+        playback_id: Unique playback session identifier
+        index: Candle index
+        steps: Number of ticks
+
+    Returns:
+        PlaybackIntrabarResponse with prices from open to close
+
+    Raises:
+        HTTPException: 400 if the candle is not revealed yet
+    """
+    session = await _get_session(playback_id)
+    index = session.get_revealed_count() - 1 if index is None else index
+
+    def tick_path() -> Optional[tuple]:
+        # The candle's intraday chunk may have been dropped and reload upstream
+        path = session.intrabar_path(index, steps)
+        if path is None:
+            return None
+        return path, session.window(index, index + 1).dates()[0]
+
+    found = await _run(tick_path)
+    if found is None:
+        raise HTTPException(status_code=400, detail=f"Candle {index} is not revealed yet")
+    path, date = found
+
+    return PlaybackIntrabarResponse(
+        playback_id=session.playback_id,
+        symbol=session.symbol,
+        index=index,
+        date=date,
+        ticks=path.tolist(),
     )
 
 
@@ -174,7 +503,7 @@ async def delete_playback(playback_id: str = Path(..., description="Playback ses
     Returns:
         Success message
     """
-    success = playback_service.delete_session(playback_id)
+    success = await _run(playback_service.delete_session, playback_id)
     if not success:
         raise HTTPException(status_code=404, detail="Playback session not found")
 
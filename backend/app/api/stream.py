@@ -0,0 +1,98 @@
+"""
+WebSocket endpoint streaming playback candles at a server-side pace.
+"""
+
+import json
+import logging
+
+from fastapi import APIRouter, Query, WebSocket, WebSocketDisconnect
+
+from ..services.playback_scheduler import playback_scheduler
+from ..services.playback_service import playback_service
+from ..services.playback_stream import PlaybackStream
+from ..utils.executor import UpstreamSaturatedError, UpstreamTimeoutError, upstream_executor
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/ws/playback", tags=["playback"])
+
+
+@router.websocket("/{playback_id}")
+async def stream_playback(
+    websocket: WebSocket,
+    playback_id: str,
+    speed: float = Query(1.0, gt=0, description="Bars per second"),
+    paused: bool = Query(False, description="Start paused"),
+) -> None:
+    """
+    Stream a playback session, one compact frame per bar.
+
+    Frames are JSON arrays ``[index, timestamp_ms, open, high, low, close, volume]``.
+    Control messages (JSON objects): pause, resume, seek {index}, speed {value}.
+    The cursor is shared with the REST endpoints of the same session and is
+    saved to the session store on every control message and on disconnect.
+    Pacing is done by the shared playback scheduler, not by a task per connection.
+
+    Args:
+        websocket: Client connection
+        playback_id: Playback session ID
+        speed: Initial bars per second
+        paused: Whether to wait for a resume message before streaming
+    """
+    session = await upstream_executor.run(playback_service.get_session, playback_id)
+    if session is None:
+        await websocket.close(code=4404, reason=f"Playback session {playback_id} not found")
+        return
+
+    await websocket.accept()
+    playback_service.stream_opened(session.playback_id)
+    stream = PlaybackStream(session, speed=speed)
+    stream.paused = paused
+    await websocket.send_json(stream.status())
+
+    async def update_schedule() -> None:
+        # Bars still loading count as more to come; the scheduler waits for them
+        if not stream.paused and (not session.is_ready() or session.has_more()):
+            playback_scheduler.schedule(stream, websocket.send_text)
+            return
+        playback_scheduler.cancel(stream)
+        if not session.has_more():
+            await websocket.send_json({**stream.status(), "type": "end"})
+
+    try:
+        await update_schedule()
+        while True:
+            raw = await websocket.receive_text()
+            try:
+                message = json.loads(raw)
+            except json.JSONDecodeError:
+                await websocket.send_json(PlaybackStream.error("Invalid JSON"))
+                continue
+            if not isinstance(message, dict):
+                await websocket.send_json(PlaybackStream.error("Expected a JSON object"))
+                continue
+
+            seeking = message.get("type") == "seek"
+            if seeking:
+                # A seek may load chunks up to the target, so it runs off the loop;
+                # the stream is unscheduled meanwhile so no frame moves the cursor
+                playback_scheduler.cancel(stream)
+                try:
+                    reply = await upstream_executor.run(stream.handle_message, message)
+                except (UpstreamTimeoutError, UpstreamSaturatedError) as e:
+                    reply = PlaybackStream.error(str(e))
+            else:
+                reply = stream.handle_message(message)
+            await websocket.send_json(reply)
+            if reply["type"] != "error":
+                # Publish the streamed cursor so REST calls on other workers see it
+                await upstream_executor.run(playback_service.save_session, session)
+            if reply["type"] != "error" or seeking:
+                await update_schedule()
+
+    except WebSocketDisconnect:
+        logger.info(f"Playback stream {playback_id} disconnected")
+    finally:
+        playback_scheduler.cancel(stream)
+        playback_service.stream_closed(session.playback_id)
+        await upstream_executor.run(playback_service.save_session, session)
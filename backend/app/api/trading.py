@@ -3,11 +3,13 @@ Trading API endpoints for buy/sell operations and account management.
 """
 
 import logging
-from typing import Any, Dict
+from typing import Any, Callable, Dict, TypeVar
 
 from fastapi import APIRouter, HTTPException
 
 from app.models.trading import (
+    OrderPlaceRequest,
+    OrderPlaceResponse,
     TradeExecuteRequest,
     TradeExecuteResponse,
     TradeHistoryResponse,
@@ -16,11 +18,32 @@ from app.models.trading import (
     TradingAccountStatus,
 )
 from app.services.trading_service import trading_service
+from app.utils.executor import UpstreamSaturatedError, UpstreamTimeoutError, upstream_executor
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/trading", tags=["trading"])
 
+T = TypeVar("T")
+
+
+async def _run(func: Callable[..., T], *args: Any) -> T:
+    """
+    Run a trading service call off the event loop.
+
+    Account reads and writes go to the session store, and settling resting
+    orders looks up the playback session, which may reload its bars.
+
+    Raises:
+        HTTPException: 503/504 if the upstream pool is saturated or slow
+    """
+    try:
+        return await upstream_executor.run(func, *args)
+    except UpstreamTimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e)) from e
+    except UpstreamSaturatedError as e:
+        raise HTTPException(status_code=503, detail=str(e)) from e
+
 
 @router.post("/account/create", response_model=TradingAccountCreateResponse)
 async def create_trading_account(
@@ -43,16 +66,17 @@ async def create_trading_account(
             f"Creating trading account: playback_id={request.playback_id}, symbol={request.symbol}, initial_cash={request.initial_cash}"
         )
 
-        account_id = trading_service.create_account(
-            playback_id=request.playback_id,
-            symbol=request.symbol,
-            initial_cash=request.initial_cash,
+        account_id = await _run(
+            trading_service.create_account,
+            request.playback_id,
+            request.symbol,
+            request.initial_cash,
         )
 
         logger.info(f"Account created: {account_id}")
 
         # Get account to return full status
-        account = trading_service.get_account(account_id)
+        account = await _run(trading_service.get_account, account_id)
         if not account:
             logger.error(f"Failed to retrieve created account {account_id}")
             raise HTTPException(status_code=500, detail="Failed to retrieve created account")
@@ -67,6 +91,8 @@ async def create_trading_account(
             initial_cash=request.initial_cash,
             status=status,
         )
+    except HTTPException:
+        raise
     except ValueError as e:
         logger.error(f"ValueError in create_trading_account: {e}")
         raise HTTPException(status_code=400, detail=str(e))
@@ -90,7 +116,7 @@ async def get_account_status(account_id: str, current_price: float = None) -> Tr
     Raises:
         HTTPException: If account not found
     """
-    account = trading_service.get_account(account_id)
+    account = await _run(trading_service.get_account, account_id)
     if not account:
         raise HTTPException(status_code=404, detail=f"Trading account {account_id} not found")
 
@@ -112,12 +138,13 @@ async def execute_buy(account_id: str, request: TradeExecuteRequest) -> TradeExe
     Raises:
         HTTPException: If account not found or buy operation fails
     """
-    account = trading_service.get_account(account_id)
-    if not account:
-        raise HTTPException(status_code=404, detail=f"Trading account {account_id} not found")
-
     try:
-        trade = account.buy(current_price=request.current_price)
+        executed = await _run(
+            trading_service.execute_trade, account_id, "buy", request.current_price
+        )
+        if not executed:
+            raise HTTPException(status_code=404, detail=f"Trading account {account_id} not found")
+        account, trade = executed
         status = account.get_status(current_price=request.current_price)
 
         return TradeExecuteResponse(
@@ -126,6 +153,8 @@ async def execute_buy(account_id: str, request: TradeExecuteRequest) -> TradeExe
             status=status,
             message=f"Bought {trade.shares} shares at ${trade.price:.2f}",
         )
+    except HTTPException:
+        raise
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
@@ -148,12 +177,13 @@ async def execute_sell(account_id: str, request: TradeExecuteRequest) -> TradeEx
     Raises:
         HTTPException: If account not found or sell operation fails
     """
-    account = trading_service.get_account(account_id)
-    if not account:
-        raise HTTPException(status_code=404, detail=f"Trading account {account_id} not found")
-
     try:
-        trade = account.sell(current_price=request.current_price)
+        executed = await _run(
+            trading_service.execute_trade, account_id, "sell", request.current_price
+        )
+        if not executed:
+            raise HTTPException(status_code=404, detail=f"Trading account {account_id} not found")
+        account, trade = executed
         status = account.get_status(current_price=request.current_price)
 
         return TradeExecuteResponse(
@@ -162,6 +192,8 @@ async def execute_sell(account_id: str, request: TradeExecuteRequest) -> TradeEx
             status=status,
             message=f"Sold {trade.shares} shares at ${trade.price:.2f}",
         )
+    except HTTPException:
+        raise
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
@@ -169,6 +201,66 @@ async def execute_sell(account_id: str, request: TradeExecuteRequest) -> TradeEx
         raise HTTPException(status_code=500, detail=f"Sell operation failed: {str(e)}")
 
 
+@router.post("/account/{account_id}/orders", response_model=OrderPlaceResponse)
+async def place_order(account_id: str, request: OrderPlaceRequest) -> OrderPlaceResponse:
+    """
+    Place a resting limit or stop order.
+
+    The order fills on a later bar whose synthetic intrabar path trades
+    through its price, and is settled when the account is next read.
+
+    Args:
+        account_id: The trading account ID
+        request: Contains side, order_type and price
+
+    Returns:
+        OrderPlaceResponse with the order and updated status
+
+    Raises:
+        HTTPException: If account not found or the playback session is gone
+    """
+    try:
+        placed = await _run(
+            trading_service.place_order,
+            account_id,
+            request.side,
+            request.order_type,
+            request.price,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not placed:
+        raise HTTPException(status_code=404, detail=f"Trading account {account_id} not found")
+
+    account, order = placed
+
+    return OrderPlaceResponse(order=order.to_model(), status=account.get_status())
+
+
+@router.delete("/account/{account_id}/orders/{order_id}")
+async def cancel_order(account_id: str, order_id: str) -> Dict[str, Any]:
+    """
+    Cancel a resting order.
+
+    Args:
+        account_id: The trading account ID
+        order_id: The order ID
+
+    Returns:
+        Success message
+
+    Raises:
+        HTTPException: If account or pending order not found
+    """
+    cancelled = await _run(trading_service.cancel_order, account_id, order_id)
+    if not cancelled:
+        raise HTTPException(status_code=404, detail=f"Trading account {account_id} not found")
+    if not cancelled[1]:
+        raise HTTPException(status_code=404, detail=f"Pending order {order_id} not found")
+
+    return {"message": f"Order {order_id} cancelled"}
+
+
 @router.get("/account/{account_id}/history", response_model=TradeHistoryResponse)
 async def get_trade_history(account_id: str) -> TradeHistoryResponse:
     """
@@ -183,7 +275,7 @@ async def get_trade_history(account_id: str) -> TradeHistoryResponse:
     Raises:
         HTTPException: If account not found
     """
-    account = trading_service.get_account(account_id)
+    account = await _run(trading_service.get_account, account_id)
     if not account:
         raise HTTPException(status_code=404, detail=f"Trading account {account_id} not found")
 
@@ -205,7 +297,7 @@ async def delete_trading_account(account_id: str) -> Dict[str, Any]:
     Raises:
         HTTPException: If account not found
     """
-    success = trading_service.delete_account(account_id)
+    success = await _run(trading_service.delete_account, account_id)
     if not success:
         raise HTTPException(status_code=404, detail=f"Trading account {account_id} not found")
 
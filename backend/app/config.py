@@ -19,6 +19,7 @@ class Settings(BaseSettings):
     # Server
     host: str = "0.0.0.0"
     port: int = 8888
+    web_concurrency: int = 1  # Worker processes (WEB_CONCURRENCY, as read by uvicorn/gunicorn)
 
     # CORS
     cors_origins: List[str] = [
@@ -35,6 +36,53 @@ class Settings(BaseSettings):
     # External APIs
     rapidapi_key: str = ""  # RapidAPI key for Morning Star API
 
+    # Market data cache
+    bar_store_enabled: bool = True  # Serve closed trading days from the local bar store
+    default_exchange_timezone: str = "Asia/Taipei"
+    bar_pack_dir: str = "data/bar_pack"  # Memory-mapped columns, see scripts/pack_bar_store.py
+    stock_cache_max_bytes: int = 128 * 1024 * 1024  # In-process DataFrame cache budget
+    stock_cache_ttl_seconds: float = 300.0
+    stock_cache_hot_ttl_seconds: float = 10.0  # Current session's partial bar
+    stock_cache_hot_max_bytes: int = 8 * 1024 * 1024
+    data_batch_max_symbols: int = 300  # Symbols per /api/data/historical/batch request
+    data_batch_timeout_seconds: float = 120.0  # One multi-ticker download for all misses
+    # Empty ticker ranges are not refetched upstream
+    symbol_negative_ttl_seconds: float = 24 * 60 * 60
+
+    # Upstream thread pool (blocking yfinance calls from async routes)
+    upstream_max_workers: int = 8
+    upstream_max_queue: int = 64
+    upstream_timeout_seconds: float = 30.0
+
+    # Playback session registry
+    playback_session_ttl_seconds: float = 2 * 60 * 60  # Evict sessions idle this long
+    playback_max_bytes: int = 256 * 1024 * 1024  # Memory budget for all sessions
+    playback_max_basket_size: int = 20  # Symbols per multi-symbol session
+    playback_sweep_interval_seconds: float = 60.0
+
+    # Intraday playback: bars load in chunks of trading days around the cursor
+    intraday_chunk_days: int = 1
+    intraday_prefetch_chunks: int = 1  # Chunks loaded ahead of the cursor
+    intraday_keep_chunks: int = 1  # Replayed chunks kept behind the cursor
+
+    # Shared playback/account state: memory://, sqlite:///data/sessions.db or redis://host:6379/0
+    session_store_url: str = "memory://"
+
+    # Snapshot of a memory:// session store, restored on startup ("" disables)
+    session_snapshot_path: str = "data/session_snapshot.json.gz"
+    session_snapshot_interval_seconds: float = 30.0
+
+    # HMAC secret for stateless playback cursors; must be the same on every worker
+    cursor_token_secret: str = ""
+
+    # Synthetic intrabar paths used to fill limit/stop orders
+    intrabar_steps: int = 60  # Ticks per bar
+    intrabar_seed: int = 0
+
+    # Streaming playback scheduler (timing wheel)
+    playback_tick_seconds: float = 0.02
+    playback_wheel_slots: int = 512
+
     model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8", extra="ignore")
 
 
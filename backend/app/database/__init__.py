@@ -3,6 +3,24 @@ Database package initialization.
 """
 
 from app.database.connection import Base, engine, get_db, init_db
-from app.database.models import DailyNewsSummary, NewsArticle, NewsFetchLog
+from app.database.models import (
+    DailyNewsSummary,
+    NewsArticle,
+    NewsFetchLog,
+    PriceBar,
+    PriceFetchLog,
+    SymbolResolution,
+)
 
-__all__ = ["Base", "engine", "get_db", "init_db", "NewsArticle", "DailyNewsSummary", "NewsFetchLog"]
+__all__ = [
+    "Base",
+    "engine",
+    "get_db",
+    "init_db",
+    "NewsArticle",
+    "DailyNewsSummary",
+    "NewsFetchLog",
+    "PriceBar",
+    "PriceFetchLog",
+    "SymbolResolution",
+]
@@ -48,6 +48,13 @@ def init_db():
     """
     Initialize database by creating all tables.
     """
-    from app.database.models import DailyNewsSummary, NewsArticle, NewsFetchLog
+    from app.database.models import (
+        DailyNewsSummary,
+        NewsArticle,
+        NewsFetchLog,
+        PriceBar,
+        PriceFetchLog,
+        SymbolResolution,
+    )
 
     Base.metadata.create_all(bind=engine)
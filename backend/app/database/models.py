@@ -2,7 +2,7 @@
 Database models for news caching.
 """
 
-from sqlalchemy import Column, DateTime, Index, Integer, String, Text
+from sqlalchemy import BigInteger, Column, DateTime, Float, Index, Integer, String, Text
 from sqlalchemy.sql import func
 
 from app.database.connection import Base
@@ -72,3 +72,72 @@ class NewsFetchLog(Base):
 
     def __repr__(self):
         return f"<NewsFetchLog(symbol={self.symbol}, range={self.start_date.date()} to {self.end_date.date()}, found={self.articles_found})>"
+
+
+class PriceBar(Base):
+    """
+    Daily OHLCV bar cache.
+    Dates are stored as naive exchange-local midnight timestamps.
+    """
+
+    __tablename__ = "price_bars"
+
+    id = Column(Integer, primary_key=True, index=True)
+    symbol = Column(String(20), nullable=False, index=True)
+    date = Column(DateTime, nullable=False)
+    open = Column(Float, nullable=False)
+    high = Column(Float, nullable=False)
+    low = Column(Float, nullable=False)
+    close = Column(Float, nullable=False)
+    volume = Column(BigInteger, nullable=False, default=0)
+
+    # One bar per symbol per day; also serves range scans
+    __table_args__ = (Index("idx_price_bar_symbol_date", "symbol", "date", unique=True),)
+
+    def __repr__(self):
+        return f"<PriceBar(symbol={self.symbol}, date={self.date.date()}, close={self.close})>"
+
+
+class PriceFetchLog(Base):
+    """
+    Log of closed-day ranges already downloaded for a symbol.
+    Used to compute which date ranges still need an upstream fetch.
+    """
+
+    __tablename__ = "price_fetch_log"
+
+    id = Column(Integer, primary_key=True, index=True)
+    symbol = Column(String(20), nullable=False, index=True)
+    start_date = Column(DateTime, nullable=False)
+    end_date = Column(DateTime, nullable=False)
+    timezone = Column(String(50), nullable=True)
+    bars_found = Column(Integer, default=0)
+    fetch_time = Column(DateTime, server_default=func.now())
+
+    __table_args__ = (
+        Index("idx_price_fetch_log_symbol_dates", "symbol", "start_date", "end_date"),
+    )
+
+    def __repr__(self):
+        return f"<PriceFetchLog(symbol={self.symbol}, range={self.start_date.date()} to {self.end_date.date()}, found={self.bars_found})>"
+
+
+class SymbolResolution(Base):
+    """
+    Upstream symbol that serves a requested ticker.
+    Taiwan codes are keyed without suffix and resolve to their .TW or .TWO
+    listing; a null resolved_symbol marks a ticker found empty between
+    empty_from and empty_to, rejected for that range until checked_at ages out.
+    """
+
+    __tablename__ = "symbol_resolutions"
+
+    id = Column(Integer, primary_key=True, index=True)
+    code = Column(String(20), nullable=False, unique=True, index=True)
+    resolved_symbol = Column(String(20), nullable=True)
+    checked_at = Column(DateTime, nullable=False)
+    empty_from = Column(DateTime, nullable=True)
+    empty_to = Column(DateTime, nullable=True)
+
+    def __repr__(self):
+        return f"<SymbolResolution(code={self.code}, resolved={self.resolved_symbol}, checked={self.checked_at})>"
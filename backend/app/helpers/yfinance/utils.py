@@ -7,7 +7,7 @@ Refactored for better maintainability and error handling.
 import logging
 from datetime import datetime, timedelta
 from functools import wraps
-from typing import Dict, Optional, Union
+from typing import Dict, List, Optional, Union
 
 import pandas as pd
 from pydantic import ValidationError
@@ -66,7 +66,11 @@ class YFinanceService:
     @staticmethod
     @handle_yfinance_errors
     def get_stock_data(
-        symbol: str, start_date: str, end_date: str, period: Optional[str] = None
+        symbol: str,
+        start_date: str,
+        end_date: str,
+        period: Optional[str] = None,
+        interval: str = "1d",
     ) -> pd.DataFrame:
         """
         Retrieve stock price data for designated ticker symbol.
@@ -76,6 +80,7 @@ class YFinanceService:
             start_date: Start date in YYYY-MM-DD format
             end_date: End date in YYYY-MM-DD format
             period: Alternative to start_date/end_date (e.g., '1y', '6mo')
+            interval: Bar interval (e.g., '1d', '1h', '5m', '1m')
 
         Returns:
             DataFrame with OHLCV data
@@ -89,23 +94,82 @@ class YFinanceService:
 
         try:
             if period:
-                data = ticker.history(period=period)
+                data = ticker.history(period=period, interval=interval)
             else:
                 # Add one day to end_date to make the range inclusive
                 end_date_inclusive = (pd.to_datetime(end_date) + pd.DateOffset(days=1)).strftime(
                     "%Y-%m-%d"
                 )
-                data = ticker.history(start=start_date, end=end_date_inclusive)
+                data = ticker.history(start=start_date, end=end_date_inclusive, interval=interval)
 
             if data.empty:
                 raise EmptyDataError(f"No data available for {symbol}")
 
             return data
 
+        except EmptyDataError:
+            raise
         except Exception as e:
             log.error(f"Failed to retrieve stock data for {symbol}: {e}")
             raise DataRetrievalError(f"Failed to retrieve stock data: {e}")
 
+    @staticmethod
+    @handle_yfinance_errors
+    def get_stock_data_bulk(
+        symbols: List[str],
+        start_date: str,
+        end_date: str,
+    ) -> Dict[str, pd.DataFrame]:
+        """
+        Retrieve daily price data for many ticker symbols in one download.
+
+        Args:
+            symbols: Ticker symbols
+            start_date: Start date in YYYY-MM-DD format
+            end_date: End date in YYYY-MM-DD format (inclusive)
+
+        Returns:
+            Dictionary of symbol to DataFrame with OHLCV data; symbols without
+            data are left out
+
+        Raises:
+            DataRetrievalError: If the download fails
+        """
+        symbols = list(dict.fromkeys(validate_ticker_symbol(symbol) for symbol in symbols))
+        if not symbols:
+            return {}
+        end_date_inclusive = (pd.to_datetime(end_date) + pd.DateOffset(days=1)).strftime("%Y-%m-%d")
+
+        try:
+            data = yf.download(
+                tickers=symbols,
+                start=start_date,
+                end=end_date_inclusive,
+                group_by="ticker",
+                auto_adjust=True,
+                progress=False,
+                threads=True,
+            )
+        except Exception as e:
+            log.error(f"Failed to download stock data for {len(symbols)} symbols: {e}")
+            raise DataRetrievalError(f"Failed to retrieve stock data: {e}")
+
+        frames: Dict[str, pd.DataFrame] = {}
+        if data is None or data.empty:
+            return frames
+        for symbol in symbols:
+            if isinstance(data.columns, pd.MultiIndex):
+                if symbol not in data.columns.get_level_values(0):
+                    continue
+                frame = data[symbol]
+            else:
+                # A single ticker may come back with flat columns
+                frame = data
+            frame = frame.dropna(how="all")
+            if not frame.empty:
+                frames[symbol] = frame
+        return frames
+
     @staticmethod
     @handle_yfinance_errors
     def get_stock_info(symbol: str) -> StockInfo:
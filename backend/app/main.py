@@ -2,16 +2,26 @@
 Main FastAPI application entry point.
 """
 
+import asyncio
 import logging
+from contextlib import asynccontextmanager, suppress
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from .api import data_router, playback_router
+from .api.admin import router as admin_router
 from .api.news import router as news_router
 from .api.stock_search import router as stock_search_router
+from .api.stream import router as stream_router
 from .api.trading import router as trading_router
 from .config import settings
+from .services.playback_scheduler import playback_scheduler
+from .services.playback_service import playback_service
+from .utils.cursor_token import check_cursor_secret
+from .utils.executor import upstream_executor
+from .utils.session_snapshot import load_snapshot, save_snapshot
+from .utils.session_store import session_store
 
 # Setup logging
 logging.basicConfig(
@@ -21,12 +31,62 @@ logging.basicConfig(
 
 logger = logging.getLogger(__name__)
 
+
+async def sweep_idle_sessions() -> None:
+    """Periodically evict idle playback sessions."""
+    while True:
+        await asyncio.sleep(settings.playback_sweep_interval_seconds)
+        # Purging the store and deleting linked accounts is blocking I/O
+        await asyncio.to_thread(playback_service.evict_expired)
+
+
+def snapshots_enabled() -> bool:
+    """Snapshot only process-local stores; durable ones survive restarts on their own."""
+    return bool(settings.session_snapshot_path) and not session_store.durable
+
+
+async def snapshot_sessions() -> None:
+    """Periodically write the session store to disk."""
+    while True:
+        await asyncio.sleep(settings.session_snapshot_interval_seconds)
+        try:
+            await asyncio.to_thread(save_snapshot, session_store, settings.session_snapshot_path)
+        except OSError as e:
+            logger.error(f"Failed to write session snapshot: {e}")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Application startup and shutdown."""
+    check_cursor_secret()
+    tasks = [asyncio.create_task(sweep_idle_sessions())]
+    if snapshots_enabled():
+        # Records only; bars are reloaded from the bar store on each session's first request
+        load_snapshot(session_store, settings.session_snapshot_path)
+        tasks.append(asyncio.create_task(snapshot_sessions()))
+    playback_scheduler.start()
+    yield
+    for task in tasks:
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+    await playback_scheduler.stop()
+    if snapshots_enabled():
+        try:
+            count = save_snapshot(session_store, settings.session_snapshot_path)
+            logger.info(f"Saved {count} session records for the next start")
+        except OSError as e:
+            logger.error(f"Failed to write session snapshot: {e}")
+    upstream_executor.shutdown()
+
+
 # Create FastAPI app
 app = FastAPI(
     title=settings.app_name,
     version=settings.app_version,
     description="Backend API for StockReplay",
     debug=settings.debug,
+    lifespan=lifespan,
 )
 
 # Setup CORS
@@ -44,6 +104,8 @@ app.include_router(playback_router)
 app.include_router(trading_router)
 app.include_router(news_router)
 app.include_router(stock_search_router)
+app.include_router(admin_router)
+app.include_router(stream_router)
 
 
 @app.get("/")
@@ -68,7 +130,7 @@ if __name__ == "__main__":
 
     # Railway uses PORT environment variable
     port = int(os.getenv("PORT", settings.port))
-    
+
     uvicorn.run(
         "app.main:app",
         host=settings.host,
@@ -4,16 +4,30 @@ Pydantic models for request/response data.
 
 from .playback import (
     CandleData,
+    HistoricalBatchRequest,
     PlaybackCreateRequest,
+    PlaybackForkResponse,
+    PlaybackIndicatorResponse,
+    PlaybackIntrabarResponse,
     PlaybackSeekRequest,
+    PlaybackSessionInfo,
+    PlaybackSessionListResponse,
     PlaybackStatusResponse,
+    PlaybackWindowResponse,
     StockDataResponse,
 )
 
 __all__ = [
     "CandleData",
     "StockDataResponse",
+    "HistoricalBatchRequest",
     "PlaybackCreateRequest",
     "PlaybackStatusResponse",
     "PlaybackSeekRequest",
+    "PlaybackWindowResponse",
+    "PlaybackIndicatorResponse",
+    "PlaybackIntrabarResponse",
+    "PlaybackForkResponse",
+    "PlaybackSessionInfo",
+    "PlaybackSessionListResponse",
 ]
@@ -3,7 +3,7 @@ Pydantic models for stock data playback.
 """
 
 from datetime import datetime
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 from pydantic import BaseModel, Field
 
@@ -27,6 +27,19 @@ class StockDataResponse(BaseModel):
     total_count: int = Field(..., description="Total number of data points")
 
 
+class HistoricalBatchRequest(BaseModel):
+    """Request model for historical data of many symbols."""
+
+    symbols: List[str] = Field(..., min_length=1, description="Stock ticker symbols")
+    start_date: Optional[str] = Field(
+        None, description="Start date (YYYY-MM-DD), optional if period is provided"
+    )
+    end_date: Optional[str] = Field(
+        None, description="End date (YYYY-MM-DD), optional if period is provided"
+    )
+    period: Optional[str] = Field("3mo", description="Period (e.g., '1mo', '3mo', '1y')")
+
+
 class PlaybackCreateRequest(BaseModel):
     """Request model for creating a playback session."""
 
@@ -40,6 +53,19 @@ class PlaybackCreateRequest(BaseModel):
     period: Optional[str] = Field(
         "3mo", description="Period string (e.g., '1mo', '3mo', '6mo', '1y')"
     )
+    symbols: Optional[List[str]] = Field(
+        None,
+        description="Other symbols replayed in sync with symbol on one cursor (portfolio basket)",
+    )
+    stateless: bool = Field(
+        False,
+        description="Return a signed cursor token as playback_id instead of keeping a server session",
+    )
+    interval: str = Field(
+        "1d",
+        description="Bar interval: 1d, or an intraday interval (1m, 5m, 15m, 30m, 1h, ...) "
+        "replayed from chunks loaded around the cursor",
+    )
 
 
 class PlaybackStatusResponse(BaseModel):
@@ -57,9 +83,113 @@ class PlaybackStatusResponse(BaseModel):
     all_dates: Optional[List[str]] = Field(
         None, description="List of all trading dates in YYYY-MM-DD format (only in start response)"
     )
+    candles: Optional[List[CandleData]] = Field(
+        None, description="Every candle passed by /next (only with return_all=true)"
+    )
+    basket: Optional[Dict[str, Optional[CandleData]]] = Field(
+        None,
+        description="Bar of every basket symbol at current_data (basket sessions only)",
+    )
+    stats: Optional[dict] = Field(
+        None,
+        description=(
+            "Statistics of revealed bars up to current_data: "
+            "{min_price, max_price, cum_volume, cum_return}"
+        ),
+    )
+    indicators: Optional[Dict[str, Dict[str, Optional[float]]]] = Field(
+        None,
+        description="Requested indicator values at current_data, e.g. {'rsi:14': {'rsi': 55.2}}",
+    )
+
+
+class PlaybackWindowResponse(BaseModel):
+    """Response model for a range of already revealed candles."""
+
+    playback_id: str = Field(..., description="Unique playback session ID")
+    symbol: str = Field(..., description="Stock ticker symbol")
+    from_index: int = Field(..., description="Index of the first returned candle")
+    to_index: int = Field(..., description="Index after the last returned candle (exclusive)")
+    current_index: int = Field(..., description="Current playback position (0-based)")
+    total_count: int = Field(..., description="Total number of data points")
+    candles: List[CandleData] = Field(..., description="Candles in [from_index, to_index)")
+    price_range: Optional[dict] = Field(
+        None, description="Price range of the returned candles: {min_price, max_price}"
+    )
+    timeframe: Optional[str] = Field(
+        None, description="Timeframe the candles were aggregated to; None for the bars as stored"
+    )
+
+
+class PlaybackIntrabarResponse(BaseModel):
+    """Response model for the synthetic tick path of one revealed candle."""
+
+    playback_id: str = Field(..., description="Unique playback session ID")
+    symbol: str = Field(..., description="Stock ticker symbol")
+    index: int = Field(..., description="Index of the candle")
+    date: str = Field(..., description="Date of the candle")
+    ticks: List[float] = Field(..., description="Prices from open to close, within high/low")
+
+
+class PlaybackIndicatorResponse(BaseModel):
+    """Response model for indicator series over already revealed candles."""
+
+    playback_id: str = Field(..., description="Unique playback session ID")
+    symbol: str = Field(..., description="Stock ticker symbol")
+    from_index: int = Field(..., description="Index of the first returned value")
+    to_index: int = Field(..., description="Index after the last returned value (exclusive)")
+    current_index: int = Field(..., description="Current playback position (0-based)")
+    indicators: Dict[str, Dict[str, List[Optional[float]]]] = Field(
+        ..., description="Series per indicator and output, None during warm-up"
+    )
+
+
+class PlaybackForkResponse(BaseModel):
+    """Response model for a session forked at the parent's cursor."""
+
+    playback_id: str = Field(..., description="ID of the new child session")
+    parent_id: str = Field(..., description="ID of the session it was forked from")
+    symbol: str = Field(..., description="Stock ticker symbol")
+    current_index: int = Field(
+        ..., description="Cursor position, same as the parent's at fork time"
+    )
+    total_count: int = Field(..., description="Total number of data points")
+    current_data: Optional[CandleData] = Field(None, description="Current candlestick data")
+    accounts: Dict[str, str] = Field(
+        ..., description="Parent trading account ID to the child account ID"
+    )
 
 
 class PlaybackSeekRequest(BaseModel):
     """Request model for seeking to a specific position."""
 
     index: int = Field(..., description="Target index to seek to (0-based)", ge=0)
+
+
+class PlaybackSessionInfo(BaseModel):
+    """Summary of a live playback session for admin listings."""
+
+    playback_id: str = Field(..., description="Unique playback session ID")
+    symbol: str = Field(..., description="Stock ticker symbol")
+    dataset_key: str = Field(..., description="Key of the shared bar dataset")
+    current_index: int = Field(..., description="Current playback position (0-based)")
+    total_count: int = Field(..., description="Total number of data points")
+    created_at: float = Field(..., description="Creation time (Unix seconds)")
+    last_access: float = Field(..., description="Last access time (Unix seconds)")
+    idle_seconds: float = Field(..., description="Seconds since last access")
+    estimated_bytes: int = Field(
+        ..., description="Estimated memory footprint in bytes (share of the shared dataset)"
+    )
+
+
+class PlaybackSessionListResponse(BaseModel):
+    """Response model for the admin session listing."""
+
+    sessions: List[PlaybackSessionInfo] = Field(..., description="Live sessions, LRU first")
+    total_count: int = Field(..., description="Number of live sessions")
+    total_bytes: int = Field(
+        ..., description="Estimated memory held by all sessions, shared datasets counted once"
+    )
+    dataset_count: int = Field(..., description="Number of distinct shared datasets")
+    max_bytes: int = Field(..., description="Configured memory budget")
+    evicted_count: int = Field(..., description="Sessions evicted since startup")
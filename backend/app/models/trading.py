@@ -3,7 +3,7 @@ Pydantic models for trading simulation.
 """
 
 from datetime import datetime
-from typing import List, Optional
+from typing import List, Literal, Optional
 
 from pydantic import BaseModel, Field
 
@@ -33,6 +33,16 @@ class Position(BaseModel):
     unrealized_pl_pct: float = Field(..., description="Unrealized P/L percentage")
 
 
+class PendingOrder(BaseModel):
+    """Resting limit or stop order waiting to fill on a later bar."""
+
+    id: str = Field(..., description="Unique order ID")
+    side: Literal["buy", "sell"] = Field(..., description="Order side")
+    order_type: Literal["limit", "stop"] = Field(..., description="Order type")
+    price: float = Field(..., description="Limit or stop price")
+    placed_index: int = Field(..., description="Bar index the order was placed on")
+
+
 class TradingAccountStatus(BaseModel):
     """Trading account status response."""
 
@@ -48,6 +58,9 @@ class TradingAccountStatus(BaseModel):
     total_pl: float = Field(..., description="Total P/L (realized + unrealized)")
     total_pl_pct: float = Field(..., description="Total P/L percentage")
     trade_count: int = Field(..., description="Total number of trades")
+    pending_orders: List[PendingOrder] = Field(
+        default_factory=list, description="Resting limit/stop orders"
+    )
 
 
 class TradingAccountCreateRequest(BaseModel):
@@ -74,6 +87,21 @@ class TradeExecuteRequest(BaseModel):
     current_price: float = Field(..., description="Current execution price", gt=0)
 
 
+class OrderPlaceRequest(BaseModel):
+    """Request to place a resting limit or stop order."""
+
+    side: Literal["buy", "sell"] = Field(..., description="Order side")
+    order_type: Literal["limit", "stop"] = Field(..., description="Order type")
+    price: float = Field(..., description="Limit or stop price", gt=0)
+
+
+class OrderPlaceResponse(BaseModel):
+    """Response after placing an order."""
+
+    order: PendingOrder = Field(..., description="Placed order")
+    status: TradingAccountStatus = Field(..., description="Updated account status")
+
+
 class TradeExecuteResponse(BaseModel):
     """Response after executing a trade."""
 
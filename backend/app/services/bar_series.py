@@ -0,0 +1,200 @@
+"""
+Array-backed OHLCV series for playback sessions.
+"""
+
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from ..models.playback import CandleData
+
+
+def _readonly(array: np.ndarray) -> np.ndarray:
+    """Mark an array read-only so views can be shared safely."""
+    array.setflags(write=False)
+    return array
+
+
+@dataclass(frozen=True)
+class BarSeries:
+    """
+    Immutable OHLCV bars stored as contiguous NumPy arrays.
+
+    Timestamps are int64 nanoseconds of naive exchange-local time. Slicing
+    returns views onto the same buffers, so cursor reads never copy; candles are
+    only materialized when a response is serialized.
+    """
+
+    timestamps: np.ndarray
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray
+
+    @classmethod
+    def from_dataframe(cls, df: pd.DataFrame) -> "BarSeries":
+        """
+        Convert a yfinance-style DataFrame (Open/High/Low/Close/Volume columns).
+
+        Args:
+            df: DataFrame with a DatetimeIndex
+
+        Returns:
+            BarSeries owning contiguous copies of the columns
+        """
+        index = pd.DatetimeIndex(df.index)
+        if index.tz is not None:
+            index = index.tz_localize(None)
+
+        def column(name: str, dtype: type) -> np.ndarray:
+            return _readonly(np.ascontiguousarray(df[name].to_numpy(dtype=dtype)))
+
+        return cls(
+            timestamps=_readonly(np.ascontiguousarray(index.as_unit("ns").asi8)),
+            open=column("Open", np.float64),
+            high=column("High", np.float64),
+            low=column("Low", np.float64),
+            close=column("Close", np.float64),
+            volume=column("Volume", np.int64),
+        )
+
+    @classmethod
+    def concat(cls, parts: List["BarSeries"]) -> "BarSeries":
+        """
+        Join consecutive series; a single part is returned as is, without copying.
+
+        Args:
+            parts: Series in time order
+
+        Returns:
+            BarSeries (empty if there are no parts)
+        """
+        if len(parts) == 1:
+            return parts[0]
+        if not parts:
+            return cls(
+                *(
+                    _readonly(np.empty(0, dtype=dtype))
+                    for dtype in (np.int64, *[np.float64] * 4, np.int64)
+                )
+            )
+        columns = zip(*(part._arrays() for part in parts))
+        return cls(*(_readonly(np.concatenate(arrays)) for arrays in columns))
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    @property
+    def nbytes(self) -> int:
+        """Memory used by the underlying arrays."""
+        return sum(array.nbytes for array in self._arrays())
+
+    def _arrays(self) -> List[np.ndarray]:
+        return [self.timestamps, self.open, self.high, self.low, self.close, self.volume]
+
+    def slice(self, start: int, stop: int) -> "BarSeries":
+        """
+        Get a zero-copy window of bars [start, stop).
+
+        Args:
+            start: First index (inclusive)
+            stop: Last index (exclusive)
+
+        Returns:
+            BarSeries viewing the same buffers
+        """
+        return BarSeries(*(array[start:stop] for array in self._arrays()))
+
+    def candle_at(self, index: int) -> Optional[CandleData]:
+        """Materialize a single candle, or None if out of range."""
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            return None
+        return CandleData(
+            timestamp=self.datetimes(index, index + 1)[0],
+            open=float(self.open[index]),
+            high=float(self.high[index]),
+            low=float(self.low[index]),
+            close=float(self.close[index]),
+            volume=int(self.volume[index]),
+        )
+
+    def last(self) -> Optional[CandleData]:
+        """Materialize the last candle of the series."""
+        return self.candle_at(-1)
+
+    def to_candles(self) -> List[CandleData]:
+        """Materialize every candle in the series."""
+        return [CandleData(**record) for record in self.to_records()]
+
+    def to_records(self) -> List[Dict]:
+        """Serialize the series in one pass as a list of candle dicts."""
+        return [
+            {"timestamp": ts, "open": o, "high": h, "low": lo, "close": c, "volume": v}
+            for ts, o, h, lo, c, v in zip(
+                self.datetimes(),
+                self.open.tolist(),
+                self.high.tolist(),
+                self.low.tolist(),
+                self.close.tolist(),
+                self.volume.tolist(),
+            )
+        ]
+
+    def datetimes(self, start: Optional[int] = None, stop: Optional[int] = None) -> List[datetime]:
+        """Convert timestamps in [start, stop) to naive datetimes."""
+        return (
+            self.timestamps[start:stop].astype("datetime64[ns]").astype("datetime64[us]").tolist()
+        )
+
+    def dates(self) -> List[str]:
+        """Get all dates in YYYY-MM-DD format."""
+        return np.datetime_as_string(self.timestamps.astype("datetime64[ns]"), unit="D").tolist()
+
+
+def align_frames(frames: Dict[str, pd.DataFrame]) -> Dict[str, BarSeries]:
+    """
+    Align several OHLCV frames on one shared trading calendar.
+
+    The calendar is the union of all dates, built with a single outer join and
+    cut to start at the first bar of the first (lead) symbol. A symbol with no
+    bar on a calendar date gets a flat bar at its previous close and zero
+    volume; before its own first bar its prices stay NaN.
+
+    Args:
+        frames: Yfinance-style DataFrames by symbol, lead symbol first
+
+    Returns:
+        BarSeries of equal length by symbol, in the same order
+    """
+    naive = {}
+    for symbol, df in frames.items():
+        index = pd.DatetimeIndex(df.index)
+        naive[symbol] = df.set_axis(index.tz_localize(None) if index.tz is not None else index)
+
+    lead = next(iter(naive))
+    joined = pd.concat(naive, axis=1, join="outer").sort_index()
+    joined = joined.loc[naive[lead].index.min() :]
+
+    fields = ["Open", "High", "Low", "Close", "Volume"]
+    columns = {field: joined.xs(field, axis=1, level=1) for field in fields}
+    close = columns["Close"].ffill()
+    aligned = {
+        "Close": close,
+        "Open": columns["Open"].fillna(close),
+        "High": columns["High"].fillna(close),
+        "Low": columns["Low"].fillna(close),
+        "Volume": columns["Volume"].fillna(0),
+    }
+
+    return {
+        symbol: BarSeries.from_dataframe(
+            pd.DataFrame({field: aligned[field][symbol] for field in fields}, index=joined.index)
+        )
+        for symbol in naive
+    }
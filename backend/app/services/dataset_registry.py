@@ -0,0 +1,144 @@
+"""
+Reference-counted registry of immutable bar datasets shared across sessions.
+"""
+
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple, Union
+
+from .bar_series import BarSeries
+
+logger = logging.getLogger(__name__)
+
+
+class DatasetKey(NamedTuple):
+    """Identity of a dataset: the same key always means the same bars."""
+
+    symbol: str
+    start_date: Optional[str]
+    end_date: Optional[str]
+    period: Optional[str]
+    interval: str = "1d"
+
+    def __str__(self) -> str:
+        if self.period:
+            return f"{self.symbol}:{self.period}@{self.end_date}:{self.interval}"
+        return f"{self.symbol}:{self.start_date}~{self.end_date}:{self.interval}"
+
+
+@dataclass
+class Dataset:
+    """
+    Read-only bars plus values derived from them.
+
+    Sessions hold a reference and their own cursor; they never modify the bars.
+    ``derived`` caches per-dataset computations so sessions sharing a dataset
+    also share the work.
+    """
+
+    key: DatasetKey
+    bars: BarSeries
+    refcount: int = 0
+    created_at: float = field(default_factory=time.time)
+    derived: Dict[Any, Any] = field(default_factory=dict)
+    # Aligned bars of every basket symbol (lead first); empty for single-symbol datasets
+    members: Dict[str, BarSeries] = field(default_factory=dict)
+
+    @property
+    def nbytes(self) -> int:
+        """Memory used by the bar arrays."""
+        if self.members:
+            return sum(bars.nbytes for bars in self.members.values())
+        return self.bars.nbytes
+
+
+Loaded = Union[BarSeries, Tuple[BarSeries, Dict[str, BarSeries]]]
+
+
+class DatasetRegistry:
+    """Registry deduplicating datasets by key with reference counting."""
+
+    def __init__(self) -> None:
+        """Initialize dataset registry."""
+        self._datasets: Dict[DatasetKey, Dataset] = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, key: DatasetKey, loader: Callable[[], Optional[Loaded]]) -> Optional[Dataset]:
+        """
+        Get a shared dataset, loading it if no session holds it yet.
+
+        Args:
+            key: Dataset identity
+            loader: Function producing the bars on a miss, or (lead bars, basket members)
+
+        Returns:
+            Dataset with its reference count incremented, or None if loading failed
+        """
+        with self._lock:
+            dataset = self._datasets.get(key)
+            if dataset is not None:
+                dataset.refcount += 1
+                return dataset
+
+        loaded = loader()
+        bars, members = loaded if isinstance(loaded, tuple) else (loaded, {})
+        if bars is None or len(bars) == 0:
+            return None
+
+        with self._lock:
+            # Another caller may have loaded the same key meanwhile
+            dataset = self._datasets.get(key)
+            if dataset is None:
+                dataset = Dataset(key=key, bars=bars, members=members)
+                self._datasets[key] = dataset
+                logger.info(f"Loaded dataset {key} ({len(bars)} bars, {dataset.nbytes} bytes)")
+            dataset.refcount += 1
+            return dataset
+
+    def retain(self, dataset: Dataset) -> Dataset:
+        """
+        Add a reference to a dataset that is already held, without any lookup or load.
+
+        Args:
+            dataset: Dataset previously returned by acquire and not yet released
+
+        Returns:
+            The same dataset
+        """
+        with self._lock:
+            dataset.refcount += 1
+            return dataset
+
+    def release(self, dataset: Dataset) -> None:
+        """
+        Drop a reference; the dataset is freed when nothing references it.
+
+        Args:
+            dataset: Dataset previously returned by acquire
+        """
+        with self._lock:
+            dataset.refcount -= 1
+            if dataset.refcount <= 0 and self._datasets.get(dataset.key) is dataset:
+                del self._datasets[dataset.key]
+                logger.info(f"Released dataset {dataset.key}")
+
+    def get(self, key: DatasetKey) -> Optional[Dataset]:
+        """Get a loaded dataset without changing its reference count."""
+        with self._lock:
+            return self._datasets.get(key)
+
+    def list_datasets(self) -> List[Dataset]:
+        """Get all loaded datasets."""
+        with self._lock:
+            return list(self._datasets.values())
+
+    def total_bytes(self) -> int:
+        """Get memory used by all distinct datasets."""
+        with self._lock:
+            return sum(dataset.nbytes for dataset in self._datasets.values())
+
+
+# Global dataset registry instance
+dataset_registry = DatasetRegistry()
@@ -0,0 +1,191 @@
+"""
+Technical indicators computed once per dataset and revealed up to the cursor.
+
+Every indicator is vectorized over the full close array when first requested
+and cached in ``Dataset.derived``, so sessions sharing a dataset share the
+work. All formulas are causal (value i only depends on bars 0..i), so slicing
+the precomputed arrays at the cursor gives exactly what a trader watching the
+replay could have computed, without leaking future bars.
+"""
+
+import logging
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .dataset_registry import Dataset
+
+logger = logging.getLogger(__name__)
+
+# Indicator name -> (default parameters, output names)
+INDICATORS: Dict[str, Tuple[Tuple[float, ...], Tuple[str, ...]]] = {
+    "sma": ((20,), ("sma",)),
+    "ema": ((20,), ("ema",)),
+    "rsi": ((14,), ("rsi",)),
+    "macd": ((12, 26, 9), ("macd", "signal", "histogram")),
+    "bbands": ((20, 2), ("lower", "middle", "upper")),
+}
+
+
+class IndicatorError(ValueError):
+    """Exception raised for unknown indicators or invalid parameters."""
+
+    pass
+
+
+class IndicatorSpec(NamedTuple):
+    """Parsed indicator request, e.g. ``macd:12,26,9``."""
+
+    name: str
+    params: Tuple[float, ...]
+
+    def __str__(self) -> str:
+        return f"{self.name}:{','.join(f'{p:g}' for p in self.params)}"
+
+
+def parse_indicator(spec: str) -> IndicatorSpec:
+    """
+    Parse ``name[:p1,p2,...]``; missing parameters take their defaults.
+
+    Args:
+        spec: Indicator specification, e.g. ``sma:50`` or ``rsi``
+
+    Returns:
+        IndicatorSpec with a full parameter tuple
+
+    Raises:
+        IndicatorError: If the name is unknown or parameters are invalid
+    """
+    name, _, raw = spec.strip().lower().partition(":")
+    if name not in INDICATORS:
+        raise IndicatorError(f"Unknown indicator {name!r}, expected one of {', '.join(INDICATORS)}")
+    defaults = INDICATORS[name][0]
+
+    try:
+        given = [float(p) for p in raw.split(",") if p.strip()] if raw else []
+    except ValueError:
+        raise IndicatorError(f"Invalid parameters in {spec!r}")
+    if len(given) > len(defaults) or any(p <= 0 for p in given):
+        raise IndicatorError(f"Invalid parameters in {spec!r}")
+
+    params = tuple(given) + defaults[len(given) :]
+    # Window lengths must be whole bars; only the Bollinger width may be fractional
+    lengths = params[:1] if name == "bbands" else params
+    if any(p != int(p) for p in lengths):
+        raise IndicatorError(f"Window lengths must be integers in {spec!r}")
+    return IndicatorSpec(name, params)
+
+
+def parse_indicators(specs: Optional[List[str]]) -> List[IndicatorSpec]:
+    """Parse several specifications, dropping duplicates while keeping order."""
+    parsed = [parse_indicator(spec) for spec in specs or [] if spec.strip()]
+    return list(dict.fromkeys(parsed))
+
+
+def _ema(close: pd.Series, length: int) -> pd.Series:
+    return close.ewm(span=length, adjust=False, min_periods=length).mean()
+
+
+def _compute(close: pd.Series, spec: IndicatorSpec) -> Dict[str, pd.Series]:
+    params = spec.params
+    if spec.name == "sma":
+        return {"sma": close.rolling(int(params[0])).mean()}
+    if spec.name == "ema":
+        return {"ema": _ema(close, int(params[0]))}
+    if spec.name == "rsi":
+        # Wilder's smoothing (RMA), as in pandas-ta and most charting packages
+        length = int(params[0])
+        delta = close.diff()
+        gain = delta.clip(lower=0).ewm(alpha=1 / length, adjust=False, min_periods=length).mean()
+        loss = (-delta.clip(upper=0)).ewm(alpha=1 / length, adjust=False, min_periods=length).mean()
+        return {"rsi": 100 - 100 / (1 + gain / loss)}
+    if spec.name == "macd":
+        fast, slow, signal = (int(p) for p in params)
+        macd = _ema(close, fast) - _ema(close, slow)
+        signal_line = macd.ewm(span=signal, adjust=False, min_periods=signal).mean()
+        return {"macd": macd, "signal": signal_line, "histogram": macd - signal_line}
+    # bbands
+    length, width = int(params[0]), params[1]
+    middle = close.rolling(length).mean()
+    std = close.rolling(length).std(ddof=0)
+    return {"lower": middle - width * std, "middle": middle, "upper": middle + width * std}
+
+
+def get_indicator(dataset: Dataset, spec: IndicatorSpec) -> Dict[str, np.ndarray]:
+    """
+    Get the full-length output arrays of an indicator, computing them on first use.
+
+    Args:
+        dataset: Shared dataset
+        spec: Parsed indicator
+
+    Returns:
+        Dict of output name to read-only float64 array (NaN during warm-up)
+    """
+    key = ("indicator", spec)
+    cached = dataset.derived.get(key)
+    if cached is not None:
+        return cached
+
+    close = pd.Series(dataset.bars.close)
+    outputs = {}
+    for name, series in _compute(close, spec).items():
+        array = np.ascontiguousarray(series.to_numpy(dtype=np.float64))
+        array.setflags(write=False)
+        outputs[name] = array
+
+    logger.debug(f"Computed {spec} for dataset {dataset.key}")
+    # Concurrent first requests may both compute; the results are identical
+    return dataset.derived.setdefault(key, outputs)
+
+
+def _value(value: float) -> Optional[float]:
+    return None if value != value else value
+
+
+def values_at(
+    dataset: Dataset, specs: List[IndicatorSpec], index: int
+) -> Dict[str, Dict[str, Optional[float]]]:
+    """
+    Get indicator values at one bar in O(1) per output.
+
+    Args:
+        dataset: Shared dataset
+        specs: Parsed indicators
+        index: Bar index, must already be revealed
+
+    Returns:
+        Dict of spec string to output values (None during warm-up)
+    """
+    return {
+        str(spec): {
+            name: _value(float(array[index]))
+            for name, array in get_indicator(dataset, spec).items()
+        }
+        for spec in specs
+    }
+
+
+def series_between(
+    dataset: Dataset, specs: List[IndicatorSpec], start: int, stop: int
+) -> Dict[str, Dict[str, List[Optional[float]]]]:
+    """
+    Get indicator values for bars [start, stop).
+
+    Args:
+        dataset: Shared dataset
+        specs: Parsed indicators
+        start: First index (inclusive)
+        stop: Last index (exclusive), must not exceed the revealed bars
+
+    Returns:
+        Dict of spec string to output lists (None during warm-up)
+    """
+    return {
+        str(spec): {
+            name: [_value(v) for v in array[start:stop].tolist()]
+            for name, array in get_indicator(dataset, spec).items()
+        }
+        for spec in specs
+    }
@@ -0,0 +1,142 @@
+"""
+Deterministic synthetic price paths inside a bar.
+
+Daily bars only say where a price opened, closed and how far it ranged, so a
+stop or limit inside that range cannot tell whether it was reached before or
+after the other extreme. This module synthesizes a plausible path per bar:
+open, the two extremes in a seeded order, close, joined by Brownian-bridge
+noise that never leaves the bar's range. A path depends only on the bar,
+the seed and the bar's timestamp, so every worker (and every session over
+the same bar, whatever range it loaded) produces the same ticks, and paths
+are generated lazily, one bar at a time.
+"""
+
+import zlib
+from typing import Iterator, Optional, Tuple
+
+import numpy as np
+
+from .bar_series import BarSeries
+
+MIN_STEPS = 4
+
+# Probability that the high comes before the low on a down bar (and after it on an up bar)
+EXTREME_ORDER_BIAS = 0.75
+
+# Bridge noise scale as a fraction of the bar range
+NOISE_FRACTION = 0.08
+
+
+def _rng(seed: int, symbol: str, timestamp: int) -> np.random.Generator:
+    return np.random.default_rng([seed, zlib.crc32(symbol.encode()), timestamp & (2**64 - 1)])
+
+
+def synthesize_path(
+    open_: float,
+    high: float,
+    low: float,
+    close: float,
+    steps: int,
+    rng: np.random.Generator,
+) -> np.ndarray:
+    """
+    Build one intrabar path from OHLC, vectorized over its steps.
+
+    Args:
+        open_: Bar open
+        high: Bar high
+        low: Bar low
+        close: Bar close
+        steps: Number of ticks, at least MIN_STEPS
+        rng: Seeded generator
+
+    Returns:
+        Float array starting at open, ending at close, touching high and low
+    """
+    steps = max(steps, MIN_STEPS)
+    high_first = rng.random() < (EXTREME_ORDER_BIAS if close < open_ else 1 - EXTREME_ORDER_BIAS)
+    first, second = sorted(rng.choice(np.arange(1, steps - 1), size=2, replace=False))
+    knots = np.array([0, first, second, steps - 1])
+    anchors = [open_, high, low, close] if high_first else [open_, low, high, close]
+
+    t = np.arange(steps)
+    walk = np.cumsum(rng.normal(0.0, (high - low) * NOISE_FRACTION, size=steps))
+    bridge = walk - np.interp(t, knots, walk[knots])  # Zero at every knot
+    path = np.clip(np.interp(t, knots, anchors) + bridge, low, high)
+    path[knots] = anchors
+    return path
+
+
+def bar_path(bars: BarSeries, index: int, steps: int, seed: int, symbol: str) -> np.ndarray:
+    """
+    Get the synthetic path of one bar.
+
+    Args:
+        bars: Series holding the bar
+        index: Bar index
+        steps: Ticks per bar
+        seed: Simulation seed
+        symbol: Symbol, mixed into the seed so symbols move independently
+
+    Returns:
+        Read-only float array of ticks
+    """
+    path = synthesize_path(
+        float(bars.open[index]),
+        float(bars.high[index]),
+        float(bars.low[index]),
+        float(bars.close[index]),
+        steps,
+        _rng(seed, symbol, int(bars.timestamps[index])),
+    )
+    path.setflags(write=False)
+    return path
+
+
+def iter_paths(
+    bars: BarSeries, start: int, stop: int, steps: int, seed: int, symbol: str
+) -> Iterator[Tuple[int, np.ndarray]]:
+    """
+    Lazily yield (index, path) for bars [start, stop), one bar at a time.
+
+    Args:
+        bars: Series holding the bars
+        start: First index (inclusive)
+        stop: Last index (exclusive)
+        steps: Ticks per bar
+        seed: Simulation seed
+        symbol: Symbol mixed into the seed
+
+    Yields:
+        Bar index and its path
+    """
+    for index in range(max(start, 0), min(stop, len(bars))):
+        yield index, bar_path(bars, index, steps, seed, symbol)
+
+
+def first_fill(
+    path: np.ndarray, side: str, order_type: str, price: float
+) -> Optional[Tuple[int, float]]:
+    """
+    Find where a resting order fills on a path.
+
+    A limit buy fills once the price trades at or below the limit, a stop buy
+    once it trades at or above the stop (sells mirror this). Triggers inside
+    the bar fill at the order price; a bar that opens through the price fills
+    at the open.
+
+    Args:
+        path: Ticks of one bar
+        side: 'buy' or 'sell'
+        order_type: 'limit' or 'stop'
+        price: Limit or stop price
+
+    Returns:
+        (tick position, fill price), or None if the order does not trigger in this bar
+    """
+    below = (side == "buy") == (order_type == "limit")
+    hits = path <= price if below else path >= price
+    position = int(np.argmax(hits))
+    if not hits[position]:
+        return None
+    return position, float(path[0]) if position == 0 else price
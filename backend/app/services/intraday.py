@@ -0,0 +1,297 @@
+"""
+Intraday bars loaded lazily in chunks of trading days.
+
+A month of 1-minute bars is tens of thousands of rows per symbol, and a
+replay only ever looks at the bars around its cursor. ``ChunkedBars`` splits
+the trading calendar into fixed-size chunks of days and keeps only the chunks
+near the cursor in memory: the next chunks are prefetched on the upstream
+pool while the current one plays, and chunks already replayed are dropped
+(a later window request simply reloads them through the bar cache).
+
+Bar counts per chunk are learned as chunks load and are kept after eviction,
+so global cursor positions stay stable without holding the bars.
+"""
+
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Callable, Dict, List, Optional, Tuple
+
+from ..utils.executor import upstream_executor
+from .bar_series import BarSeries
+
+logger = logging.getLogger(__name__)
+
+# Interval -> how many calendar days back Yahoo Finance serves it
+INTRADAY_LOOKBACK_DAYS: Dict[str, int] = {
+    "1m": 30,
+    "2m": 60,
+    "5m": 60,
+    "15m": 60,
+    "30m": 60,
+    "90m": 60,
+    "60m": 730,
+    "1h": 730,
+}
+
+# Bars a single request may advance; kept loaded ahead of the cursor before a request runs
+READY_BARS = 100
+
+# Loads the bars of an inclusive range of trading days; None or empty means the
+# range has no bars, a failed load raises so that nothing is recorded for it
+ChunkLoader = Callable[[str, str], Optional[BarSeries]]
+
+
+class ChunkedBars:
+    """
+    Bars of consecutive trading days, resident only around the cursor.
+
+    Chunks are addressed by number; chunk k covers days
+    [k * chunk_days, (k + 1) * chunk_days). Loads are synchronous unless a
+    prefetch for the same chunk is already running, in which case they wait
+    for it; callers on the event loop check ``ready`` and prefetch instead.
+    """
+
+    def __init__(
+        self,
+        days: List[str],
+        loader: ChunkLoader,
+        chunk_days: int,
+        lengths: Optional[List[Optional[int]]] = None,
+    ) -> None:
+        """
+        Initialize chunked bars; nothing is loaded yet.
+
+        Args:
+            days: Trading days (YYYY-MM-DD) in order
+            loader: Function loading the bars of a day range
+            chunk_days: Trading days per chunk
+            lengths: Bar counts per chunk learned earlier, e.g. from a stored session
+        """
+        self.days = days
+        self.chunk_days = max(chunk_days, 1)
+        self._loader = loader
+        count = -(-len(days) // self.chunk_days)
+        self._chunks: List[Optional[BarSeries]] = [None] * count
+        self.lengths: List[Optional[int]] = (list(lengths or []) + [None] * count)[:count]
+        self._pending: Dict[int, Future] = {}
+        self._lock = threading.Lock()
+        self.loads = 0
+        self.evictions = 0
+
+    @property
+    def chunk_count(self) -> int:
+        """Number of chunks."""
+        return len(self._chunks)
+
+    @property
+    def nbytes(self) -> int:
+        """Memory used by resident chunks."""
+        return sum(chunk.nbytes for chunk in self._chunks if chunk is not None)
+
+    def resident(self) -> List[int]:
+        """Get the numbers of the chunks currently in memory."""
+        return [k for k, chunk in enumerate(self._chunks) if chunk is not None]
+
+    def chunk_days_range(self, k: int) -> Tuple[str, str]:
+        """Get the first and last trading day of a chunk."""
+        days = self.days[k * self.chunk_days : (k + 1) * self.chunk_days]
+        return days[0], days[-1]
+
+    def _fetch(self, k: int) -> BarSeries:
+        """Load a chunk from the loader and record its length; loader errors propagate."""
+        bars = self._loader(*self.chunk_days_range(k))
+        if bars is None:
+            bars = BarSeries.concat([])
+        with self._lock:
+            known = self.lengths[k]
+            if known is not None and known != len(bars):
+                logger.warning(
+                    f"Chunk {self.chunk_days_range(k)} reloaded with {len(bars)} bars, "
+                    f"expected {known}; positions after it may shift"
+                )
+            self.lengths[k] = len(bars)
+            self._chunks[k] = bars
+            self.loads += 1
+        return bars
+
+    def load(self, k: int) -> BarSeries:
+        """
+        Get a chunk, loading it (or waiting for its prefetch) if not resident.
+
+        Args:
+            k: Chunk number
+
+        Returns:
+            Bars of the chunk, possibly empty (e.g. a holiday or missing data)
+        """
+        with self._lock:
+            chunk = self._chunks[k]
+            pending = self._pending.get(k)
+        if chunk is not None:
+            return chunk
+        if pending is not None:
+            try:
+                return pending.result()
+            except Exception as e:
+                logger.warning(f"Prefetch of chunk {k} failed, loading again: {e}")
+        return self._fetch(k)
+
+    def prefetch(self, k: int) -> None:
+        """Start loading a chunk on the upstream pool if it is not resident or loading."""
+        with self._lock:
+            if not 0 <= k < self.chunk_count or self._chunks[k] is not None or k in self._pending:
+                return
+        future = upstream_executor.submit(self._fetch, k)
+        if future is None:
+            return
+        with self._lock:
+            self._pending[k] = future
+        future.add_done_callback(lambda _: self._forget(k, future))
+
+    def _forget(self, k: int, future: Future) -> None:
+        with self._lock:
+            if self._pending.get(k) is future:
+                del self._pending[k]
+
+    def evict(self, keep_from: int, keep_to: int) -> int:
+        """
+        Drop resident chunks outside [keep_from, keep_to]; their lengths are kept.
+
+        Returns:
+            Number of chunks dropped
+        """
+        dropped = 0
+        with self._lock:
+            for k, chunk in enumerate(self._chunks):
+                if chunk is not None and not keep_from <= k <= keep_to:
+                    self._chunks[k] = None
+                    dropped += 1
+            self.evictions += dropped
+        return dropped
+
+    def locate(self, index: int) -> Optional[Tuple[int, int]]:
+        """
+        Find the chunk holding a global bar index.
+
+        Chunks whose length is still unknown are loaded in order until the
+        index is reached, so positions never depend on estimates.
+
+        Args:
+            index: Global bar index
+
+        Returns:
+            (chunk number, index within the chunk), or None past the last bar
+        """
+        if index < 0:
+            return None
+        offset = 0
+        for k in range(self.chunk_count):
+            length = self.lengths[k]
+            if length is None:
+                length = len(self.load(k))
+            if index < offset + length:
+                return k, index - offset
+            offset += length
+        return None
+
+    def ready(self, start: int, stop: int) -> bool:
+        """
+        Check whether bars [start, stop) can be read without loading anything.
+
+        Returns:
+            True if every chunk the range touches has a known length and is
+            resident, or the range lies past the last bar
+        """
+        offset = 0
+        with self._lock:
+            for k, length in enumerate(self.lengths):
+                if offset >= stop:
+                    break
+                if length is None:
+                    return False
+                if offset + length > start and self._chunks[k] is None:
+                    return False
+                offset += length
+        return True
+
+    def peek(self, index: int) -> int:
+        """
+        Get the chunk a global index falls in without loading anything.
+
+        Returns:
+            Chunk number; the first chunk of unknown length if the index lies
+            beyond the known ones, or the last chunk past the end
+        """
+        offset = 0
+        for k, length in enumerate(self.lengths):
+            if length is None or index < offset + length:
+                return k
+            offset += length
+        return max(self.chunk_count - 1, 0)
+
+    def clamp(self, count: int) -> int:
+        """Get how many of the first ``count`` bars exist, loading lengths only as needed."""
+        if count <= 0:
+            return 0
+        located = self.locate(count - 1)
+        return count if located is not None else self.known_length()
+
+    def known_length(self) -> int:
+        """Total bars of the chunks whose length is known."""
+        return sum(length for length in self.lengths if length is not None)
+
+    def estimated_length(self) -> int:
+        """
+        Total bars, estimated from the bars per day of loaded chunks until all are known.
+
+        Returns:
+            Exact total once every chunk has loaded at least once
+        """
+        known = [(k, length) for k, length in enumerate(self.lengths) if length is not None]
+        unknown = [k for k, length in enumerate(self.lengths) if length is None]
+        total = sum(length for _, length in known)
+        if not unknown or not known:
+            return total
+        known_days = sum(
+            len(self.days[k * self.chunk_days : (k + 1) * self.chunk_days]) for k, _ in known
+        )
+        unknown_days = len(self.days) - known_days
+        return total + round(total / max(known_days, 1) * unknown_days)
+
+    def bar(self, index: int) -> Optional[Tuple[BarSeries, int]]:
+        """
+        Get the resident chunk and local index of one bar.
+
+        Returns:
+            (chunk bars, index within them), or None past the last bar
+        """
+        located = self.locate(index)
+        if located is None:
+            return None
+        k, local = located
+        return self.load(k), local
+
+    def slice(self, start: int, stop: int) -> BarSeries:
+        """
+        Get bars [start, stop), a zero-copy view when they lie in one chunk.
+
+        Args:
+            start: First global index (inclusive)
+            stop: Last global index (exclusive)
+
+        Returns:
+            BarSeries, shorter than requested past the last bar
+        """
+        parts = []
+        index = start
+        while index < stop:
+            located = self.locate(index)
+            if located is None:
+                break
+            k, local = located
+            chunk = self.load(k)
+            take = min(len(chunk) - local, stop - index)
+            parts.append(chunk.slice(local, local + take))
+            index += take
+        return BarSeries.concat(parts)
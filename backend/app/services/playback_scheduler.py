@@ -0,0 +1,281 @@
+"""
+Central scheduler pacing every streaming playback client.
+
+A task or timer per stream stops scaling past a few hundred concurrent replays.
+Instead one asyncio task advances a hashed timing wheel: each slot holds the
+streams whose next frame is due on that tick, so a tick only touches the
+streams that are due and timer overhead stays flat as the stream count grows.
+"""
+
+import asyncio
+import json
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+from ..config import settings
+from .playback_stream import PlaybackStream
+
+logger = logging.getLogger(__name__)
+
+SendFunc = Callable[[str], Awaitable[None]]
+
+
+@dataclass(eq=False)
+class _Timer:
+    """Wheel entry of one stream."""
+
+    stream: PlaybackStream
+    send: SendFunc
+    deadline: int  # Absolute tick of the next frame
+    slot: int
+    pending: Optional[asyncio.Task] = None
+
+
+class PlaybackScheduler:
+    """
+    Hashed timing wheel multiplexing paced playback streams on one task.
+
+    Sends due on the same tick are started together and never awaited by the
+    wheel, so a slow client cannot delay the others. A stream whose previous
+    frame is still being written is skipped for that tick (back-pressure)
+    instead of queueing more frames behind it.
+    """
+
+    def __init__(self, tick_seconds: float, slots: int) -> None:
+        """
+        Initialize scheduler.
+
+        Args:
+            tick_seconds: Wheel resolution in seconds
+            slots: Number of wheel slots
+        """
+        self.tick_seconds = tick_seconds
+        self.slots = slots
+        self._wheel: List[Set[_Timer]] = [set() for _ in range(slots)]
+        self._timers: Dict[PlaybackStream, _Timer] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._started_at = 0.0
+        self._tick = 0  # Last processed tick
+        self._reset_metrics()
+
+    def _reset_metrics(self) -> None:
+        self._ticks = 0
+        self._last_lag = 0.0
+        self._max_lag = 0.0
+        self._total_lag = 0.0
+        self._frames_sent = 0
+        self._late_frames = 0
+        self._deferred = 0
+        self._chunk_waits = 0
+        self._send_errors = 0
+        self._max_batch = 0
+
+    # ------------------------------------------------------------------ control
+
+    def schedule(self, stream: PlaybackStream, send: SendFunc) -> None:
+        """
+        Schedule the next frame of a stream one interval from now.
+
+        Calling it again (after seek or speed change) replaces the deadline.
+
+        Args:
+            stream: Stream to pace
+            send: Coroutine function writing a text frame to the client
+        """
+        self._ensure_running()
+        previous = self._timers.pop(stream, None)
+        if previous is not None:
+            self._wheel[previous.slot].discard(previous)
+
+        timer = _Timer(stream=stream, send=send, deadline=0, slot=0)
+        if previous is not None:
+            timer.pending = previous.pending
+        self._insert(timer, self._current_tick() + self._interval_ticks(stream))
+
+    def cancel(self, stream: PlaybackStream) -> None:
+        """
+        Stop pacing a stream (pause, end of data or disconnect).
+
+        Args:
+            stream: Stream to remove
+        """
+        timer = self._timers.pop(stream, None)
+        if timer is not None:
+            self._wheel[timer.slot].discard(timer)
+
+    def start(self) -> None:
+        """Start the wheel task on the running event loop."""
+        self._ensure_running()
+
+    async def stop(self) -> None:
+        """Stop the wheel task and drop all streams."""
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._clear()
+
+    # ----------------------------------------------------------------- internals
+
+    def _ensure_running(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._task is not None and not self._task.done() and self._task.get_loop() is loop:
+            return
+
+        # Timers created on a previous (closed) loop cannot be resumed
+        self._clear()
+        self._started_at = time.monotonic()
+        self._tick = 0
+        self._task = loop.create_task(self._run())
+
+    def _clear(self) -> None:
+        for slot in self._wheel:
+            slot.clear()
+        self._timers.clear()
+
+    def _current_tick(self) -> int:
+        return int((time.monotonic() - self._started_at) / self.tick_seconds)
+
+    def _interval_ticks(self, stream: PlaybackStream) -> int:
+        return max(1, round(stream.interval / self.tick_seconds))
+
+    def _insert(self, timer: _Timer, deadline: int) -> None:
+        timer.deadline = max(deadline, self._tick + 1)
+        timer.slot = timer.deadline % self.slots
+        self._wheel[timer.slot].add(timer)
+        self._timers[timer.stream] = timer
+
+    async def _run(self) -> None:
+        """Wheel loop: sleep until the next tick boundary, then fire due slots."""
+        while True:
+            next_at = self._started_at + (self._tick + 1) * self.tick_seconds
+            await asyncio.sleep(max(0.0, next_at - time.monotonic()))
+
+            now = self._current_tick()
+            lag = time.monotonic() - next_at
+            self._ticks += 1
+            self._last_lag = lag
+            self._max_lag = max(self._max_lag, lag)
+            self._total_lag += lag
+
+            try:
+                self._advance(now)
+            except Exception as e:
+                logger.error(f"[PlaybackScheduler] Tick {now} failed: {e}")
+
+    def _advance(self, now: int) -> None:
+        """Fire every timer due up to tick ``now``, catching up on missed ticks."""
+        due: List[_Timer] = []
+        # Visiting each slot once covers every deadline, however far behind we are
+        for tick in range(self._tick + 1, min(now, self._tick + self.slots) + 1):
+            slot = self._wheel[tick % self.slots]
+            ready = [timer for timer in slot if timer.deadline <= now]
+            for timer in ready:
+                slot.discard(timer)
+            due.extend(ready)
+        self._tick = max(self._tick, now)
+
+        batch = 0
+        for timer in due:
+            if self._timers.get(timer.stream) is not timer:
+                continue  # Cancelled or rescheduled meanwhile
+            del self._timers[timer.stream]
+            batch += self._fire(timer, now)
+        self._max_batch = max(self._max_batch, batch)
+
+    def _fire(self, timer: _Timer, now: int) -> int:
+        """Send one frame for a due timer and re-arm it. Returns frames started."""
+        stream = timer.stream
+
+        if timer.pending is not None and not timer.pending.done():
+            # Client is not draining its socket: retry next tick, keep the cursor
+            self._deferred += 1
+            self._insert(timer, now + 1)
+            return 0
+
+        if not stream.session.is_ready():
+            # Bars at the cursor are still loading on the upstream pool: retry next tick
+            self._chunk_waits += 1
+            self._insert(timer, now + 1)
+            return 0
+
+        if not stream.active:
+            return 0
+
+        frame = stream.next_frame()
+        if frame is None:
+            return 0
+
+        text = json.dumps(frame, separators=(",", ":"))
+        if not stream.session.has_more():
+            # Append the end notice to the same write so ordering is preserved
+            end = json.dumps({**stream.status(), "type": "end"})
+            timer.pending = asyncio.ensure_future(self._send_all(timer.send, [text, end]))
+        else:
+            timer.pending = asyncio.ensure_future(timer.send(text))
+        timer.pending.add_done_callback(lambda task, s=stream: self._on_sent(task, s))
+
+        self._frames_sent += 1
+        if now > timer.deadline:
+            self._late_frames += 1
+
+        if stream.session.has_more():
+            # Keep the cadence, but do not burst to catch up after a stall
+            interval = self._interval_ticks(stream)
+            deadline = timer.deadline + interval
+            self._insert(timer, deadline if deadline > now else now + interval)
+        return 1
+
+    @staticmethod
+    async def _send_all(send: SendFunc, messages: List[str]) -> None:
+        for message in messages:
+            await send(message)
+
+    def _on_sent(self, task: asyncio.Task, stream: PlaybackStream) -> None:
+        """Drop streams whose client went away."""
+        if task.cancelled():
+            return
+        if task.exception() is not None:
+            self._send_errors += 1
+            self.cancel(stream)
+
+    # ------------------------------------------------------------------- metrics
+
+    def stats(self) -> Dict[str, Any]:
+        """Get tick-lag, throughput and back-pressure metrics."""
+        pending = sum(
+            1
+            for timer in self._timers.values()
+            if timer.pending is not None and not timer.pending.done()
+        )
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "tick_seconds": self.tick_seconds,
+            "slots": self.slots,
+            "streams": len(self._timers),
+            "pending_sends": pending,
+            "ticks": self._ticks,
+            "tick_lag_ms": round(self._last_lag * 1000, 3),
+            "max_tick_lag_ms": round(self._max_lag * 1000, 3),
+            "avg_tick_lag_ms": round(self._total_lag / self._ticks * 1000, 3)
+            if self._ticks
+            else 0.0,
+            "frames_sent": self._frames_sent,
+            "late_frames": self._late_frames,
+            "deferred_frames": self._deferred,
+            "chunk_waits": self._chunk_waits,
+            "max_batch": self._max_batch,
+            "send_errors": self._send_errors,
+        }
+
+
+# Global scheduler instance
+playback_scheduler = PlaybackScheduler(
+    tick_seconds=settings.playback_tick_seconds,
+    slots=settings.playback_wheel_slots,
+)
@@ -3,37 +3,177 @@ Playback service for managing stock data playback sessions.
 """
 
 import logging
+import threading
+import time
 import uuid
-from typing import Dict, List, Optional
+from collections import OrderedDict
+from datetime import date, timedelta
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
 
+import numpy as np
 import pandas as pd
 
-from ..models.playback import CandleData
-from ..utils.stock_fetcher import fetch_stock_data, fetch_stock_data_by_period
+from ..config import settings
+from ..helpers.yfinance import DataRetrievalError, validate_ticker_symbol
+from ..models.playback import CandleData, PlaybackSessionInfo
+from ..utils.bar_pack import get_bar_pack
+from ..utils.bar_store import period_to_date_range
+from ..utils.cursor_token import (
+    Cursor,
+    InvalidCursorTokenError,
+    decode_cursor,
+    encode_cursor,
+    is_cursor_token,
+)
+from ..utils.session_store import SessionStore, session_store
+from ..utils.stock_fetcher import (
+    fetch_intraday_data,
+    fetch_stock_data,
+    fetch_stock_data_by_period,
+)
+from .bar_series import BarSeries, align_frames
+from .dataset_registry import Dataset, DatasetKey, Loaded, dataset_registry
+from .indicators import IndicatorSpec, series_between, values_at
+from .intrabar import bar_path, iter_paths
+from .intraday import INTRADAY_LOOKBACK_DAYS, READY_BARS, ChunkedBars
+from .resample import ResampleError, resampled_between
+from .running_stats import get_running_stats, window_price_range
 
 logger = logging.getLogger(__name__)
 
+# Rough per-session cost of Python objects besides the shared bar arrays
+SESSION_OVERHEAD_BYTES = 2048
+
+# Joins the symbols of a basket in its dataset key, lead symbol first
+BASKET_SEPARATOR = ","
+
+
+def make_dataset_key(
+    symbol: str,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    period: Optional[str] = None,
+    symbols: Optional[List[str]] = None,
+) -> DatasetKey:
+    """
+    Build the dataset key for a playback request.
+
+    Period requests are pinned to today's date, since '3mo' means a different
+    range tomorrow. Baskets key on all their symbols, lead symbol first.
+    """
+    symbol = validate_ticker_symbol(symbol)
+    if symbols:
+        basket = dict.fromkeys([symbol, *(validate_ticker_symbol(s) for s in symbols)])
+        symbol = BASKET_SEPARATOR.join(basket)
+    if start_date and end_date:
+        return DatasetKey(symbol, start_date, end_date, None)
+    return DatasetKey(symbol, None, date.today().isoformat(), period or "3mo")
+
 
 class PlaybackSession:
-    """Represents a single playback session."""
+    """
+    Represents a single playback session.
+
+    The session owns only its cursor; bars live in a shared, read-only
+    dataset that other sessions on the same symbol and range also reference.
+    """
 
-    def __init__(self, playback_id: str, symbol: str, data: pd.DataFrame) -> None:
+    def __init__(self, playback_id: str, symbol: str, dataset: Dataset) -> None:
         """
         Initialize a playback session.
 
         Args:
             playback_id: Unique identifier for this session
             symbol: Stock ticker symbol
-            data: DataFrame containing the stock data
+            dataset: Shared array-backed stock data
         """
         self.playback_id = playback_id
         self.symbol = symbol
-        self.data = data
+        self.dataset = dataset
+        self.bars = dataset.bars
+        self.basket = list(dataset.members)  # Symbols replayed in sync, empty for one symbol
         self.current_index = 0
+        self.created_at = time.time()
+        self.last_access = self.created_at
+        self.revision = ""  # Stamp of the stored state this object reflects
+        self.parent_id: Optional[str] = None  # Session this one was forked from
 
         # Calculate price range for all data
-        self.min_price = float(data["Low"].min())
-        self.max_price = float(data["High"].max())
+        self.min_price = float(self.bars.low.min())
+        self.max_price = float(self.bars.high.max())
+
+    def touch(self) -> None:
+        """Record an access for idle-timeout and LRU eviction."""
+        self.last_access = time.time()
+
+    def to_state(self) -> Dict[str, Any]:
+        """
+        Serialize the cursor for the session store.
+
+        Bars are not included: they are referenced by dataset key plus the
+        first and last dates, which reload the exact same range on any worker.
+        """
+        return {
+            "symbol": self.symbol,
+            "dataset": list(self.dataset.key),
+            "range": self.get_date_range(),
+            "index": self.current_index,
+            "created_at": self.created_at,
+            "last_access": self.last_access,
+            "rev": self.revision,
+            "parent": self.parent_id,
+        }
+
+    def get_date_range(self) -> List[str]:
+        """Get the first and last trading dates, which pin the exact bars on reload."""
+        return (
+            self.bars.slice(0, 1).dates()
+            + self.bars.slice(len(self.bars) - 1, len(self.bars)).dates()
+        )
+
+    def apply_state(self, state: Dict[str, Any]) -> None:
+        """Adopt a cursor written to the store by another worker."""
+        self.current_index = min(max(int(state["index"]), 0), len(self.bars))
+        self.created_at = state.get("created_at", self.created_at)
+        self.revision = state.get("rev", "")
+        self.parent_id = state.get("parent")
+
+    def estimated_bytes(self) -> int:
+        """Estimate the memory attributable to this session (its share of the dataset)."""
+        return self.dataset.nbytes // max(self.dataset.refcount, 1) + self.private_bytes()
+
+    def private_bytes(self) -> int:
+        """Memory held by this session alone, not shared through its dataset."""
+        return SESSION_OVERHEAD_BYTES
+
+    def ensure_ready(self) -> None:
+        """Load whatever the next request needs; called off the event loop. No-op here."""
+
+    def is_ready(self, count: int = 1) -> bool:
+        """
+        Check whether the next bars can be read on the event loop without loading.
+
+        Args:
+            count: Bars about to be read from the cursor
+
+        Returns:
+            Always True; daily bars are resident
+        """
+        return True
+
+    def branch(self, playback_id: str) -> "PlaybackSession":
+        """
+        Create a session at the same cursor that shares this session's dataset.
+
+        Args:
+            playback_id: ID of the new session
+
+        Returns:
+            New session holding its own dataset reference
+        """
+        child = PlaybackSession(playback_id, self.symbol, dataset_registry.retain(self.dataset))
+        child.current_index = self.current_index
+        return child
 
     def get_price_range(self) -> dict:
         """Get the price range of all data."""
@@ -44,20 +184,11 @@ class PlaybackSession:
 
     def get_current(self) -> Optional[CandleData]:
         """Get current candle data."""
-        if self.current_index >= len(self.data):
+        if self.current_index >= len(self.bars):
             return None
+        return self.bars.candle_at(self.current_index)
 
-        row = self.data.iloc[self.current_index]
-        return CandleData(
-            timestamp=row.name.to_pydatetime(),
-            open=float(row["Open"]),
-            high=float(row["High"]),
-            low=float(row["Low"]),
-            close=float(row["Close"]),
-            volume=int(row["Volume"]),
-        )
-
-    def next(self, count: int = 1) -> List[CandleData]:
+    def next(self, count: int = 1) -> BarSeries:
         """
         Get next N candles and advance position.
 
@@ -65,19 +196,183 @@ class PlaybackSession:
             count: Number of candles to retrieve
 
         Returns:
-            List of candle data
+            Zero-copy window over the candles passed
+        """
+        start = self.current_index
+        stop = min(start + count, len(self.bars))
+        self.current_index = stop
+        return self.bars.slice(start, stop)
+
+    def get_basket(self, index: Optional[int] = None) -> Optional[Dict[str, Optional[CandleData]]]:
+        """
+        Get the bar of every basket symbol at one revealed position.
+
+        Args:
+            index: Bar index, defaults to the bar at the cursor
+
+        Returns:
+            Candle by symbol (None before a symbol's first bar), or None for single-symbol sessions
+        """
+        if not self.basket:
+            return None
+        revealed = self.get_revealed_count()
+        index = revealed - 1 if index is None else min(index, revealed - 1)
+        if index < 0:
+            return None
+        basket = {}
+        for symbol, bars in self.dataset.members.items():
+            close = bars.close[index]
+            basket[symbol] = bars.candle_at(index) if close == close else None
+        return basket
+
+    def get_revealed_count(self) -> int:
+        """Get the number of bars the client has seen (up to and including the cursor)."""
+        return min(self.current_index + 1, len(self.bars))
+
+    def window(self, start: int, stop: Optional[int] = None) -> BarSeries:
+        """
+        Get already revealed candles in [start, stop) without moving the cursor.
+
+        Args:
+            start: First index (inclusive)
+            stop: Last index (exclusive), defaults to the end of the revealed bars
+
+        Returns:
+            Zero-copy window, clamped so future bars are never exposed
+        """
+        revealed = self.get_revealed_count()
+        stop = revealed if stop is None else min(stop, revealed)
+        start = min(max(start, 0), stop)
+        return self.bars.slice(start, stop)
+
+    def resampled_window(self, rule: str, start: int, stop: Optional[int] = None) -> BarSeries:
+        """
+        Get revealed bars in [start, stop) as coarser candles, clamped like window().
+
+        Args:
+            rule: Normalized timeframe rule (see resample.parse_rule)
+            start: First daily index (inclusive)
+            stop: Last daily index (exclusive), defaults to the end of the revealed bars
+
+        Returns:
+            Candles covering the range; the one holding the cursor only aggregates revealed bars
+        """
+        revealed = self.get_revealed_count()
+        stop = revealed if stop is None else min(stop, revealed)
+        start = min(max(start, 0), stop)
+        return resampled_between(self.dataset, rule, start, stop)
+
+    def get_stats(self, index: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """
+        Get running statistics over revealed bars in O(1).
+
+        Unlike get_price_range(), nothing after the cursor contributes.
+
+        Args:
+            index: Last bar to include, defaults to the bar at the cursor
+
+        Returns:
+            Dict with min_price, max_price, cum_volume and cum_return, or None if nothing is revealed
+        """
+        revealed = self.get_revealed_count()
+        index = revealed - 1 if index is None else min(index, revealed - 1)
+        if index < 0:
+            return None
+        return get_running_stats(self.dataset).at(index)
+
+    def get_window_price_range(self, start: int, stop: int) -> Optional[Dict[str, float]]:
+        """
+        Get the low/high of revealed bars in [start, stop) in O(1).
+
+        Returns:
+            Dict with min_price and max_price, or None for an empty window
+        """
+        stop = min(stop, self.get_revealed_count())
+        start = max(start, 0)
+        if start >= stop:
+            return None
+        return window_price_range(self.dataset, start, stop)
+
+    def indicator_values(
+        self, specs: List[IndicatorSpec], index: Optional[int] = None
+    ) -> Optional[Dict[str, Dict[str, Optional[float]]]]:
+        """
+        Get indicator values at one revealed bar.
+
+        Args:
+            specs: Parsed indicators; computed once per shared dataset
+            index: Bar index, defaults to the bar at the cursor
+
+        Returns:
+            Values keyed by indicator, or None if nothing was requested or no bar is revealed
+        """
+        if not specs:
+            return None
+        revealed = self.get_revealed_count()
+        index = revealed - 1 if index is None else min(index, revealed - 1)
+        if index < 0:
+            return None
+        return values_at(self.dataset, specs, index)
+
+    def indicator_window(
+        self, specs: List[IndicatorSpec], start: int, stop: Optional[int] = None
+    ) -> Dict[str, Dict[str, List[Optional[float]]]]:
+        """
+        Get indicator series for revealed bars in [start, stop), clamped like window().
+
+        Args:
+            specs: Parsed indicators
+            start: First index (inclusive)
+            stop: Last index (exclusive), defaults to the end of the revealed bars
+
+        Returns:
+            Series keyed by indicator and output name
+        """
+        revealed = self.get_revealed_count()
+        stop = revealed if stop is None else min(stop, revealed)
+        start = min(max(start, 0), stop)
+        return series_between(self.dataset, specs, start, stop)
+
+    def intrabar_path(
+        self, index: Optional[int] = None, steps: Optional[int] = None
+    ) -> Optional[np.ndarray]:
+        """
+        Get the deterministic synthetic tick path of one revealed bar.
+
+        Args:
+            index: Bar index, defaults to the bar at the cursor
+            steps: Ticks per bar, defaults to settings.intrabar_steps
+
+        Returns:
+            Read-only array from open to close, or None if the bar is not revealed
         """
-        result = []
-        for _ in range(count):
-            if self.current_index >= len(self.data):
-                break
+        revealed = self.get_revealed_count()
+        index = revealed - 1 if index is None else index
+        if not 0 <= index < revealed:
+            return None
+        return bar_path(
+            self.bars, index, steps or settings.intrabar_steps, settings.intrabar_seed, self.symbol
+        )
 
-            candle = self.get_current()
-            if candle:
-                result.append(candle)
-            self.current_index += 1
+    def iter_intrabar(
+        self, start: int, stop: Optional[int] = None, steps: Optional[int] = None
+    ) -> Iterator[Tuple[int, np.ndarray]]:
+        """
+        Lazily yield (index, tick path) for revealed bars in [start, stop).
 
-        return result
+        Paths are synthesized one bar at a time as the iterator advances and
+        are never materialized for the whole session.
+        """
+        revealed = self.get_revealed_count()
+        stop = revealed if stop is None else min(stop, revealed)
+        return iter_paths(
+            self.bars,
+            start,
+            stop,
+            steps or settings.intrabar_steps,
+            settings.intrabar_seed,
+            self.symbol,
+        )
 
     def seek(self, index: int) -> bool:
         """
@@ -89,18 +384,18 @@ class PlaybackSession:
         Returns:
             True if successful, False if out of range
         """
-        if 0 <= index < len(self.data):
+        if 0 <= index < len(self.bars):
             self.current_index = index
             return True
         return False
 
     def has_more(self) -> bool:
         """Check if there are more data points."""
-        return self.current_index < len(self.data)
+        return self.current_index < len(self.bars)
 
     def get_total_count(self) -> int:
         """Get total number of data points."""
-        return len(self.data)
+        return len(self.bars)
 
     def get_all_dates(self) -> List[str]:
         """
@@ -109,15 +404,311 @@ class PlaybackSession:
         Returns:
             List of date strings in YYYY-MM-DD format
         """
-        return [date.strftime("%Y-%m-%d") for date in self.data.index]
+        return self.bars.dates()
+
+
+class CursorSession(PlaybackSession):
+    """
+    Session rebuilt for one request from a signed cursor token.
+
+    Nothing about it is kept on the server: its playback_id is the token for
+    the current cursor, re-signed whenever it is read, so responses always
+    carry the token for the next request.
+    """
+
+    def __init__(self, symbol: str, dataset: Dataset, index: int = 0) -> None:
+        """
+        Initialize a cursor session.
+
+        Args:
+            symbol: Stock ticker symbol
+            dataset: Bars for the exact range encoded in the token
+            index: Cursor position
+        """
+        super().__init__("", symbol, dataset)
+        self.current_index = min(index, len(self.bars))
+        self._range = self.get_date_range()
+
+    @property
+    def playback_id(self) -> str:
+        return encode_cursor(Cursor(self.dataset.key.symbol, *self._range, self.current_index))
+
+    @playback_id.setter
+    def playback_id(self, value: str) -> None:
+        # Derived from the cursor; the base initializer's assignment is ignored
+        pass
+
+
+class IntradaySession(PlaybackSession):
+    """
+    Session replaying intraday bars loaded in chunks of trading days.
+
+    The session's dataset holds the daily bars of the same range, which give
+    the trading calendar and the overall price range; the intraday bars live
+    in ChunkedBars and only the chunks around the cursor stay resident.
+    Features that precompute over the whole dataset (running stats and
+    indicators) are not available for intraday sessions.
+    """
+
+    def __init__(
+        self,
+        playback_id: str,
+        symbol: str,
+        dataset: Dataset,
+        interval: str,
+        loader: Callable[[str, str, str, str], Optional[BarSeries]],
+        lengths: Optional[List[Optional[int]]] = None,
+    ) -> None:
+        """
+        Initialize an intraday session.
+
+        Args:
+            playback_id: Unique identifier for this session
+            symbol: Stock ticker symbol
+            dataset: Shared daily bars of the replayed trading days
+            interval: Intraday bar interval (e.g., '5m')
+            loader: Function (symbol, first day, last day, interval) loading intraday bars
+            lengths: Bar counts per chunk known from a stored or parent session
+        """
+        super().__init__(playback_id, symbol, dataset)
+        self.interval = interval
+        self._loader = loader
+        self.chunks = ChunkedBars(
+            dataset.bars.dates(),
+            lambda first, last: loader(symbol, first, last, interval),
+            settings.intraday_chunk_days,
+            lengths,
+        )
+
+    def to_state(self) -> Dict[str, Any]:
+        """Serialize the cursor plus the interval and the chunk lengths learned so far."""
+        state = super().to_state()
+        state["interval"] = self.interval
+        state["chunks"] = self.chunks.lengths
+        return state
+
+    def apply_state(self, state: Dict[str, Any]) -> None:
+        """Adopt a cursor and any chunk lengths another worker learned."""
+        super().apply_state(state)
+        self.current_index = max(int(state["index"]), 0)
+        for k, length in enumerate(state.get("chunks", [])[: self.chunks.chunk_count]):
+            if self.chunks.lengths[k] is None:
+                self.chunks.lengths[k] = length
+
+    def private_bytes(self) -> int:
+        """Resident chunks belong to this session alone."""
+        return SESSION_OVERHEAD_BYTES + self.chunks.nbytes
+
+    def branch(self, playback_id: str) -> "IntradaySession":
+        """Create a session at the same cursor; chunks reload through the bar cache."""
+        child = IntradaySession(
+            playback_id,
+            self.symbol,
+            dataset_registry.retain(self.dataset),
+            self.interval,
+            self._loader,
+            self.chunks.lengths,
+        )
+        child.current_index = self.current_index
+        return child
+
+    def ensure_ready(self) -> None:
+        """Load the chunks the cursor and the next request can reach, then rebalance."""
+        self.chunks.locate(self.current_index)
+        self.chunks.locate(self.current_index + READY_BARS)
+        self._rebalance()
+
+    def is_ready(self, count: int = 1) -> bool:
+        """
+        Check whether the next bars, and whether more follow, can be read without loading.
+
+        If not, the chunks they fall in are prefetched so a later call succeeds.
+
+        Args:
+            count: Bars about to be read from the cursor
+        """
+        start, stop = self.current_index, self.current_index + count + 1
+        if self.chunks.ready(start, stop):
+            return True
+        for k in range(self.chunks.peek(start), self.chunks.peek(stop - 1) + 1):
+            self.chunks.prefetch(k)
+        return False
+
+    def _rebalance(self) -> None:
+        """
+        Prefetch chunks ahead of the cursor and drop replayed ones behind it.
+
+        Runs after every move, possibly on the event loop, so it never loads
+        synchronously.
+        """
+        current = self.chunks.peek(self.current_index)
+        ahead = self.chunks.peek(self.current_index + READY_BARS)
+        for k in range(current + 1, ahead + 1 + settings.intraday_prefetch_chunks):
+            self.chunks.prefetch(k)
+        self.chunks.evict(
+            current - settings.intraday_keep_chunks, ahead + settings.intraday_prefetch_chunks
+        )
+
+    def get_current(self) -> Optional[CandleData]:
+        """Get current candle data."""
+        located = self.chunks.bar(self.current_index)
+        if located is None:
+            return None
+        bars, local = located
+        return bars.candle_at(local)
+
+    def next(self, count: int = 1) -> BarSeries:
+        """
+        Get next N candles and advance position.
+
+        Returns:
+            Window over the candles passed, copied only when it spans two chunks
+        """
+        window = self.chunks.slice(self.current_index, self.current_index + count)
+        self.current_index += len(window)
+        self._rebalance()
+        return window
+
+    def get_revealed_count(self) -> int:
+        """Get the number of bars the client has seen (up to and including the cursor)."""
+        return self.chunks.clamp(self.current_index + 1)
+
+    def window(self, start: int, stop: Optional[int] = None) -> BarSeries:
+        """
+        Get already revealed candles in [start, stop) without moving the cursor.
+
+        Chunks dropped behind the cursor are reloaded through the bar cache.
+        """
+        revealed = self.get_revealed_count()
+        stop = revealed if stop is None else min(stop, revealed)
+        start = min(max(start, 0), stop)
+        return self.chunks.slice(start, stop)
+
+    def get_stats(self, index: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """Running statistics need every bar resident; not available intraday."""
+        return None
+
+    def resampled_window(self, rule: str, start: int, stop: Optional[int] = None) -> BarSeries:
+        """
+        Coarser timeframes aggregate daily bars; not available intraday.
+
+        Raises:
+            ResampleError: Always
+        """
+        raise ResampleError("Timeframes apply to daily playback only")
+
+    def get_window_price_range(self, start: int, stop: int) -> Optional[Dict[str, float]]:
+        """Get the low/high of revealed bars in [start, stop) by scanning them."""
+        bars = self.window(start, stop)
+        if len(bars) == 0:
+            return None
+        return {"min_price": float(bars.low.min()), "max_price": float(bars.high.max())}
+
+    def indicator_values(
+        self, specs: List[IndicatorSpec], index: Optional[int] = None
+    ) -> Optional[Dict[str, Dict[str, Optional[float]]]]:
+        """Indicators are computed over the whole dataset; not available intraday."""
+        return None
+
+    def indicator_window(
+        self, specs: List[IndicatorSpec], start: int, stop: Optional[int] = None
+    ) -> Dict[str, Dict[str, List[Optional[float]]]]:
+        """Indicators are computed over the whole dataset; not available intraday."""
+        return {}
+
+    def intrabar_path(
+        self, index: Optional[int] = None, steps: Optional[int] = None
+    ) -> Optional[np.ndarray]:
+        """Get the synthetic tick path of one revealed bar."""
+        revealed = self.get_revealed_count()
+        index = revealed - 1 if index is None else index
+        if not 0 <= index < revealed:
+            return None
+        bars, local = self.chunks.bar(index)
+        return bar_path(
+            bars, local, steps or settings.intrabar_steps, settings.intrabar_seed, self.symbol
+        )
+
+    def iter_intrabar(
+        self, start: int, stop: Optional[int] = None, steps: Optional[int] = None
+    ) -> Iterator[Tuple[int, np.ndarray]]:
+        """Lazily yield (index, tick path) for revealed bars in [start, stop)."""
+        revealed = self.get_revealed_count()
+        stop = revealed if stop is None else min(stop, revealed)
+        for index in range(max(start, 0), stop):
+            yield index, self.intrabar_path(index, steps)
+
+    def seek(self, index: int) -> bool:
+        """
+        Seek to specific position, loading chunk lengths up to it if needed.
+
+        Returns:
+            True if successful, False if out of range
+        """
+        if index < 0 or self.chunks.locate(index) is None:
+            return False
+        self.current_index = index
+        self._rebalance()
+        return True
+
+    def has_more(self) -> bool:
+        """Check if there are more data points."""
+        return self.chunks.locate(self.current_index) is not None
+
+    def get_total_count(self) -> int:
+        """Get total number of data points, estimated until every chunk has loaded once."""
+        return self.chunks.estimated_length()
 
 
 class PlaybackService:
-    """Service for managing multiple playback sessions."""
+    """
+    Service for managing multiple playback sessions.
+
+    The cursor of every session lives in the shared session store, so any
+    worker can serve any playback_id. Sessions materialized in this process
+    are a cache kept in LRU order: the least recently used ones are dropped
+    when the estimated memory exceeds the budget and are restored from the
+    store on their next request. Sessions idle for longer than the TTL expire
+    from the store and eviction listeners are notified.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = settings.playback_session_ttl_seconds,
+        max_bytes: int = settings.playback_max_bytes,
+        store: Optional[SessionStore] = None,
+    ) -> None:
+        """
+        Initialize playback service.
+
+        Args:
+            ttl_seconds: Idle time after which a session is evicted
+            max_bytes: Memory budget for all sessions
+            store: Session store, defaults to the configured global store
+        """
+        self.sessions: "OrderedDict[str, PlaybackSession]" = OrderedDict()
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.store = store if store is not None else session_store
+        self.evicted_count = 0
+        self._lock = threading.RLock()
+        self._eviction_listeners: List[Callable[[str], None]] = []
+        self._last_purge = 0.0
+        self._streams: Dict[str, int] = {}  # playback_id -> open streams in this process
+        self._last_stream_refresh = 0.0
 
-    def __init__(self) -> None:
-        """Initialize playback service."""
-        self.sessions: Dict[str, PlaybackSession] = {}
+    @staticmethod
+    def _store_key(playback_id: str) -> str:
+        return f"playback:{playback_id}"
+
+    def add_eviction_listener(self, listener: Callable[[str], None]) -> None:
+        """
+        Register a callback invoked with the playback_id of every evicted session.
+
+        Args:
+            listener: Callback, e.g. to drop resources linked to the session
+        """
+        self._eviction_listeners.append(listener)
 
     def create_session(
         self,
@@ -125,6 +716,8 @@ class PlaybackService:
         start_date: Optional[str] = None,
         end_date: Optional[str] = None,
         period: Optional[str] = None,
+        symbols: Optional[List[str]] = None,
+        interval: str = "1d",
     ) -> Optional[PlaybackSession]:
         """
         Create a new playback session.
@@ -134,45 +727,410 @@ class PlaybackService:
             start_date: Start date (YYYY-MM-DD), used to fetch exact date range
             end_date: End date (YYYY-MM-DD), used to fetch exact date range
             period: Period string (e.g., '3mo', '1y'), alternative to date range
+            symbols: Other symbols replayed in sync with symbol on its cursor
+            interval: Bar interval; intraday intervals replay one symbol in chunks
 
         Returns:
             PlaybackSession if successful, None otherwise
         """
+        if interval != "1d":
+            return self.create_intraday_session(symbol, interval, start_date, end_date, period)
+
         try:
-            # Fetch data using either date range or period
-            if start_date and end_date:
-                # Use date range directly with yfinance
-                df = fetch_stock_data(symbol, start_date, end_date)
-                logger.info(f"Fetching data for {symbol} from {start_date} to {end_date}")
-            elif period:
-                # Use period
-                df = fetch_stock_data_by_period(symbol, period)
-                logger.info(f"Fetching data for {symbol} with period {period}")
-            else:
-                # Default to 3mo
-                df = fetch_stock_data_by_period(symbol, "3mo")
-                logger.info(f"Fetching data for {symbol} with default period 3mo")
+            key = make_dataset_key(symbol, start_date, end_date, period, symbols)
+            dataset = dataset_registry.acquire(
+                key, lambda: self.load_dataset(key.symbol, start_date, end_date, period)
+            )
 
-            if df is None or df.empty:
+            if dataset is None:
                 logger.error(f"No data fetched for {symbol}")
                 return None
 
-            # Remove timezone info to avoid comparison issues
-            if df.index.tz is not None:
-                df.index = df.index.tz_localize(None)
-
             # Create session
             playback_id = str(uuid.uuid4())
-            session = PlaybackSession(playback_id, symbol, df)
-            self.sessions[playback_id] = session
+            session = PlaybackSession(playback_id, symbol, dataset)
+            self.add_session(session)
 
-            logger.info(f"Created playback session {playback_id} for {symbol} with {len(df)} bars")
+            logger.info(
+                f"Created playback session {playback_id} for {symbol} with {len(dataset.bars)} bars "
+                f"(dataset {key} shared by {dataset.refcount})"
+            )
             return session
 
         except Exception as e:
             logger.error(f"Error creating playback session: {e}")
             return None
 
+    def create_intraday_session(
+        self,
+        symbol: str,
+        interval: str,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        period: Optional[str] = None,
+    ) -> Optional[IntradaySession]:
+        """
+        Create a playback session over intraday bars loaded chunk by chunk.
+
+        The trading days come from the daily bars of the range, trimmed to the
+        days Yahoo Finance still serves at this interval. No intraday bar is
+        fetched until the first request reaches it.
+
+        Args:
+            symbol: Stock ticker symbol
+            interval: Intraday interval, a key of INTRADAY_LOOKBACK_DAYS
+            start_date: Start date (YYYY-MM-DD), used to fetch exact date range
+            end_date: End date (YYYY-MM-DD), used to fetch exact date range
+            period: Period string (e.g., '1mo'), alternative to date range
+
+        Returns:
+            IntradaySession if successful, None otherwise
+        """
+        try:
+            daily = self.load_bars(symbol, start_date, end_date, period)
+            if daily is None:
+                logger.error(f"No data fetched for {symbol}")
+                return None
+
+            lookback = np.timedelta64(INTRADAY_LOOKBACK_DAYS[interval] - 1, "D")
+            cutoff = (np.datetime64(date.today(), "D") - lookback).astype("datetime64[ns]")
+            daily = daily.slice(
+                int(np.searchsorted(daily.timestamps, cutoff.astype(np.int64))), len(daily)
+            )
+            if len(daily) == 0:
+                logger.error(f"No trading days of {symbol} within the {interval} lookback")
+                return None
+
+            days = daily.dates()
+            key = DatasetKey(validate_ticker_symbol(symbol), days[0], days[-1], None)
+            dataset = dataset_registry.acquire(key, lambda: daily)
+
+            session = IntradaySession(
+                str(uuid.uuid4()), symbol, dataset, interval, self.load_intraday
+            )
+            session.ensure_ready()
+            self.add_session(session)
+
+            logger.info(
+                f"Created {interval} playback session {session.playback_id} for {symbol} "
+                f"over {len(daily)} trading days in {session.chunks.chunk_count} chunks"
+            )
+            return session
+
+        except Exception as e:
+            logger.error(f"Error creating intraday playback session: {e}")
+            return None
+
+    def fork_session(self, playback_id: str) -> Optional[PlaybackSession]:
+        """
+        Branch a session at its current cursor.
+
+        The child references the parent's dataset instead of loading or
+        copying bars, so forking costs the same for any data size.
+
+        Args:
+            playback_id: Parent session ID
+
+        Returns:
+            Child PlaybackSession, or None if the parent does not exist
+        """
+        parent = self.get_session(playback_id)
+        if parent is None:
+            return None
+
+        child = parent.branch(str(uuid.uuid4()))
+        child.parent_id = parent.playback_id
+        self.add_session(child)
+
+        logger.info(
+            f"Forked playback session {parent.playback_id} at index {parent.current_index} "
+            f"into {child.playback_id}"
+        )
+        return child
+
+    def create_cursor_session(
+        self,
+        symbol: str,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        period: Optional[str] = None,
+        symbols: Optional[List[str]] = None,
+    ) -> Optional[CursorSession]:
+        """
+        Start a stateless playback whose playback_id is a signed cursor token.
+
+        The bars come from the shared bar caches and no session is registered,
+        so any worker holding the token secret can serve the follow-up requests.
+
+        Args:
+            symbol: Stock ticker symbol
+            start_date: Start date (YYYY-MM-DD), used to fetch exact date range
+            end_date: End date (YYYY-MM-DD), used to fetch exact date range
+            period: Period string (e.g., '3mo', '1y'), alternative to date range
+            symbols: Other symbols replayed in sync with symbol on its cursor
+
+        Returns:
+            CursorSession if successful, None otherwise
+        """
+        try:
+            key = make_dataset_key(symbol, start_date, end_date, period, symbols)
+            dataset = self._unregistered_dataset(key, start_date, end_date, period)
+            if dataset is None:
+                logger.error(f"No data fetched for {symbol}")
+                return None
+            return CursorSession(key.symbol.split(BASKET_SEPARATOR)[0], dataset)
+
+        except Exception as e:
+            logger.error(f"Error creating stateless playback: {e}")
+            return None
+
+    def resolve_cursor(self, token: str) -> Optional[CursorSession]:
+        """
+        Rebuild a stateless session from its cursor token.
+
+        Args:
+            token: Signed cursor token
+
+        Returns:
+            CursorSession, or None if the token is invalid or its bars are unavailable
+        """
+        try:
+            cursor = decode_cursor(token)
+        except InvalidCursorTokenError as e:
+            logger.warning(f"Rejected cursor token: {e}")
+            return None
+
+        key = DatasetKey(cursor.symbol, cursor.first_date, cursor.last_date, None)
+        dataset = self._unregistered_dataset(key, cursor.first_date, cursor.last_date, None)
+        if dataset is None:
+            logger.error(f"Could not reload bars for cursor {key}")
+            return None
+        return CursorSession(cursor.symbol.split(BASKET_SEPARATOR)[0], dataset, cursor.index)
+
+    def _unregistered_dataset(
+        self,
+        key: DatasetKey,
+        start_date: Optional[str],
+        end_date: Optional[str],
+        period: Optional[str],
+    ) -> Optional[Dataset]:
+        """Reuse a dataset held by sessions, or load one that nothing registers."""
+        dataset = dataset_registry.get(key)
+        if dataset is not None:
+            return dataset
+        loaded = self.load_dataset(key.symbol, start_date, end_date, period)
+        bars, members = loaded if isinstance(loaded, tuple) else (loaded, {})
+        if bars is None or len(bars) == 0:
+            return None
+        return Dataset(key, bars, members=members)
+
+    def add_session(self, session: PlaybackSession) -> None:
+        """
+        Register a materialized session in this process and in the store.
+
+        Args:
+            session: Session holding a dataset reference
+        """
+        self.evict_expired()
+        with self._lock:
+            self.sessions[session.playback_id] = session
+            self.sessions.move_to_end(session.playback_id)
+            self._enforce_budget()
+        self.save_session(session)
+
+    def save_session(self, session: PlaybackSession) -> None:
+        """
+        Write the session cursor to the store after it moved.
+
+        Args:
+            session: Session to persist
+        """
+        if isinstance(session, CursorSession):
+            # The cursor travels with the client in its token
+            return
+        session.revision = uuid.uuid4().hex[:12]
+        remaining = session.last_access + self.ttl_seconds - time.time()
+        self.store.set(self._store_key(session.playback_id), session.to_state(), remaining)
+
+    def load_bars(
+        self,
+        symbol: str,
+        start_date: Optional[str],
+        end_date: Optional[str],
+        period: Optional[str],
+    ) -> Optional[BarSeries]:
+        """Fetch stock data and convert it once to contiguous arrays."""
+        packed = self.load_packed(symbol, start_date, end_date, period)
+        if packed is not None:
+            return packed
+
+        # Fetch data using either date range or period
+        if start_date and end_date:
+            # Use date range directly with yfinance
+            df = fetch_stock_data(symbol, start_date, end_date)
+            logger.info(f"Fetching data for {symbol} from {start_date} to {end_date}")
+        elif period:
+            # Use period
+            df = fetch_stock_data_by_period(symbol, period)
+            logger.info(f"Fetching data for {symbol} with period {period}")
+        else:
+            # Default to 3mo
+            df = fetch_stock_data_by_period(symbol, "3mo")
+            logger.info(f"Fetching data for {symbol} with default period 3mo")
+
+        if df is None or df.empty:
+            return None
+
+        # Timezone info is dropped here to avoid comparison issues
+        return BarSeries.from_dataframe(df)
+
+    def load_packed(
+        self,
+        symbol: str,
+        start_date: Optional[str],
+        end_date: Optional[str],
+        period: Optional[str],
+    ) -> Optional[BarSeries]:
+        """
+        Load bars as zero-copy views of the memory-mapped bar pack.
+
+        Only days after the pack (normally just today) are fetched and
+        appended, which copies the columns once; ranges that end inside the
+        pack stay views onto the shared page cache.
+
+        Returns:
+            BarSeries, or None if no pack covers the start of the range
+        """
+        pack = get_bar_pack() if settings.bar_store_enabled else None
+        if pack is None:
+            return None
+        if start_date and end_date:
+            date_range = (
+                pd.Timestamp(start_date).to_pydatetime(),
+                pd.Timestamp(end_date).to_pydatetime(),
+            )
+        else:
+            date_range = period_to_date_range(period or "3mo")
+        symbol = validate_ticker_symbol(symbol)
+        if date_range is None or not pack.covers(symbol, date_range[0]):
+            return None
+
+        start, end = date_range
+        bars = BarSeries(**pack.columns(symbol, start, end))
+        through = pack.entries[symbol].through
+        if end > through:
+            tail_start = (through + timedelta(days=1)).strftime("%Y-%m-%d")
+            tail = fetch_stock_data(symbol, tail_start, end.strftime("%Y-%m-%d"))
+            if tail is not None and not tail.empty:
+                bars = BarSeries.concat([bars, BarSeries.from_dataframe(tail)])
+
+        logger.info(f"Loaded {len(bars)} bars for {symbol} from bar pack {pack.build_id}")
+        return bars if len(bars) else None
+
+    def load_intraday(
+        self, symbol: str, first_day: str, last_day: str, interval: str
+    ) -> Optional[BarSeries]:
+        """
+        Fetch the intraday bars of a range of trading days through the bar cache.
+
+        Returns:
+            BarSeries, or None if the range has no bars
+
+        Raises:
+            DataRetrievalError: If the fetch failed, so no chunk length is recorded
+        """
+        df = fetch_intraday_data(symbol, first_day, last_day, interval)
+        if df is None:
+            raise DataRetrievalError(
+                f"Failed to fetch {interval} bars for {symbol} {first_day}~{last_day}"
+            )
+        if df.empty:
+            return None
+        return BarSeries.from_dataframe(df)
+
+    def load_dataset(
+        self,
+        key_symbol: str,
+        start_date: Optional[str],
+        end_date: Optional[str],
+        period: Optional[str],
+    ) -> Optional[Loaded]:
+        """Load the bars for a dataset key symbol, which names one symbol or a basket."""
+        symbols = key_symbol.split(BASKET_SEPARATOR)
+        if len(symbols) == 1:
+            return self.load_bars(key_symbol, start_date, end_date, period)
+        return self.load_basket(symbols, start_date, end_date, period)
+
+    def load_basket(
+        self,
+        symbols: List[str],
+        start_date: Optional[str],
+        end_date: Optional[str],
+        period: Optional[str],
+    ) -> Optional[Tuple[BarSeries, Dict[str, BarSeries]]]:
+        """
+        Fetch every basket symbol and align them on one trading calendar.
+
+        Symbols without data are dropped from the basket; the lead symbol
+        (first) is required.
+
+        Returns:
+            Tuple of (lead bars, aligned bars by symbol), or None if the lead has no data
+        """
+        frames = {}
+        for symbol in symbols:
+            if start_date and end_date:
+                df = fetch_stock_data(symbol, start_date, end_date)
+            else:
+                df = fetch_stock_data_by_period(symbol, period or "3mo")
+            if df is None or df.empty:
+                logger.warning(f"No data for basket symbol {symbol}, dropping it")
+                continue
+            frames[symbol] = df
+
+        if symbols[0] not in frames:
+            return None
+
+        members = align_frames(frames)
+        logger.info(f"Aligned basket {list(members)} on {len(members[symbols[0]])} bars")
+        return members[symbols[0]], members
+
+    def _restore(self, playback_id: str, state: Dict[str, Any]) -> Optional[PlaybackSession]:
+        """Materialize a session created or evicted elsewhere from its stored state."""
+        key = DatasetKey(*state["dataset"])
+        first_date, last_date = state["range"]
+        dataset = dataset_registry.acquire(
+            key, lambda: self.load_dataset(key.symbol, first_date, last_date, None)
+        )
+        if dataset is None:
+            logger.error(f"Could not reload dataset {key} for playback session {playback_id}")
+            return None
+
+        if state.get("interval", "1d") != "1d":
+            session = IntradaySession(
+                playback_id,
+                state["symbol"],
+                dataset,
+                state["interval"],
+                self.load_intraday,
+                state.get("chunks"),
+            )
+        else:
+            session = PlaybackSession(playback_id, state["symbol"], dataset)
+        session.apply_state(state)
+
+        with self._lock:
+            existing = self.sessions.get(playback_id)
+            if existing is not None:
+                # Restored concurrently by another request
+                dataset_registry.release(dataset)
+                return existing
+            self.sessions[playback_id] = session
+            self._enforce_budget()
+
+        logger.info(f"Restored playback session {playback_id} at index {session.current_index}")
+        return session
+
     def get_session(self, playback_id: str) -> Optional[PlaybackSession]:
         """
         Get existing playback session.
@@ -183,7 +1141,56 @@ class PlaybackService:
         Returns:
             PlaybackSession if found, None otherwise
         """
-        return self.sessions.get(playback_id)
+        if is_cursor_token(playback_id):
+            return self.resolve_cursor(playback_id)
+
+        if time.time() - self._last_purge >= 1.0:
+            self.evict_expired()
+
+        state = self.store.get(self._store_key(playback_id))
+        with self._lock:
+            session = self.sessions.get(playback_id)
+            if state is None:
+                if session is not None:
+                    # Deleted or expired by another worker
+                    self._drop(playback_id)
+                return None
+
+        if session is None:
+            session = self._restore(playback_id, state)
+            if session is None:
+                return None
+        elif state.get("rev") != session.revision:
+            # Another worker moved the cursor
+            session.apply_state(state)
+
+        session.ensure_ready()
+        with self._lock:
+            session.touch()
+            if playback_id in self.sessions:
+                self.sessions.move_to_end(playback_id)
+        self._write_back(session, state)
+        return session
+
+    def _write_back(self, session: PlaybackSession, loaded: Dict[str, Any]) -> None:
+        """
+        Persist what a read changed without overwriting concurrent cursor moves.
+
+        A plain access only extends the record's TTL. State learned while
+        reading (e.g. intraday chunk lengths) is written with compare_and_set
+        against the revision that was loaded; if another worker wrote in the
+        meantime its state wins and is adopted on the next read.
+        """
+        key = self._store_key(session.playback_id)
+        volatile = ("rev", "last_access")
+        current = session.to_state()
+        if all(current.get(name) == loaded.get(name) for name in current if name not in volatile):
+            self.store.touch(key, self.ttl_seconds)
+            return
+
+        revision = uuid.uuid4().hex[:12]
+        if self.store.compare_and_set(key, {**current, "rev": revision}, self.ttl_seconds, loaded):
+            session.revision = revision
 
     def delete_session(self, playback_id: str) -> bool:
         """
@@ -195,15 +1202,151 @@ class PlaybackService:
         Returns:
             True if deleted, False if not found
         """
-        if playback_id in self.sessions:
-            del self.sessions[playback_id]
+        deleted = self.store.delete(self._store_key(playback_id))
+        with self._lock:
+            deleted = self._drop(playback_id) or deleted
+        if deleted:
             logger.info(f"Deleted playback session {playback_id}")
-            return True
-        return False
+        return deleted
 
     def get_all_sessions(self) -> List[str]:
-        """Get list of all active session IDs."""
-        return list(self.sessions.keys())
+        """Get list of all session IDs materialized in this process."""
+        with self._lock:
+            return list(self.sessions.keys())
+
+    def get_total_bytes(self) -> int:
+        """Get estimated memory held by all sessions, counting shared datasets once."""
+        with self._lock:
+            return self._total_bytes()
+
+    def _total_bytes(self) -> int:
+        """Distinct dataset bytes plus per-session overhead. Lock held."""
+        datasets = {id(session.dataset): session.dataset for session in self.sessions.values()}
+        return sum(dataset.nbytes for dataset in datasets.values()) + sum(
+            session.private_bytes() for session in self.sessions.values()
+        )
+
+    def list_sessions(self) -> List[PlaybackSessionInfo]:
+        """
+        Describe all sessions materialized in this process, least recently used first.
+
+        Returns:
+            List of PlaybackSessionInfo
+        """
+        self.evict_expired()
+        now = time.time()
+        with self._lock:
+            return [
+                PlaybackSessionInfo(
+                    playback_id=session.playback_id,
+                    symbol=session.symbol,
+                    dataset_key=str(session.dataset.key),
+                    current_index=session.current_index,
+                    total_count=session.get_total_count(),
+                    created_at=session.created_at,
+                    last_access=session.last_access,
+                    idle_seconds=now - session.last_access,
+                    estimated_bytes=session.estimated_bytes(),
+                )
+                for session in self.sessions.values()
+            ]
+
+    def stream_opened(self, playback_id: str) -> None:
+        """
+        Mark a session as streamed by a client of this process.
+
+        A stream advances the cursor in memory and only saves it on control
+        messages, so the session would otherwise look idle to the store.
+        """
+        with self._lock:
+            self._streams[playback_id] = self._streams.get(playback_id, 0) + 1
+
+    def stream_closed(self, playback_id: str) -> None:
+        """Undo stream_opened once the client disconnects."""
+        with self._lock:
+            remaining = self._streams.get(playback_id, 0) - 1
+            if remaining > 0:
+                self._streams[playback_id] = remaining
+            else:
+                self._streams.pop(playback_id, None)
+
+    def _refresh_streamed(self) -> List[str]:
+        """
+        Extend the store TTL of streamed sessions, at most every quarter TTL.
+
+        Returns:
+            IDs of the sessions streamed in this process
+        """
+        with self._lock:
+            streamed = list(self._streams)
+        now = time.time()
+        if streamed and now - self._last_stream_refresh >= self.ttl_seconds / 4:
+            self._last_stream_refresh = now
+            for playback_id in streamed:
+                self.store.touch(self._store_key(playback_id), self.ttl_seconds)
+        return streamed
+
+    def evict_expired(self) -> int:
+        """
+        Evict sessions idle for longer than the TTL.
+
+        Expired store records notify the eviction listeners. Local copies idle
+        for longer than the TTL are dropped too; with a shared store they may
+        still be in use on another worker, so they are only dematerialized.
+        Sessions with an open stream are kept alive and never evicted.
+
+        Must be called without the lock held: only the local drop takes it,
+        while store I/O and eviction listeners run outside it.
+
+        Returns:
+            Number of sessions evicted
+        """
+        self._last_purge = time.time()
+        streamed = set(self._refresh_streamed())
+        prefix = self._store_key("")
+        expired = [
+            key[len(prefix) :]
+            for key in self.store.purge_expired()
+            if key.startswith(prefix) and key[len(prefix) :] not in streamed
+        ]
+        cutoff = time.time() - self.ttl_seconds
+
+        with self._lock:
+            idle = [
+                playback_id
+                for playback_id, session in self.sessions.items()
+                if session.last_access < cutoff and playback_id not in self._streams
+            ]
+            for playback_id in set(idle) | set(expired):
+                self._drop(playback_id)
+            self.evicted_count += len(expired)
+
+        for playback_id in expired:
+            logger.info(f"Evicted playback session {playback_id} (idle timeout)")
+            self._notify_evicted(playback_id)
+        return len(expired)
+
+    def _enforce_budget(self) -> None:
+        """Drop least recently used local sessions until under the memory budget. Lock held."""
+        while len(self.sessions) > 1 and self._total_bytes() > self.max_bytes:
+            playback_id = next(iter(self.sessions))
+            self._drop(playback_id)
+            logger.info(f"Dematerialized playback session {playback_id} (memory budget)")
+
+    def _drop(self, playback_id: str) -> bool:
+        """Remove the local copy of a session and release its dataset. Lock held."""
+        session = self.sessions.pop(playback_id, None)
+        if session is None:
+            return False
+        dataset_registry.release(session.dataset)
+        return True
+
+    def _notify_evicted(self, playback_id: str) -> None:
+        for listener in self._eviction_listeners:
+            try:
+                listener(playback_id)
+            except Exception as e:
+                logger.error(f"Eviction listener failed for {playback_id}: {e}")
 
 
 # Global playback service instance
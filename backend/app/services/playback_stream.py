@@ -0,0 +1,129 @@
+"""
+Server-paced playback streams pushed over a WebSocket.
+"""
+
+import logging
+from typing import Any, Dict, List, Optional
+
+from .playback_service import PlaybackSession
+
+logger = logging.getLogger(__name__)
+
+MIN_SPEED = 0.1  # bars per second
+MAX_SPEED = 50.0
+
+
+class PlaybackStream:
+    """
+    Pacing state of one streaming client over a playback session.
+
+    The stream advances the session cursor exactly like GET /next, one bar per
+    tick, and encodes each bar as a compact frame:
+    ``[index, timestamp_ms, open, high, low, close, volume]``.
+    """
+
+    def __init__(self, session: PlaybackSession, speed: float = 1.0) -> None:
+        """
+        Initialize a stream.
+
+        Args:
+            session: Playback session to advance
+            speed: Bars per second
+        """
+        self.session = session
+        self.speed = self._clamp_speed(speed)
+        self.paused = False
+
+    @staticmethod
+    def _clamp_speed(speed: float) -> float:
+        return min(max(float(speed), MIN_SPEED), MAX_SPEED)
+
+    @property
+    def interval(self) -> float:
+        """Seconds between two frames."""
+        return 1.0 / self.speed
+
+    @property
+    def active(self) -> bool:
+        """Whether the stream should keep emitting frames."""
+        return not self.paused and self.session.has_more()
+
+    def next_frame(self) -> Optional[List[Any]]:
+        """
+        Advance the cursor by one bar and encode it.
+
+        Returns:
+            Compact frame, or None at the end of the data
+        """
+        index = self.session.current_index
+        window = self.session.next(1)
+        if len(window) == 0:
+            return None
+
+        self.session.touch()
+        return [
+            index,
+            int(window.timestamps[0]) // 1_000_000,
+            float(window.open[0]),
+            float(window.high[0]),
+            float(window.low[0]),
+            float(window.close[0]),
+            int(window.volume[0]),
+        ]
+
+    def handle_message(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Apply a control message from the client.
+
+        Supported messages:
+            {"type": "pause"}
+            {"type": "resume"}
+            {"type": "seek", "index": 42}
+            {"type": "speed", "value": 5}
+
+        Args:
+            message: Decoded JSON message
+
+        Returns:
+            Status message to send back
+        """
+        kind = message.get("type")
+
+        if kind == "pause":
+            self.paused = True
+        elif kind == "resume":
+            self.paused = False
+        elif kind == "seek":
+            index = message.get("index")
+            if not isinstance(index, int) or not self.session.seek(index):
+                return self.error(
+                    f"Invalid index {index} (total: {self.session.get_total_count()})"
+                )
+        elif kind == "speed":
+            value = message.get("value")
+            if not isinstance(value, (int, float)) or value <= 0:
+                return self.error(f"Invalid speed {value}")
+            self.speed = self._clamp_speed(value)
+        else:
+            return self.error(f"Unknown message type {kind!r}")
+
+        self.session.touch()
+        return self.status()
+
+    def status(self) -> Dict[str, Any]:
+        """Build a status message."""
+        return {
+            "type": "status",
+            "playback_id": self.session.playback_id,
+            "current_index": self.session.current_index,
+            "total_count": self.session.get_total_count(),
+            "has_more": self.session.has_more(),
+            "paused": self.paused,
+            "speed": self.speed,
+            "fields": ["index", "timestamp_ms", "open", "high", "low", "close", "volume"],
+        }
+
+    @staticmethod
+    def error(detail: str) -> Dict[str, Any]:
+        """Build an error message."""
+        return {"type": "error", "detail": detail}
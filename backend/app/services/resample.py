@@ -0,0 +1,242 @@
+"""
+Weekly, monthly, quarterly and N-day candles derived from daily bars.
+
+Changing the chart timeframe should not cost another upstream call: the
+daily bars are already in the dataset (or the bar cache), and coarser candles
+are plain OHLCV aggregations over groups of consecutive bars. Groups are
+taken from the trading days actually present, so a week or month is labelled
+by its first trading day (e.g. the Tuesday after a Monday holiday) rather
+than a calendar anchor such as the Sunday pandas uses for ``W``.
+
+Aggregations are vectorized with ``ufunc.reduceat`` and cached per dataset
+and rule in ``Dataset.derived``. During playback only revealed bars are
+aggregated: the candle holding the cursor is built from the bars up to it.
+"""
+
+import logging
+import re
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from ..utils.stock_fetcher import (
+    fetch_stock_data,
+    fetch_stock_data_by_period,
+    make_cache_key,
+    stock_data_cache,
+)
+from .bar_series import BarSeries
+from .dataset_registry import Dataset
+
+logger = logging.getLogger(__name__)
+
+# "D", "W", "M", "Q", or "<N>D" for candles of N trading days
+RULE_PATTERN = re.compile(r"^(?:(\d+)D|D|W|M|Q)$")
+TIMEFRAME_QUERY_DESCRIPTION = (
+    "Candle timeframe derived from daily bars: D, W, M, Q, or ND for N trading days (e.g. 5D)"
+)
+
+
+class ResampleError(ValueError):
+    """Exception raised for unknown or unsupported resampling rules."""
+
+    pass
+
+
+def parse_rule(rule: str) -> str:
+    """
+    Normalize a timeframe rule.
+
+    Args:
+        rule: Rule such as 'w', 'M', 'Q' or '5D'
+
+    Returns:
+        Upper-case rule; '1D' becomes 'D'
+
+    Raises:
+        ResampleError: If the rule is not supported
+    """
+    rule = rule.strip().upper()
+    match = RULE_PATTERN.match(rule)
+    if not match:
+        raise ResampleError(f"Unknown timeframe {rule!r}, expected D, W, M, Q or ND (e.g. 5D)")
+    if match.group(1) is not None:
+        count = int(match.group(1))
+        if count < 1:
+            raise ResampleError(f"Invalid timeframe {rule!r}")
+        return "D" if count == 1 else f"{count}D"
+    return rule
+
+
+def _group_ids(timestamps: np.ndarray, rule: str) -> np.ndarray:
+    """Label every bar with its group; labels never decrease."""
+    days = timestamps.astype("datetime64[ns]").astype("datetime64[D]")
+    if rule == "W":
+        # 1970-01-01 was a Thursday; shift so weeks start on Monday
+        return (days.astype(np.int64) + 3) // 7
+    months = days.astype("datetime64[M]").astype(np.int64)
+    if rule == "M":
+        return months
+    if rule == "Q":
+        return months // 3
+    count = 1 if rule == "D" else int(rule[:-1])
+    return np.arange(len(timestamps)) // count
+
+
+@dataclass(frozen=True)
+class Resampled:
+    """Aggregated candles plus the daily bar range [starts[g], ends[g]) of each."""
+
+    bars: BarSeries
+    starts: np.ndarray
+    ends: np.ndarray
+
+
+def _aggregate(bars: BarSeries, starts: np.ndarray, ends: np.ndarray) -> BarSeries:
+    """Aggregate groups of bars in one vectorized pass per column."""
+
+    def readonly(array: np.ndarray) -> np.ndarray:
+        array = np.ascontiguousarray(array)
+        array.setflags(write=False)
+        return array
+
+    return BarSeries(
+        timestamps=readonly(bars.timestamps[starts]),
+        open=readonly(bars.open[starts]),
+        high=readonly(np.maximum.reduceat(bars.high, starts)),
+        low=readonly(np.minimum.reduceat(bars.low, starts)),
+        close=readonly(bars.close[ends - 1]),
+        volume=readonly(np.add.reduceat(bars.volume, starts)),
+    )
+
+
+def resample_bars(bars: BarSeries, rule: str) -> Resampled:
+    """
+    Aggregate daily bars into coarser candles.
+
+    Args:
+        bars: Daily bars
+        rule: Normalized rule from parse_rule
+
+    Returns:
+        Resampled candles with their daily bar ranges
+    """
+    if len(bars) == 0:
+        empty = np.empty(0, dtype=np.int64)
+        return Resampled(bars, empty, empty)
+    ids = _group_ids(bars.timestamps, rule)
+    starts = np.flatnonzero(np.r_[True, ids[1:] != ids[:-1]])
+    ends = np.r_[starts[1:], len(bars)]
+    return Resampled(_aggregate(bars, starts, ends), starts, ends)
+
+
+def get_resampled(dataset: Dataset, rule: str) -> Resampled:
+    """Get the candles of a dataset for a rule, computing them on first use."""
+    key = ("resample", rule)
+    cached = dataset.derived.get(key)
+    if cached is None:
+        cached = dataset.derived.setdefault(key, resample_bars(dataset.bars, rule))
+        logger.debug(f"Resampled dataset {dataset.key} to {rule} ({len(cached.starts)} candles)")
+    return cached
+
+
+def resampled_between(dataset: Dataset, rule: str, start: int, stop: int) -> BarSeries:
+    """
+    Get the candles covering daily bars [start, stop), built from those bars only.
+
+    Candles cut by ``stop`` (the one holding the cursor) are aggregated from
+    the bars before it, so nothing after the cursor leaks into them.
+
+    Args:
+        dataset: Shared daily dataset
+        rule: Normalized rule
+        start: First daily index (inclusive)
+        stop: Last daily index (exclusive), not beyond the revealed bars
+
+    Returns:
+        Candles in time order
+    """
+    if start >= stop:
+        return BarSeries.concat([])
+    resampled = get_resampled(dataset, rule)
+    first = int(np.searchsorted(resampled.ends, start, side="right"))
+    complete = int(np.searchsorted(resampled.ends, stop, side="right"))
+    parts = [resampled.bars.slice(first, complete)]
+    if complete < len(resampled.starts) and resampled.starts[complete] < stop:
+        partial_start = np.array([resampled.starts[complete]])
+        parts.append(_aggregate(dataset.bars.slice(0, stop), partial_start, np.array([stop])))
+    return BarSeries.concat(parts)
+
+
+def resample_frame(df: pd.DataFrame, rule: str) -> pd.DataFrame:
+    """
+    Aggregate a daily OHLCV DataFrame, keeping its timezone.
+
+    Args:
+        df: DataFrame with a DatetimeIndex and Open/High/Low/Close/Volume columns
+        rule: Normalized rule
+
+    Returns:
+        DataFrame of candles indexed by their first trading day
+    """
+    candles = resample_bars(BarSeries.from_dataframe(df), rule).bars
+    index = pd.DatetimeIndex(candles.timestamps.astype("datetime64[ns]"), name=df.index.name)
+    tz = pd.DatetimeIndex(df.index).tz
+    if tz is not None:
+        index = index.tz_localize(tz)
+    return pd.DataFrame(
+        {
+            "Open": candles.open,
+            "High": candles.high,
+            "Low": candles.low,
+            "Close": candles.close,
+            "Volume": candles.volume,
+        },
+        index=index,
+    )
+
+
+def fetch_resampled_data(
+    symbol: str,
+    rule: str,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    period: Optional[str] = None,
+) -> Optional[pd.DataFrame]:
+    """
+    Get candles for a timeframe from the cached daily bars.
+
+    The daily bars come from the bar cache and the local bar store; the
+    aggregated frame is cached next to them, keyed by range and rule.
+
+    Args:
+        symbol: Stock ticker symbol
+        rule: Normalized rule
+        start_date: Start date (YYYY-MM-DD), used with end_date
+        end_date: End date (YYYY-MM-DD)
+        period: Period string, used when no date range is given
+
+    Returns:
+        DataFrame of candles, or None if there is no daily data
+    """
+    by_range = bool(start_date and end_date)
+
+    def load() -> Optional[pd.DataFrame]:
+        if by_range:
+            df = fetch_stock_data(symbol, start_date, end_date)
+        else:
+            df = fetch_stock_data_by_period(symbol, period or "3mo")
+        if df is None or df.empty:
+            return None
+        return resample_frame(df, rule)
+
+    key = make_cache_key(
+        symbol,
+        start_date=start_date if by_range else None,
+        end_date=end_date if by_range else None,
+        period=None if by_range else period or "3mo",
+        interval=f"1d>{rule}",
+    )
+    return stock_data_cache.get_or_fetch(key, load)
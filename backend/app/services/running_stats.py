@@ -0,0 +1,138 @@
+"""
+Prefix statistics over a dataset, answering cursor and window queries in O(1).
+
+``price_range`` on a session spans the whole dataset, which tells the client
+where prices will go. These structures are precomputed once per shared
+dataset and only ever read at or before the cursor:
+
+- running low/high, cumulative volume and cumulative return for [0, i]
+- sparse tables of low/high for the min/max of any window [i, j)
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, List
+
+import numpy as np
+
+from .dataset_registry import Dataset
+
+
+def _readonly(array: np.ndarray) -> np.ndarray:
+    array = np.ascontiguousarray(array)
+    array.setflags(write=False)
+    return array
+
+
+class SparseTable:
+    """
+    Idempotent range query table: level k holds the result over 2**k elements.
+
+    Building costs O(n log n) time and memory; each query combines two
+    overlapping blocks, so it is O(1).
+    """
+
+    def __init__(self, values: np.ndarray, op: np.ufunc) -> None:
+        """
+        Build the table.
+
+        Args:
+            values: 1-D array
+            op: Idempotent binary ufunc such as np.minimum or np.maximum
+        """
+        self.op = op
+        self.levels: List[np.ndarray] = [_readonly(values)]
+        width = 1
+        while width * 2 <= len(values):
+            previous = self.levels[-1]
+            self.levels.append(_readonly(op(previous[:-width], previous[width:])))
+            width *= 2
+
+    @property
+    def nbytes(self) -> int:
+        """Memory used by all levels."""
+        return sum(level.nbytes for level in self.levels)
+
+    def query(self, start: int, stop: int) -> float:
+        """
+        Combine values in [start, stop).
+
+        Raises:
+            ValueError: If the range is empty or out of bounds
+        """
+        if not 0 <= start < stop <= len(self.levels[0]):
+            raise ValueError(f"Invalid range [{start}, {stop})")
+        level = (stop - start).bit_length() - 1
+        block = self.levels[level]
+        return float(self.op(block[start], block[stop - (1 << level)]))
+
+
+@dataclass(frozen=True)
+class RunningStats:
+    """Prefix arrays: element i summarizes bars [0, i]."""
+
+    low: np.ndarray
+    high: np.ndarray
+    volume: np.ndarray
+    returns: np.ndarray
+
+    @classmethod
+    def from_dataset(cls, dataset: Dataset) -> "RunningStats":
+        """Compute all prefix arrays in one vectorized pass each."""
+        bars = dataset.bars
+        first_close = bars.close[0] if len(bars) else np.nan
+        return cls(
+            low=_readonly(np.minimum.accumulate(bars.low)),
+            high=_readonly(np.maximum.accumulate(bars.high)),
+            volume=_readonly(np.cumsum(bars.volume)),
+            returns=_readonly(bars.close / first_close - 1.0),
+        )
+
+    def at(self, index: int) -> Dict[str, Any]:
+        """
+        Get the statistics of bars [0, index].
+
+        Args:
+            index: Last revealed bar
+
+        Returns:
+            Dict with min_price, max_price, cum_volume and cum_return
+        """
+        return {
+            "min_price": float(self.low[index]),
+            "max_price": float(self.high[index]),
+            "cum_volume": int(self.volume[index]),
+            "cum_return": float(self.returns[index]),
+        }
+
+
+def get_running_stats(dataset: Dataset) -> RunningStats:
+    """Get the prefix arrays of a dataset, computing them on first use."""
+    stats = dataset.derived.get("running_stats")
+    if stats is None:
+        stats = dataset.derived.setdefault("running_stats", RunningStats.from_dataset(dataset))
+    return stats
+
+
+def window_price_range(dataset: Dataset, start: int, stop: int) -> Dict[str, float]:
+    """
+    Get the low/high of bars [start, stop) from sparse tables built on first use.
+
+    Args:
+        dataset: Shared dataset
+        start: First index (inclusive)
+        stop: Last index (exclusive), greater than start
+
+    Returns:
+        Dict with min_price and max_price
+    """
+    tables = dataset.derived.get("range_tables")
+    if tables is None:
+        tables = dataset.derived.setdefault(
+            "range_tables",
+            (
+                SparseTable(dataset.bars.low, np.minimum),
+                SparseTable(dataset.bars.high, np.maximum),
+            ),
+        )
+    low, high = tables
+    return {"min_price": low.query(start, stop), "max_price": high.query(start, stop)}
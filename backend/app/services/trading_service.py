@@ -4,10 +4,13 @@ Trading service for managing trading accounts and executing trades.
 
 import logging
 import uuid
+from dataclasses import dataclass
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple, TypeVar
 
+from ..config import settings
 from ..models.trading import (
+    PendingOrder,
     Position,
     Trade,
     TradeExecuteResponse,
@@ -15,10 +18,69 @@ from ..models.trading import (
     TradingAccountCreateResponse,
     TradingAccountStatus,
 )
+from ..utils.cursor_token import is_cursor_token
+from ..utils.session_store import REVISION_FIELD, SessionStore, session_store
+from .intrabar import first_fill
 from .playback_service import playback_service
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
+
+def _trade_rows(trades: List[Trade]) -> List[List[Any]]:
+    """Serialize trades as compact rows."""
+    return [
+        [
+            trade.id,
+            trade.timestamp.isoformat(),
+            trade.type,
+            trade.shares,
+            trade.price,
+            trade.total,
+            trade.cash_after,
+        ]
+        for trade in trades
+    ]
+
+
+def _trades_from_rows(rows: List[List[Any]]) -> List[Trade]:
+    """Rebuild trades from compact rows."""
+    return [
+        Trade(
+            id=trade_id,
+            timestamp=datetime.fromisoformat(timestamp),
+            type=trade_type,
+            shares=shares,
+            price=price,
+            total=total,
+            cash_after=cash_after,
+        )
+        for trade_id, timestamp, trade_type, shares, price, total, cash_after in rows
+    ]
+
+
+@dataclass
+class RestingOrder:
+    """Limit or stop order resting on an account until a later bar trades through it."""
+
+    id: str
+    side: str
+    order_type: str
+    price: float
+    placed_index: int
+    checked_index: int  # Last bar already evaluated for this order
+
+    def to_model(self) -> PendingOrder:
+        """Public view of the order."""
+        return PendingOrder(
+            id=self.id,
+            side=self.side,
+            order_type=self.order_type,
+            price=self.price,
+            placed_index=self.placed_index,
+        )
+
 
 class TradingAccount:
     """Represents a trading account tied to a playback session."""
@@ -46,7 +108,90 @@ class TradingAccount:
 
         # Statistics
         self.realized_pl = 0.0
-        self.trades: List[Trade] = []
+        self.trades: List[Trade] = []  # Trades made by this account since its last fork
+
+        # Frozen history shared with forks: store key of the newest ledger segment
+        # and the trades of the whole segment chain, oldest first
+        self.ledger: Optional[str] = None
+        self.shared_trades: Tuple[Trade, ...] = ()
+
+        self.orders: List[RestingOrder] = []
+
+    def to_state(self) -> Dict[str, Any]:
+        """Serialize the account compactly for the session store."""
+        position = None
+        if self.has_position():
+            position = [
+                self.position_shares,
+                self.position_entry_price,
+                self.position_entry_time.isoformat() if self.position_entry_time else None,
+            ]
+        return {
+            "playback_id": self.playback_id,
+            "symbol": self.symbol,
+            "initial_cash": self.initial_cash,
+            "cash": self.current_cash,
+            "position": position,
+            "realized_pl": self.realized_pl,
+            "ledger": self.ledger,
+            "trades": _trade_rows(self.trades),
+            "orders": [
+                [o.id, o.side, o.order_type, o.price, o.placed_index, o.checked_index]
+                for o in self.orders
+            ],
+        }
+
+    @classmethod
+    def from_state(cls, account_id: str, state: Dict[str, Any]) -> "TradingAccount":
+        """
+        Rebuild an account from its stored state.
+
+        Shared ledger trades are not included; TradingService resolves them.
+
+        Args:
+            account_id: Account ID
+            state: Output of to_state
+
+        Returns:
+            TradingAccount
+        """
+        account = cls(account_id, state["playback_id"], state["symbol"], state["initial_cash"])
+        account.current_cash = state["cash"]
+        account.realized_pl = state["realized_pl"]
+        if state["position"]:
+            shares, entry_price, entry_time = state["position"]
+            account.position_shares = shares
+            account.position_entry_price = entry_price
+            account.position_entry_time = datetime.fromisoformat(entry_time) if entry_time else None
+        account.ledger = state.get("ledger")
+        account.trades = _trades_from_rows(state["trades"])
+        account.orders = [RestingOrder(*row) for row in state.get("orders", [])]
+        return account
+
+    def fork(self, account_id: str, playback_id: str) -> "TradingAccount":
+        """
+        Branch the account: same balances and position, shared trade history.
+
+        The caller freezes this account's own trades into a ledger segment
+        first, so the whole history is shared rather than copied.
+
+        Args:
+            account_id: ID of the new account
+            playback_id: Playback session the new account follows
+
+        Returns:
+            New TradingAccount
+        """
+        child = TradingAccount(account_id, playback_id, self.symbol, self.initial_cash)
+        child.current_cash = self.current_cash
+        child.realized_pl = self.realized_pl
+        child.position_shares = self.position_shares
+        child.position_entry_price = self.position_entry_price
+        child.position_entry_time = self.position_entry_time
+        child.ledger = self.ledger
+        child.shared_trades = self.shared_trades
+        child.orders = [RestingOrder(**vars(order)) for order in self.orders]
+        return child
 
     def has_position(self) -> bool:
         """Check if account has an open position."""
@@ -222,7 +367,8 @@ class TradingAccount:
             unrealized_pl=unrealized_pl,
             total_pl=total_pl,
             total_pl_pct=total_pl_pct,
-            trade_count=len(self.trades),
+            trade_count=len(self.shared_trades) + len(self.trades),
+            pending_orders=[order.to_model() for order in self.orders],
         )
 
     def _get_position(self, current_price: float) -> Position:
@@ -261,17 +407,50 @@ class TradingAccount:
         Get trade history.
 
         Returns:
-            List of Trade objects
+            List of Trade objects, including history shared with the account it was forked from
         """
-        return self.trades
+        return [*self.shared_trades, *self.trades]
 
 
 class TradingService:
-    """Service for managing trading accounts."""
+    """
+    Service for managing trading accounts.
+
+    Accounts are kept in the shared session store next to the playback
+    cursors, so any worker can execute trades on any account. Changes to an
+    existing account go through update_account, a revision-checked
+    read-modify-write, so concurrent trades on two workers are never lost.
+    """
+
+    def __init__(
+        self,
+        store: Optional[SessionStore] = None,
+        ttl_seconds: float = settings.playback_session_ttl_seconds,
+    ) -> None:
+        """
+        Initialize trading service.
+
+        Args:
+            store: Session store, defaults to the configured global store
+            ttl_seconds: Idle time after which an account expires
+        """
+        self.store = store if store is not None else session_store
+        self.ttl_seconds = ttl_seconds
+
+        # Accounts are meaningless once their playback session is evicted
+        playback_service.add_eviction_listener(self.delete_accounts_for_playback)
+
+    @staticmethod
+    def _account_key(account_id: str) -> str:
+        return f"account:{account_id}"
+
+    @staticmethod
+    def _index_key(playback_id: str) -> str:
+        return f"playback-accounts:{playback_id}"
 
-    def __init__(self) -> None:
-        """Initialize trading service."""
-        self.accounts: Dict[str, TradingAccount] = {}
+    @staticmethod
+    def _ledger_key(ledger_id: str) -> str:
+        return f"ledger:{ledger_id}"
 
     def create_account(self, playback_id: str, symbol: str, initial_cash: float) -> str:
         """
@@ -286,8 +465,12 @@ class TradingService:
             Account ID
 
         Raises:
-            ValueError: If playback session not found
+            ValueError: If playback session not found or is a stateless cursor
         """
+        if is_cursor_token(playback_id):
+            # The token changes on every step, so there is no session to link to
+            raise ValueError("Trading accounts require a server-held playback session")
+
         # Verify playback session exists
         session = playback_service.get_session(playback_id)
         if not session:
@@ -296,15 +479,276 @@ class TradingService:
         # Create account
         account_id = str(uuid.uuid4())
         account = TradingAccount(account_id, playback_id, symbol, initial_cash)
-        self.accounts[account_id] = account
+        self.save_account(account)
+        self._link(playback_id, account_id)
 
         logger.info(f"Created trading account {account_id} for {symbol} with ${initial_cash}")
 
         return account_id
 
+    def _link(self, playback_id: str, account_id: str) -> None:
+        """Record an account in its playback session's index."""
+        self.store.update(
+            self._index_key(playback_id),
+            lambda index: {"account_ids": [*(index or {}).get("account_ids", []), account_id]},
+            self.ttl_seconds,
+        )
+
     def get_account(self, account_id: str) -> Optional[TradingAccount]:
-        """Get trading account by ID."""
-        return self.accounts.get(account_id)
+        """Get trading account by ID, settling resting orders on newly revealed bars."""
+        updated = self.update_account(account_id, lambda account: None)
+        return updated[0] if updated else None
+
+    def update_account(
+        self, account_id: str, change: Callable[[TradingAccount], T]
+    ) -> Optional[Tuple[TradingAccount, T]]:
+        """
+        Apply a change to an account atomically.
+
+        Resting orders are settled first. If another worker writes the account
+        in the meantime, it is read again and the change is re-applied.
+
+        Args:
+            account_id: Account ID
+            change: Function mutating the account; it may run more than once
+                and may raise ValueError to reject the change
+
+        Returns:
+            Tuple of (updated account, result of change), or None if the
+            account does not exist
+        """
+        key = self._account_key(account_id)
+        outcome: List[Tuple[TradingAccount, T]] = []
+
+        def apply(state: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+            outcome.clear()
+            if state is None:
+                return None
+            account = TradingAccount.from_state(account_id, state)
+            if account.ledger:
+                account.shared_trades = self._load_ledger(account.ledger)
+            if account.orders:
+                self._settle(account)
+            outcome.append((account, change(account)))
+
+            new_state = account.to_state()
+            stored = {name: value for name, value in state.items() if name != REVISION_FIELD}
+            return None if new_state == stored else new_state
+
+        written = self.store.update(key, apply, self.ttl_seconds)
+        if not outcome:
+            return None
+        account, result = outcome[0]
+        if written is None:
+            self.store.touch(key, self.ttl_seconds)
+        self.store.touch(self._index_key(account.playback_id), self.ttl_seconds)
+        return account, result
+
+    def execute_trade(
+        self, account_id: str, side: str, price: float
+    ) -> Optional[Tuple[TradingAccount, Trade]]:
+        """
+        Buy or sell one share at a price.
+
+        Args:
+            account_id: Account ID
+            side: 'buy' or 'sell'
+            price: Execution price
+
+        Returns:
+            Tuple of (updated account, trade), or None if the account does not exist
+
+        Raises:
+            ValueError: If cash or position is insufficient
+        """
+        if side == "buy":
+            return self.update_account(account_id, lambda account: account.buy(price))
+        return self.update_account(account_id, lambda account: account.sell(price))
+
+    def place_order(
+        self, account_id: str, side: str, order_type: str, price: float
+    ) -> Optional[Tuple[TradingAccount, RestingOrder]]:
+        """
+        Rest a limit or stop order on an account.
+
+        The order is evaluated against the synthetic intrabar paths of bars
+        revealed after the current one.
+
+        Args:
+            account_id: Account to place the order on
+            side: 'buy' or 'sell'
+            order_type: 'limit' or 'stop'
+            price: Limit or stop price
+
+        Returns:
+            Tuple of (updated account, resting order), or None if the account
+            does not exist
+
+        Raises:
+            ValueError: If the playback session is gone or has no revealed bar
+        """
+
+        def rest(account: TradingAccount) -> RestingOrder:
+            session = playback_service.get_session(account.playback_id)
+            if session is None:
+                raise ValueError(f"Playback session {account.playback_id} not found")
+            current = session.get_revealed_count() - 1
+            if current < 0:
+                raise ValueError("No bar revealed yet")
+            order = RestingOrder(str(uuid.uuid4()), side, order_type, price, current, current)
+            account.orders.append(order)
+            return order
+
+        placed = self.update_account(account_id, rest)
+        if placed is not None:
+            logger.info(f"Placed {order_type} {side} @ ${price:.2f} on account {account_id}")
+        return placed
+
+    def cancel_order(self, account_id: str, order_id: str) -> Optional[Tuple[TradingAccount, bool]]:
+        """
+        Cancel a resting order.
+
+        Args:
+            account_id: Account holding the order
+            order_id: Order ID
+
+        Returns:
+            Tuple of (updated account, whether the order was pending), or None
+            if the account does not exist
+        """
+
+        def cancel(account: TradingAccount) -> bool:
+            remaining = [order for order in account.orders if order.id != order_id]
+            if len(remaining) == len(account.orders):
+                return False
+            account.orders = remaining
+            return True
+
+        return self.update_account(account_id, cancel)
+
+    def _settle(self, account: TradingAccount) -> None:
+        """
+        Fill resting orders whose price was traded through on newly revealed bars.
+
+        Bars are walked lazily in order and each bar's path is synthesized
+        once for all orders; within a bar, orders fill in the order their
+        triggers are hit. Every order remembers the last bar it was checked
+        against, so each bar is evaluated at most once per order.
+        """
+        session = playback_service.get_session(account.playback_id)
+        if session is None:
+            return
+        revealed = session.get_revealed_count()
+        start = min(order.checked_index for order in account.orders) + 1
+        if start >= revealed:
+            return
+
+        for index, path in session.iter_intrabar(start, revealed):
+            triggers = []
+            for order in account.orders:
+                if order.checked_index >= index:
+                    continue
+                fill = first_fill(path, order.side, order.order_type, order.price)
+                if fill is not None:
+                    triggers.append((fill[0], fill[1], order))
+            triggers.sort(key=lambda trigger: trigger[0])
+
+            for _, fill_price, order in triggers:
+                account.orders.remove(order)
+                try:
+                    if order.side == "buy":
+                        account.buy(current_price=fill_price)
+                    else:
+                        account.sell(current_price=fill_price)
+                except ValueError as e:
+                    logger.warning(f"Dropped {order.order_type} {order.side} order {order.id}: {e}")
+            if not account.orders:
+                break
+
+        for order in account.orders:
+            order.checked_index = max(order.checked_index, revealed - 1)
+
+    def _load_ledger(self, ledger_key: str) -> Tuple[Trade, ...]:
+        """
+        Read a chain of ledger segments, oldest trades first.
+
+        Segments are shared by every fork that references them and expire
+        on their own, so reading one also extends its lifetime.
+        """
+        segments = []
+        key: Optional[str] = ledger_key
+        while key:
+            segment = self.store.get(key)
+            if segment is None:
+                logger.warning(f"Ledger segment {key} expired, history is truncated")
+                break
+            self.store.touch(key, self.ttl_seconds)
+            segments.append(segment["trades"])
+            key = segment["parent"]
+        return tuple(trade for rows in reversed(segments) for trade in _trades_from_rows(rows))
+
+    def _freeze(self, account: TradingAccount) -> None:
+        """
+        Move an account's own trades into an immutable ledger segment shared with forks.
+
+        Runs inside update_account; a segment written by an attempt that loses
+        a conflict is never referenced and simply expires.
+        """
+        if not account.trades:
+            return
+        key = self._ledger_key(uuid.uuid4().hex)
+        self.store.set(
+            key, {"parent": account.ledger, "trades": _trade_rows(account.trades)}, self.ttl_seconds
+        )
+        account.ledger = key
+        account.shared_trades = (*account.shared_trades, *account.trades)
+        account.trades = []
+
+    def fork_accounts_for_playback(
+        self, playback_id: str, child_playback_id: str
+    ) -> Dict[str, str]:
+        """
+        Fork every account of a playback session into a forked session.
+
+        Trade history is copy-on-write: the parent's trades are frozen once
+        into a ledger segment that both accounts reference, and each side
+        only stores the trades made after the fork.
+
+        Args:
+            playback_id: Parent playback session ID
+            child_playback_id: Forked playback session ID
+
+        Returns:
+            Mapping of parent account ID to child account ID
+        """
+        index = self.store.get(self._index_key(playback_id)) or {"account_ids": []}
+        forked = {}
+        for account_id in index["account_ids"]:
+            frozen = self.update_account(account_id, self._freeze)
+            if frozen is None:
+                continue
+            account = frozen[0]
+            child = account.fork(str(uuid.uuid4()), child_playback_id)
+            self.save_account(child)
+            self._link(child_playback_id, child.account_id)
+            forked[account_id] = child.account_id
+
+        logger.info(f"Forked {len(forked)} trading accounts into playback {child_playback_id}")
+        return forked
+
+    def save_account(self, account: TradingAccount) -> None:
+        """
+        Write a whole account, replacing any stored state.
+
+        Used for new accounts; changes to an existing account should go
+        through update_account so concurrent writers do not overwrite each other.
+
+        Args:
+            account: Account to persist
+        """
+        state = {**account.to_state(), REVISION_FIELD: uuid.uuid4().hex[:12]}
+        self.store.set(self._account_key(account.account_id), state, self.ttl_seconds)
+        self.store.touch(self._index_key(account.playback_id), self.ttl_seconds)
 
     def delete_account(self, account_id: str) -> bool:
         """
@@ -316,12 +760,26 @@ class TradingService:
         Returns:
             True if deleted, False if not found
         """
-        if account_id in self.accounts:
-            del self.accounts[account_id]
+        if self.store.delete(self._account_key(account_id)):
             logger.info(f"Deleted trading account {account_id}")
             return True
         return False
 
+    def delete_accounts_for_playback(self, playback_id: str) -> int:
+        """
+        Delete all trading accounts linked to a playback session.
+
+        Args:
+            playback_id: Playback session ID
+
+        Returns:
+            Number of accounts deleted
+        """
+        index = self.store.get(self._index_key(playback_id)) or {"account_ids": []}
+        deleted = sum(self.delete_account(account_id) for account_id in index["account_ids"])
+        self.store.delete(self._index_key(playback_id))
+        return deleted
+
 
 # Global trading service instance
 trading_service = TradingService()
@@ -2,6 +2,11 @@
 Utils package initialization.
 """
 
-from .stock_fetcher import fetch_stock_data, fetch_stock_data_by_period
+from .stock_fetcher import (
+    DataFrameCache,
+    fetch_stock_data,
+    fetch_stock_data_by_period,
+    stock_data_cache,
+)
 
-__all__ = ["fetch_stock_data", "fetch_stock_data_by_period"]
+__all__ = ["DataFrameCache", "fetch_stock_data", "fetch_stock_data_by_period", "stock_data_cache"]
@@ -0,0 +1,339 @@
+"""
+Packed, memory-mapped daily bar columns for the whole symbol universe.
+
+Reading a replay's bars from SQLite means a range query plus a DataFrame
+build per symbol, which costs more than the replay itself once the universe
+is prefetched. A bar pack stores every symbol's closed daily bars in six
+fixed-width column files, symbol after symbol in date order:
+
+    date.i64    int64 nanoseconds of naive exchange-local midnight
+    open.f64, high.f64, low.f64, close.f64    float64
+    volume.i64  int64
+
+plus ``index.json`` mapping each symbol to its row offset and length, the
+range its bars are complete for, and its exchange timezone. Columns are
+opened with ``np.memmap`` in read-only mode, so a slice is a view onto the
+page cache: nothing is parsed or copied, and every worker process mapping
+the same files shares the same pages.
+
+Packs are rebuilt offline (``scripts/pack_bar_store.py``) into a new build
+directory, then published by atomically replacing the ``CURRENT`` pointer;
+readers pick up a new build on their next lookup, while arrays already
+handed out keep the old files mapped.
+"""
+
+import json
+import logging
+import os
+import shutil
+import threading
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from ..config import settings
+from ..database.connection import Base, SessionLocal
+from ..database.models import PriceBar, PriceFetchLog
+
+logger = logging.getLogger(__name__)
+
+PACK_VERSION = 1
+CURRENT_FILE = "CURRENT"
+INDEX_FILE = "index.json"
+
+# Column name -> (file name, dtype)
+PACK_COLUMNS: Dict[str, Tuple[str, type]] = {
+    "timestamps": ("date.i64", np.int64),
+    "open": ("open.f64", np.float64),
+    "high": ("high.f64", np.float64),
+    "low": ("low.f64", np.float64),
+    "close": ("close.f64", np.float64),
+    "volume": ("volume.i64", np.int64),
+}
+
+
+@dataclass(frozen=True)
+class PackEntry:
+    """Location and coverage of one symbol in a pack."""
+
+    offset: int
+    length: int
+    covered_from: datetime
+    through: datetime
+    timezone: Optional[str]
+
+
+class BarPack:
+    """Read-only view of one pack build."""
+
+    def __init__(self, path: Path) -> None:
+        """
+        Map a pack build directory.
+
+        Args:
+            path: Build directory holding index.json and the column files
+
+        Raises:
+            ValueError: If the pack version is not supported
+        """
+        with open(path / INDEX_FILE, "r", encoding="utf-8") as f:
+            index = json.load(f)
+        if index.get("version") != PACK_VERSION:
+            raise ValueError(f"Unsupported bar pack version {index.get('version')}")
+
+        self.path = path
+        self.build_id = path.name
+        self.entries: Dict[str, PackEntry] = {
+            symbol: PackEntry(
+                offset=entry["offset"],
+                length=entry["length"],
+                covered_from=datetime.fromisoformat(entry["covered_from"]),
+                through=datetime.fromisoformat(entry["through"]),
+                timezone=entry.get("timezone"),
+            )
+            for symbol, entry in index["symbols"].items()
+        }
+        total = index["rows"]
+        self._columns: Dict[str, np.ndarray] = {}
+        for name, (file_name, dtype) in PACK_COLUMNS.items():
+            if total == 0:
+                self._columns[name] = np.empty(0, dtype=dtype)
+            else:
+                mapped = np.memmap(path / file_name, dtype=dtype, mode="r", shape=(total,))
+                # Plain ndarray views: slicing skips memmap bookkeeping
+                self._columns[name] = mapped.view(np.ndarray)
+
+    def covers(self, symbol: str, start_date: datetime) -> bool:
+        """Check whether the pack holds a symbol's complete bars from a date on."""
+        entry = self.entries.get(symbol)
+        return entry is not None and entry.covered_from <= start_date <= entry.through
+
+    def columns(
+        self, symbol: str, start_date: datetime, end_date: datetime
+    ) -> Dict[str, np.ndarray]:
+        """
+        Get zero-copy column views of a symbol's bars in an inclusive range.
+
+        Only packed days are returned; the caller fetches days after the
+        entry's ``through`` elsewhere.
+
+        Args:
+            symbol: Validated ticker symbol
+            start_date: Start date
+            end_date: End date (inclusive)
+
+        Returns:
+            Column name to read-only array view; empty arrays for an unknown symbol
+        """
+        entry = self.entries.get(symbol)
+        if entry is None:
+            return {name: column[:0] for name, column in self._columns.items()}
+        dates = self._columns["timestamps"][entry.offset : entry.offset + entry.length]
+        first = int(np.searchsorted(dates, pd.Timestamp(start_date).value, side="left"))
+        next_day = pd.Timestamp(end_date).normalize() + pd.Timedelta(days=1)
+        stop = int(np.searchsorted(dates, next_day.value, side="left"))
+        return {
+            name: column[entry.offset + first : entry.offset + stop]
+            for name, column in self._columns.items()
+        }
+
+    def frame(self, symbol: str, start_date: datetime, end_date: datetime) -> pd.DataFrame:
+        """
+        Get a symbol's packed bars as a DataFrame in its exchange timezone.
+
+        The value columns stay views of the mapped files (one block per column,
+        never consolidated); only the index is materialized when it is
+        localized to the exchange timezone.
+
+        Returns:
+            DataFrame with Open/High/Low/Close/Volume columns and a Date index
+        """
+        columns = self.columns(symbol, start_date, end_date)
+        index = pd.DatetimeIndex(columns["timestamps"].view("datetime64[ns]"), name="Date")
+        timezone = self.entries[symbol].timezone if symbol in self.entries else None
+        if timezone:
+            index = index.tz_localize(timezone)
+        return pd.DataFrame(
+            {
+                "Open": columns["open"],
+                "High": columns["high"],
+                "Low": columns["low"],
+                "Close": columns["close"],
+                "Volume": columns["volume"],
+            },
+            index=index,
+            copy=False,
+        )
+
+
+_pack: Optional[BarPack] = None
+_failed_build: Optional[Path] = None
+_pack_lock = threading.Lock()
+
+
+def get_bar_pack(directory: Optional[str] = None) -> Optional[BarPack]:
+    """
+    Get the current pack build, remapping it when a newer build is published.
+
+    Args:
+        directory: Pack directory, defaults to settings.bar_pack_dir
+
+    Returns:
+        BarPack, or None if packs are disabled or none has been built
+    """
+    global _pack, _failed_build
+    directory = directory or settings.bar_pack_dir
+    if not directory:
+        return None
+    root = Path(directory)
+    try:
+        build_id = (root / CURRENT_FILE).read_text(encoding="utf-8").strip()
+    except OSError:
+        return None
+
+    with _pack_lock:
+        if _pack is not None and _pack.path == root / build_id:
+            return _pack
+        if _failed_build == root / build_id:
+            return None
+        try:
+            _pack = BarPack(root / build_id)
+            logger.info(f"[BarPack] Mapped build {build_id} with {len(_pack.entries)} symbols")
+        except Exception as e:
+            logger.error(f"[BarPack] Failed to map build {build_id}: {e}")
+            _pack, _failed_build = None, root / build_id
+        return _pack
+
+
+def _coverage(logs: List[Tuple[datetime, datetime]]) -> Tuple[datetime, datetime]:
+    """Merge fetch-log ranges and return the contiguous run ending latest."""
+    merged: List[List[datetime]] = []
+    for start, end in sorted(logs):
+        if merged and start <= merged[-1][1] + timedelta(days=1):
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return merged[-1][0], merged[-1][1]
+
+
+def build_bar_pack(
+    directory: str,
+    session_factory: Callable[[], Session] = SessionLocal,
+    through: Optional[datetime] = None,
+    keep_builds: int = 2,
+) -> Dict[str, int]:
+    """
+    Pack the bar store into a new build and publish it.
+
+    Each symbol is packed for the latest contiguous range its fetch log
+    covers, cut at ``through``; bars outside that range stay in SQLite only.
+
+    Args:
+        directory: Pack directory
+        session_factory: Factory returning SQLAlchemy sessions on the bar store
+        through: Last day to pack, defaults to every logged day
+        keep_builds: Builds kept on disk, including the new one
+
+    Returns:
+        Counts of packed symbols and rows
+    """
+    root = Path(directory)
+    build_id = f"{datetime.now().strftime('%Y%m%d%H%M%S')}-{uuid.uuid4().hex[:6]}"
+    build_dir = root / build_id
+    build_dir.mkdir(parents=True)
+
+    files = {
+        name: open(build_dir / file_name, "wb") for name, (file_name, _) in PACK_COLUMNS.items()
+    }
+    symbols: Dict[str, Dict] = {}
+    rows = 0
+    db = session_factory()
+    try:
+        Base.metadata.create_all(
+            bind=db.get_bind(), tables=[PriceBar.__table__, PriceFetchLog.__table__]
+        )
+        logs: Dict[str, List[Tuple[datetime, datetime]]] = {}
+        timezones: Dict[str, Optional[str]] = {}
+        for symbol, start, end, timezone in db.query(
+            PriceFetchLog.symbol,
+            PriceFetchLog.start_date,
+            PriceFetchLog.end_date,
+            PriceFetchLog.timezone,
+        ):
+            logs.setdefault(symbol, []).append((start, end))
+            if timezone:
+                timezones[symbol] = timezone
+        stored = {symbol for (symbol,) in db.query(func.distinct(PriceBar.symbol))}
+
+        for symbol in sorted(stored & set(logs)):
+            covered_from, covered_through = _coverage(logs[symbol])
+            if through is not None:
+                covered_through = min(covered_through, through)
+            if covered_through < covered_from:
+                continue
+
+            bars = pd.read_sql(
+                db.query(
+                    PriceBar.date,
+                    PriceBar.open,
+                    PriceBar.high,
+                    PriceBar.low,
+                    PriceBar.close,
+                    PriceBar.volume,
+                )
+                .filter(
+                    PriceBar.symbol == symbol,
+                    PriceBar.date >= covered_from,
+                    PriceBar.date <= covered_through,
+                )
+                .order_by(PriceBar.date)
+                .statement,
+                db.connection(),
+                parse_dates=["date"],
+            )
+            columns = {
+                "timestamps": pd.DatetimeIndex(bars["date"]).as_unit("ns").asi8,
+                "open": bars["open"],
+                "high": bars["high"],
+                "low": bars["low"],
+                "close": bars["close"],
+                "volume": bars["volume"],
+            }
+            for name, (_, dtype) in PACK_COLUMNS.items():
+                np.ascontiguousarray(np.asarray(columns[name], dtype=dtype)).tofile(files[name])
+
+            symbols[symbol] = {
+                "offset": rows,
+                "length": len(bars),
+                "covered_from": covered_from.isoformat(),
+                "through": covered_through.isoformat(),
+                "timezone": timezones.get(symbol),
+            }
+            rows += len(bars)
+    finally:
+        db.close()
+        for f in files.values():
+            f.close()
+
+    with open(build_dir / INDEX_FILE, "w", encoding="utf-8") as f:
+        json.dump({"version": PACK_VERSION, "rows": rows, "symbols": symbols}, f)
+
+    # Publish atomically; readers switch on their next lookup
+    pointer = root / f"{CURRENT_FILE}.tmp"
+    pointer.write_text(build_id, encoding="utf-8")
+    os.replace(pointer, root / CURRENT_FILE)
+    logger.info(f"[BarPack] Published build {build_id}: {len(symbols)} symbols, {rows} rows")
+
+    builds = sorted(p for p in root.iterdir() if p.is_dir())
+    for old in builds[: max(len(builds) - keep_builds, 0)]:
+        # Mapped files stay readable for processes still holding them
+        shutil.rmtree(old, ignore_errors=True)
+
+    return {"symbols": len(symbols), "rows": rows}
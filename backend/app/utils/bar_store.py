@@ -0,0 +1,640 @@
+"""
+Persistent daily OHLCV bar store backed by the local SQLite cache.
+
+Closed trading days never change, so once a date range has been downloaded it is
+served from disk. Only ranges missing from the fetch log (and the still-open
+current day) go upstream to Yahoo Finance.
+"""
+
+import logging
+import re
+import threading
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import and_, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from ..config import settings
+from ..database.connection import Base, SessionLocal
+from ..database.models import PriceBar, PriceFetchLog
+from ..helpers.yfinance import EmptyDataError, YFinanceService, validate_ticker_symbol
+from .bar_pack import BarPack, get_bar_pack
+
+logger = logging.getLogger(__name__)
+
+OHLCV_COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+
+# Periods expressible as a calendar date range ("5d" means 5 *trading* days to yfinance)
+PERIOD_PATTERN = re.compile(r"^(\d+)(wk|mo|y)$")
+
+# Inclusive (start, end) range of calendar days
+DateRange = Tuple[datetime, datetime]
+
+
+def period_to_date_range(
+    period: str, today: Optional[datetime] = None
+) -> Optional[Tuple[datetime, datetime]]:
+    """
+    Translate a yfinance period string into an inclusive calendar date range.
+
+    Args:
+        period: Period string (e.g., '1mo', '3mo', '1y', 'ytd')
+        today: Reference date, defaults to the current local date
+
+    Returns:
+        (start, end) tuple, or None if the period cannot be expressed as a range
+    """
+    today = pd.Timestamp(today or datetime.now()).normalize()
+
+    if period == "ytd":
+        return today.replace(month=1, day=1).to_pydatetime(), today.to_pydatetime()
+
+    match = PERIOD_PATTERN.match(period or "")
+    if not match:
+        return None
+
+    amount, unit = int(match.group(1)), match.group(2)
+    if unit == "wk":
+        offset = pd.DateOffset(weeks=amount)
+    elif unit == "mo":
+        offset = pd.DateOffset(months=amount)
+    else:
+        offset = pd.DateOffset(years=amount)
+
+    return (today - offset).to_pydatetime(), today.to_pydatetime()
+
+
+def exchange_today(tz: Optional[str]) -> datetime:
+    """Get today's date (naive midnight) in the exchange timezone."""
+    return (
+        pd.Timestamp.now(tz=tz or settings.default_exchange_timezone)
+        .normalize()
+        .tz_localize(None)
+        .to_pydatetime()
+    )
+
+
+def _has_weekday(start: datetime, end: datetime) -> bool:
+    """Check whether an inclusive date range contains at least one weekday."""
+    return bool(
+        np.busday_count(start.date(), (end + timedelta(days=1)).date(), weekmask="1111100") > 0
+    )
+
+
+def normalize_bars(data: pd.DataFrame) -> pd.DataFrame:
+    """Keep OHLCV columns and drop rows without prices."""
+    data = data[[col for col in OHLCV_COLUMNS if col in data.columns]]
+    data = data.dropna(subset=["Open", "High", "Low", "Close"])
+    data = data.assign(Volume=data["Volume"].fillna(0).astype("int64"))
+    if not isinstance(data.index, pd.DatetimeIndex):
+        data.index = pd.DatetimeIndex(data.index)
+    return data
+
+
+class BarStore:
+    """
+    SQLite-backed daily bar store with incremental range fill.
+    Mirrors the news cache: a fetch log records which closed-day ranges have
+    already been downloaded, and only the gaps are requested upstream.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        pack_loader: Callable[[], Optional[BarPack]] = get_bar_pack,
+    ) -> None:
+        """
+        Initialize bar store.
+
+        Args:
+            session_factory: Factory returning SQLAlchemy sessions
+            pack_loader: Function returning the current bar pack, if any
+        """
+        self._session_factory = session_factory
+        self._pack_loader = pack_loader
+        self._timezones: Dict[str, str] = {}
+        self._initialized = False
+        self._init_lock = threading.Lock()
+
+    def _ensure_initialized(self, db: Session) -> None:
+        """Lazily create the bar tables on first use."""
+        if self._initialized:
+            return
+        # Worker threads of a batch job may all arrive here on a fresh database
+        with self._init_lock:
+            if not self._initialized:
+                Base.metadata.create_all(
+                    bind=db.get_bind(), tables=[PriceBar.__table__, PriceFetchLog.__table__]
+                )
+                self._initialized = True
+
+    def get_bars(self, symbol: str, start_date: datetime, end_date: datetime) -> pd.DataFrame:
+        """
+        Get daily bars for an inclusive date range, fetching only what is missing.
+
+        Args:
+            symbol: Ticker symbol (e.g., '2330.TW')
+            start_date: Start date
+            end_date: End date (inclusive)
+
+        Returns:
+            DataFrame with Open/High/Low/Close/Volume columns and a timestamp index
+
+        Raises:
+            EmptyDataError: If no bars exist for the range
+        """
+        symbol = validate_ticker_symbol(symbol)
+        start_date = pd.Timestamp(start_date).normalize().to_pydatetime()
+        end_date = pd.Timestamp(end_date).normalize().to_pydatetime()
+
+        pack = self._pack_loader()
+        if pack is not None and pack.covers(symbol, start_date):
+            return self._get_packed_bars(pack, symbol, start_date, end_date)
+
+        db = self._session_factory()
+        try:
+            self._ensure_initialized(db)
+            tz = self._get_timezone(db, symbol)
+
+            missing_ranges = self._find_missing_date_ranges(db, symbol, start_date, end_date)
+            open_day_frames = []
+
+            for range_start, range_end in missing_ranges:
+                fetched, tz = self._fetch_range(db, symbol, range_start, range_end, tz)
+                if fetched is not None and not fetched.empty:
+                    open_day_frames.append(fetched)
+
+            return self._assemble(db, symbol, start_date, end_date, tz, open_day_frames)
+        finally:
+            db.close()
+
+    def _get_packed_bars(
+        self, pack: BarPack, symbol: str, start_date: datetime, end_date: datetime
+    ) -> pd.DataFrame:
+        """Read packed days from the memory-mapped pack and only the days after it from SQLite."""
+        data = pack.frame(symbol, start_date, end_date)
+        through = pack.entries[symbol].through
+        if end_date > through:
+            try:
+                tail = self.get_bars(symbol, through + timedelta(days=1), end_date)
+            except EmptyDataError:
+                tail = None
+            if tail is not None:
+                if tail.index.tz is None and data.index.tz is not None:
+                    tail.index = tail.index.tz_localize(data.index.tz)
+                data = pd.concat([data, tail])
+
+        if data.empty:
+            raise EmptyDataError(f"No data available for {symbol}")
+        return data
+
+    def plan_batch(
+        self, symbols: List[str], start_date: datetime, end_date: datetime
+    ) -> Tuple[List[str], Dict[str, List[DateRange]]]:
+        """
+        Split symbols into those served entirely from the store and those needing a download.
+
+        Weekend-only gaps are recorded on the spot, as in get_bars. The still-open
+        day is never recorded, so a range reaching today always lands in the
+        download and today's bars come with the one multi-ticker request.
+
+        Args:
+            symbols: Ticker symbols
+            start_date: Start date
+            end_date: End date (inclusive)
+
+        Returns:
+            Tuple of (stored symbols, symbol to the ranges it is missing)
+        """
+        start_date = pd.Timestamp(start_date).normalize().to_pydatetime()
+        end_date = pd.Timestamp(end_date).normalize().to_pydatetime()
+        hits: List[str] = []
+        misses: Dict[str, List[DateRange]] = {}
+
+        db = self._session_factory()
+        try:
+            self._ensure_initialized(db)
+            for symbol in dict.fromkeys(validate_ticker_symbol(s) for s in symbols):
+                tz = self._get_timezone(db, symbol)
+                ranges = []
+                for range_start, range_end in self._find_missing_date_ranges(
+                    db, symbol, start_date, end_date
+                ):
+                    if _has_weekday(range_start, range_end):
+                        ranges.append((range_start, range_end))
+                    elif range_end < exchange_today(tz):
+                        self._record_fetch(db, symbol, range_start, range_end, tz, 0)
+                if ranges:
+                    misses[symbol] = ranges
+                else:
+                    hits.append(symbol)
+        finally:
+            db.close()
+
+        logger.info(f"[BarStore] Batch of {len(hits) + len(misses)}: {len(misses)} to download")
+        return hits, misses
+
+    def read_stored(self, symbol: str, start_date: datetime, end_date: datetime) -> pd.DataFrame:
+        """
+        Read the stored bars of a batch hit without going upstream.
+
+        Args:
+            symbol: Ticker symbol
+            start_date: Start date
+            end_date: End date (inclusive)
+
+        Returns:
+            DataFrame with Open/High/Low/Close/Volume columns and a timestamp index
+
+        Raises:
+            EmptyDataError: If no bars are stored for the range
+        """
+        return self.complete_batch(symbol, [], None, start_date, end_date)
+
+    @staticmethod
+    def download_batch(misses: Dict[str, List[DateRange]]) -> Dict[str, pd.DataFrame]:
+        """
+        Download the missing ranges of many symbols with one multi-ticker request.
+
+        The request spans from the earliest missing day to the latest one;
+        complete_batch keeps only the missing parts of each symbol.
+
+        Args:
+            misses: Symbol to missing ranges, as returned by plan_batch
+
+        Returns:
+            Symbol to downloaded bars; symbols without data are left out
+        """
+        ranges = [r for symbol_ranges in misses.values() for r in symbol_ranges]
+        if not ranges:
+            return {}
+        first = min(start for start, _ in ranges)
+        last = max(end for _, end in ranges)
+        logger.info(
+            f"[BarStore] Fetching {len(misses)} symbols {first.date()} to {last.date()} upstream"
+        )
+        return YFinanceService.get_stock_data_bulk(
+            list(misses), first.strftime("%Y-%m-%d"), last.strftime("%Y-%m-%d")
+        )
+
+    def complete_batch(
+        self,
+        symbol: str,
+        ranges: List[DateRange],
+        data: Optional[pd.DataFrame],
+        start_date: datetime,
+        end_date: datetime,
+    ) -> pd.DataFrame:
+        """
+        Store a symbol's share of a batch download and read back the requested range.
+
+        Args:
+            symbol: Ticker symbol
+            ranges: Ranges the symbol was missing
+            data: Bars downloaded for the symbol, or None if the download had none
+            start_date: Start date
+            end_date: End date (inclusive)
+
+        Returns:
+            DataFrame with Open/High/Low/Close/Volume columns and a timestamp index
+
+        Raises:
+            EmptyDataError: If no bars exist for the range
+        """
+        symbol = validate_ticker_symbol(symbol)
+        start_date = pd.Timestamp(start_date).normalize().to_pydatetime()
+        end_date = pd.Timestamp(end_date).normalize().to_pydatetime()
+
+        db = self._session_factory()
+        try:
+            self._ensure_initialized(db)
+            tz = self._get_timezone(db, symbol)
+            open_day_frames = []
+            if data is None:
+                # Missing from a multi-ticker answer: the ticker may have failed on
+                # its own, so its gaps stay open for the next request
+                ranges = []
+            else:
+                data = normalize_bars(data)
+                if tz and data.index.tz is None:
+                    # Multi-ticker downloads come back with naive exchange-local dates
+                    data.index = data.index.tz_localize(tz)
+                local_dates = (
+                    data.index.tz_localize(None) if data.index.tz is not None else data.index
+                )
+
+            for range_start, range_end in ranges:
+                in_range = (local_dates >= range_start) & (
+                    local_dates < range_end + timedelta(days=1)
+                )
+                still_open, tz = self._ingest(
+                    db, symbol, range_start, range_end, data[in_range], tz
+                )
+                if still_open is not None and not still_open.empty:
+                    open_day_frames.append(still_open)
+
+            return self._assemble(db, symbol, start_date, end_date, tz, open_day_frames)
+        finally:
+            db.close()
+
+    def _assemble(
+        self,
+        db: Session,
+        symbol: str,
+        start_date: datetime,
+        end_date: datetime,
+        tz: Optional[str],
+        open_day_frames: List[pd.DataFrame],
+    ) -> pd.DataFrame:
+        """Read stored bars and append the still-open day, which is never persisted."""
+        data = self._read_bars(db, symbol, start_date, end_date, tz)
+
+        if open_day_frames:
+            data = pd.concat([data, *open_day_frames])
+            data = data[~data.index.duplicated(keep="last")].sort_index()
+
+        if data.empty:
+            raise EmptyDataError(f"No data available for {symbol}")
+
+        return data
+
+    def _fetch_range(
+        self,
+        db: Session,
+        symbol: str,
+        range_start: datetime,
+        range_end: datetime,
+        tz: Optional[str],
+    ) -> Tuple[Optional[pd.DataFrame], Optional[str]]:
+        """
+        Fetch one missing range upstream, persist its closed days and log coverage.
+
+        Returns:
+            Tuple of (bars for still-open days, exchange timezone)
+        """
+        if not _has_weekday(range_start, range_end):
+            # Weekend-only gap: nothing can trade, record it without a round trip
+            if range_end < exchange_today(tz):
+                self._record_fetch(db, symbol, range_start, range_end, tz, 0)
+            return None, tz
+
+        logger.info(
+            f"[BarStore] Fetching {symbol} {range_start.date()} to {range_end.date()} upstream"
+        )
+
+        try:
+            data = YFinanceService.get_stock_data(
+                symbol=symbol,
+                start_date=range_start.strftime("%Y-%m-%d"),
+                end_date=range_end.strftime("%Y-%m-%d"),
+            )
+        except EmptyDataError:
+            data = pd.DataFrame(columns=OHLCV_COLUMNS)
+
+        return self._ingest(db, symbol, range_start, range_end, data, tz)
+
+    def _ingest(
+        self,
+        db: Session,
+        symbol: str,
+        range_start: datetime,
+        range_end: datetime,
+        data: pd.DataFrame,
+        tz: Optional[str],
+    ) -> Tuple[Optional[pd.DataFrame], Optional[str]]:
+        """
+        Persist the closed days of a downloaded range and log its coverage.
+
+        Returns:
+            Tuple of (bars for still-open days, exchange timezone)
+        """
+        if isinstance(data.index, pd.DatetimeIndex) and data.index.tz is not None:
+            tz = str(data.index.tz)
+
+        data = normalize_bars(data)
+
+        # An empty answer for a symbol we know nothing about may be a bad ticker
+        # or an upstream hiccup; do not mark the range as covered in that case.
+        if data.empty and not self._has_bars(db, symbol):
+            return None, tz
+
+        today = exchange_today(tz)
+        local_dates = data.index.tz_localize(None) if data.index.tz is not None else data.index
+        closed = data[local_dates < today]
+        still_open = data[local_dates >= today]
+
+        self._write_bars(db, symbol, closed)
+
+        closed_end = min(range_end, today - timedelta(days=1))
+        if closed_end >= range_start:
+            self._record_fetch(db, symbol, range_start, closed_end, tz, len(closed))
+
+        return still_open, tz
+
+    def _find_missing_date_ranges(
+        self, db: Session, symbol: str, start_date: datetime, end_date: datetime
+    ) -> List[Tuple[datetime, datetime]]:
+        """
+        Find missing date ranges that need to be fetched.
+        Uses the fetch log to determine what has been downloaded before.
+
+        Args:
+            db: Database session
+            symbol: Stock symbol
+            start_date: Requested start date
+            end_date: Requested end date
+
+        Returns:
+            List of (start, end) tuples for missing ranges
+        """
+        fetch_logs = (
+            db.query(PriceFetchLog)
+            .filter(
+                and_(
+                    PriceFetchLog.symbol == symbol,
+                    # Check for overlap: log.start <= our.end AND log.end >= our.start
+                    PriceFetchLog.start_date <= end_date,
+                    PriceFetchLog.end_date >= start_date,
+                )
+            )
+            .order_by(PriceFetchLog.start_date)
+            .all()
+        )
+
+        if not fetch_logs:
+            return [(start_date, end_date)]
+
+        # Build a set of all covered dates
+        cached_dates = set()
+        for log in fetch_logs:
+            current = log.start_date
+            while current <= log.end_date:
+                cached_dates.add(current.date())
+                current += timedelta(days=1)
+
+        # Find gaps
+        missing_ranges = []
+        current_range_start = None
+        current_date = start_date
+
+        while current_date <= end_date:
+            if current_date.date() not in cached_dates:
+                if current_range_start is None:
+                    current_range_start = current_date
+            elif current_range_start is not None:
+                missing_ranges.append((current_range_start, current_date - timedelta(days=1)))
+                current_range_start = None
+
+            current_date += timedelta(days=1)
+
+        if current_range_start is not None:
+            missing_ranges.append((current_range_start, end_date))
+
+        logger.debug(
+            f"[BarStore] {symbol} {start_date.date()} to {end_date.date()}: "
+            f"{len(missing_ranges)} missing range(s)"
+        )
+        return missing_ranges
+
+    def _read_bars(
+        self,
+        db: Session,
+        symbol: str,
+        start_date: datetime,
+        end_date: datetime,
+        tz: Optional[str],
+    ) -> pd.DataFrame:
+        """Read stored bars for an inclusive date range."""
+        query = (
+            select(
+                PriceBar.date,
+                PriceBar.open,
+                PriceBar.high,
+                PriceBar.low,
+                PriceBar.close,
+                PriceBar.volume,
+            )
+            .where(
+                and_(
+                    PriceBar.symbol == symbol,
+                    PriceBar.date >= start_date,
+                    PriceBar.date <= end_date,
+                )
+            )
+            .order_by(PriceBar.date)
+        )
+        data = pd.read_sql(query, db.connection(), parse_dates=["date"])
+        data.columns = ["Date", *OHLCV_COLUMNS]
+        data = data.set_index("Date")
+        data["Volume"] = data["Volume"].astype("int64")
+        if tz:
+            data.index = data.index.tz_localize(tz)
+        return data
+
+    def _write_bars(self, db: Session, symbol: str, data: pd.DataFrame) -> None:
+        """Upsert bars into the store."""
+        if data.empty:
+            return
+
+        dates = data.index.tz_localize(None) if data.index.tz is not None else data.index
+        rows = [
+            {
+                "symbol": symbol,
+                "date": date.to_pydatetime(),
+                "open": float(o),
+                "high": float(h),
+                "low": float(lo),
+                "close": float(c),
+                "volume": int(v),
+            }
+            for date, o, h, lo, c, v in zip(
+                dates,
+                data["Open"].to_numpy(),
+                data["High"].to_numpy(),
+                data["Low"].to_numpy(),
+                data["Close"].to_numpy(),
+                data["Volume"].to_numpy(),
+            )
+        ]
+
+        stmt = sqlite_insert(PriceBar)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["symbol", "date"],
+            set_={
+                "open": stmt.excluded.open,
+                "high": stmt.excluded.high,
+                "low": stmt.excluded.low,
+                "close": stmt.excluded.close,
+                "volume": stmt.excluded.volume,
+            },
+        )
+        db.execute(stmt, rows)
+        db.commit()
+
+    def _record_fetch(
+        self,
+        db: Session,
+        symbol: str,
+        start_date: datetime,
+        end_date: datetime,
+        tz: Optional[str],
+        bars_found: int,
+    ) -> None:
+        """Record a downloaded closed-day range in the fetch log."""
+        db.add(
+            PriceFetchLog(
+                symbol=symbol,
+                start_date=start_date,
+                end_date=end_date,
+                timezone=tz,
+                bars_found=bars_found,
+            )
+        )
+        db.commit()
+
+    def get_timezone(self, symbol: str) -> Optional[str]:
+        """
+        Get the exchange timezone recorded for a symbol, remembered once known.
+
+        Args:
+            symbol: Ticker symbol
+
+        Returns:
+            Timezone name, or None if the symbol has never been fetched
+        """
+        symbol = validate_ticker_symbol(symbol)
+        tz = self._timezones.get(symbol)
+        if tz is not None:
+            return tz
+        db = self._session_factory()
+        try:
+            self._ensure_initialized(db)
+            tz = self._get_timezone(db, symbol)
+        finally:
+            db.close()
+        if tz is not None:
+            self._timezones[symbol] = tz
+        return tz
+
+    @staticmethod
+    def _get_timezone(db: Session, symbol: str) -> Optional[str]:
+        """Get the exchange timezone recorded for a symbol, if any."""
+        log = (
+            db.query(PriceFetchLog.timezone)
+            .filter(PriceFetchLog.symbol == symbol, PriceFetchLog.timezone.isnot(None))
+            .first()
+        )
+        return log.timezone if log else None
+
+    @staticmethod
+    def _has_bars(db: Session, symbol: str) -> bool:
+        """Check whether any bar has been stored for a symbol."""
+        return db.query(PriceBar.id).filter(PriceBar.symbol == symbol).first() is not None
+
+
+# Global bar store instance
+bar_store = BarStore()
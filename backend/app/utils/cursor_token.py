@@ -0,0 +1,146 @@
+"""
+Signed, compact playback cursor tokens for stateless playback.
+
+A token carries everything needed to answer a playback request: symbol, the
+exact date range of the bars and the cursor index. It is signed with
+HMAC-SHA256 so clients cannot move into ranges or symbols they did not start.
+Every worker sharing ``settings.cursor_token_secret`` can verify any token.
+"""
+
+import base64
+import hashlib
+import hmac
+import json
+import logging
+import secrets
+from typing import NamedTuple
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+TOKEN_PREFIX = "c1."
+_SIGNATURE_BYTES = 16
+
+
+class InvalidCursorTokenError(Exception):
+    """Exception raised when a cursor token is malformed or its signature is wrong."""
+
+    pass
+
+
+class Cursor(NamedTuple):
+    """Decoded cursor token."""
+
+    symbol: str
+    first_date: str
+    last_date: str
+    index: int
+
+
+_SECRET = None
+
+
+def _secret() -> bytes:
+    global _SECRET
+    if _SECRET is None:
+        if settings.cursor_token_secret:
+            _SECRET = settings.cursor_token_secret.encode()
+        else:
+            _SECRET = secrets.token_bytes(32)
+    return _SECRET
+
+
+def stateless_cursors_available() -> bool:
+    """
+    Check whether tokens signed here verify on every worker.
+
+    Without CURSOR_TOKEN_SECRET each process signs with its own random key, so
+    stateless cursors only work when a single worker serves all requests.
+    """
+    return bool(settings.cursor_token_secret) or settings.web_concurrency <= 1
+
+
+def check_cursor_secret() -> None:
+    """Warn at startup when stateless cursors are limited by a missing secret."""
+    if settings.cursor_token_secret:
+        return
+    if stateless_cursors_available():
+        logger.warning(
+            "CURSOR_TOKEN_SECRET is not set; stateless cursors are only valid on this worker"
+        )
+    else:
+        logger.warning(
+            f"CURSOR_TOKEN_SECRET is not set with {settings.web_concurrency} workers; "
+            "stateless playback is disabled"
+        )
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def _b64decode(text: str) -> bytes:
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+def _sign(payload: str) -> str:
+    digest = hmac.new(_secret(), payload.encode(), hashlib.sha256).digest()
+    return _b64encode(digest[:_SIGNATURE_BYTES])
+
+
+def is_cursor_token(value: str) -> bool:
+    """Check whether a playback_id is a stateless cursor token."""
+    return value.startswith(TOKEN_PREFIX)
+
+
+def encode_cursor(cursor: Cursor) -> str:
+    """
+    Sign a cursor into a URL-safe token.
+
+    Args:
+        cursor: Cursor to encode
+
+    Returns:
+        Token of the form ``c1.<payload>.<signature>``
+    """
+    body = json.dumps(
+        [1, cursor.symbol, cursor.first_date, cursor.last_date, cursor.index],
+        separators=(",", ":"),
+    )
+    payload = _b64encode(body.encode())
+    return f"{TOKEN_PREFIX}{payload}.{_sign(payload)}"
+
+
+def decode_cursor(token: str) -> Cursor:
+    """
+    Verify and decode a cursor token.
+
+    Args:
+        token: Token produced by encode_cursor
+
+    Returns:
+        Decoded Cursor
+
+    Raises:
+        InvalidCursorTokenError: If the token is malformed or tampered with
+    """
+    if not is_cursor_token(token):
+        raise InvalidCursorTokenError("Not a cursor token")
+
+    try:
+        payload, signature = token[len(TOKEN_PREFIX) :].split(".")
+    except ValueError:
+        raise InvalidCursorTokenError("Malformed cursor token") from None
+
+    if not hmac.compare_digest(signature, _sign(payload)):
+        raise InvalidCursorTokenError("Invalid cursor token signature")
+
+    try:
+        version, symbol, first_date, last_date, index = json.loads(_b64decode(payload))
+    except (ValueError, TypeError):
+        raise InvalidCursorTokenError("Malformed cursor token payload") from None
+    if version != 1 or not isinstance(index, int) or index < 0:
+        raise InvalidCursorTokenError("Unsupported cursor token")
+
+    return Cursor(symbol, first_date, last_date, index)
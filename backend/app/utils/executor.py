@@ -0,0 +1,187 @@
+"""
+Bounded thread pool for blocking upstream calls made from async routes.
+
+yfinance and the bar store are synchronous. Calling them directly inside an
+``async def`` route blocks the event loop, so every other request on the worker
+(including /health) waits on one slow Yahoo response. Routes instead await
+``upstream_executor.run(...)``, which runs the call on a size-limited pool with
+a per-call timeout and a bounded wait queue.
+"""
+
+import asyncio
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class UpstreamTimeoutError(Exception):
+    """Exception raised when a blocking call exceeds its timeout."""
+
+    pass
+
+
+class UpstreamSaturatedError(Exception):
+    """Exception raised when the wait queue of the pool is full."""
+
+    pass
+
+
+class BoundedExecutor:
+    """
+    Size-limited thread pool with queue-depth metrics.
+
+    Calls that time out while still queued are cancelled and never run. Calls
+    that are already running cannot be interrupted; their result is discarded.
+    """
+
+    def __init__(self, max_workers: int, max_queue: int, default_timeout: float) -> None:
+        """
+        Initialize executor.
+
+        Args:
+            max_workers: Number of worker threads
+            max_queue: Maximum number of calls waiting for a free worker
+            default_timeout: Per-call timeout in seconds
+        """
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.default_timeout = default_timeout
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="upstream")
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._active = 0
+        self._max_queued_seen = 0
+        self._submitted = 0
+        self._completed = 0
+        self._timed_out = 0
+        self._cancelled = 0
+        self._rejected = 0
+
+    async def run(
+        self, func: Callable[..., T], *args: Any, timeout: Optional[float] = None, **kwargs: Any
+    ) -> T:
+        """
+        Run a blocking function on the pool and await its result.
+
+        Args:
+            func: Blocking callable
+            *args: Positional arguments for func
+            timeout: Seconds to wait, defaults to the executor timeout
+            **kwargs: Keyword arguments for func
+
+        Returns:
+            Result of func
+
+        Raises:
+            UpstreamSaturatedError: If the wait queue is full
+            UpstreamTimeoutError: If the call does not finish in time
+        """
+        timeout = timeout or self.default_timeout
+
+        with self._lock:
+            if self._queued >= self.max_queue:
+                self._rejected += 1
+                raise UpstreamSaturatedError(
+                    f"Upstream pool saturated ({self._queued} calls waiting)"
+                )
+            self._queued += 1
+            self._submitted += 1
+            self._max_queued_seen = max(self._max_queued_seen, self._queued)
+
+        future = self._pool.submit(self._execute, func, args, kwargs)
+        future.add_done_callback(self._on_done)
+
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+        except asyncio.TimeoutError as e:
+            future.cancel()
+            with self._lock:
+                self._timed_out += 1
+            name = getattr(func, "__name__", repr(func))
+            logger.warning(f"[BoundedExecutor] {name} timed out after {timeout}s")
+            raise UpstreamTimeoutError(f"Upstream call {name} timed out") from e
+        except asyncio.CancelledError:
+            # Client went away: drop the call if it has not started yet
+            future.cancel()
+            raise
+
+    def submit(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> Optional[Future]:
+        """
+        Start a blocking function in the background without waiting for it.
+
+        Meant for best-effort work such as prefetching: when the wait queue
+        is full the call is skipped instead of raising.
+
+        Args:
+            func: Blocking callable
+            *args: Positional arguments for func
+            **kwargs: Keyword arguments for func
+
+        Returns:
+            Future of the call, or None if the pool is saturated
+        """
+        with self._lock:
+            if self._queued >= self.max_queue:
+                self._rejected += 1
+                return None
+            self._queued += 1
+            self._submitted += 1
+            self._max_queued_seen = max(self._max_queued_seen, self._queued)
+
+        future = self._pool.submit(self._execute, func, args, kwargs)
+        future.add_done_callback(self._on_done)
+        return future
+
+    def _execute(self, func: Callable[..., T], args: tuple, kwargs: Dict[str, Any]) -> T:
+        """Worker-side wrapper tracking queued and active counts."""
+        with self._lock:
+            self._queued -= 1
+            self._active += 1
+        try:
+            return func(*args, **kwargs)
+        finally:
+            with self._lock:
+                self._active -= 1
+                self._completed += 1
+
+    def _on_done(self, future: Future) -> None:
+        """Account for calls cancelled before a worker picked them up."""
+        if future.cancelled():
+            with self._lock:
+                self._queued -= 1
+                self._cancelled += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Get pool saturation metrics."""
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "active": self._active,
+                "queue_depth": self._queued,
+                "max_queue": self.max_queue,
+                "max_queue_depth_seen": self._max_queued_seen,
+                "submitted": self._submitted,
+                "completed": self._completed,
+                "timed_out": self._timed_out,
+                "cancelled": self._cancelled,
+                "rejected": self._rejected,
+            }
+
+    def shutdown(self) -> None:
+        """Stop accepting work and drop queued calls."""
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+# Global executor for upstream market data calls
+upstream_executor = BoundedExecutor(
+    max_workers=settings.upstream_max_workers,
+    max_queue=settings.upstream_max_queue,
+    default_timeout=settings.upstream_timeout_seconds,
+)
@@ -0,0 +1,80 @@
+"""
+Thread-safe token bucket for pacing upstream requests.
+
+Yahoo Finance throttles clients that burst too many downloads. A token bucket
+allows short bursts up to its capacity while holding the long-run request
+rate to ``rate`` per second, however many worker threads share it.
+"""
+
+import threading
+import time
+from typing import Callable
+
+
+class TokenBucket:
+    """
+    Token bucket refilled continuously at a fixed rate.
+
+    Each request takes one token; callers block until a token is available.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: float,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        """
+        Initialize a full bucket.
+
+        Args:
+            rate: Tokens added per second
+            capacity: Maximum tokens held, i.e. the largest burst
+            clock: Monotonic clock, replaceable in tests
+            sleep: Sleep function, replaceable in tests
+        """
+        if rate <= 0 or capacity < 1:
+            raise ValueError("Token bucket needs rate > 0 and capacity >= 1")
+        self.rate = rate
+        self.capacity = capacity
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+        self.waited_seconds = 0.0
+
+    def _refill(self) -> None:
+        """Add the tokens accrued since the last update. Lock held."""
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self) -> bool:
+        """Take a token if one is available, without waiting."""
+        with self._lock:
+            self._refill()
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            return False
+
+    def acquire(self) -> float:
+        """
+        Take a token, waiting for the bucket to refill if it is empty.
+
+        Returns:
+            Seconds spent waiting
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    self.waited_seconds += waited
+                    return waited
+                delay = (1 - self._tokens) / self.rate
+            self._sleep(delay)
+            waited += delay
@@ -0,0 +1,84 @@
+"""
+On-disk snapshots of the in-process session store.
+
+With the default ``memory://`` store a deploy or restart drops every playback
+cursor and trading account. The records are small (cursor, dataset key and
+range, account ledger), so the whole store is written periodically and at
+shutdown as one gzip-compressed JSON file and loaded back at startup.
+
+Restore is lazy: only the records are loaded. A session's bars are
+rehydrated on its first request through the normal restore path, which
+reads the exact range from the local bar store instead of the upstream API.
+Durable stores (SQLite, Redis) survive restarts on their own and are not
+snapshotted.
+"""
+
+import gzip
+import json
+import logging
+import os
+import time
+from pathlib import Path
+
+from .session_store import SessionStore
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_VERSION = 1
+
+
+def save_snapshot(store: SessionStore, path: str) -> int:
+    """
+    Write all live records of a store to a snapshot file atomically.
+
+    Args:
+        store: Non-durable session store
+        path: Snapshot file path
+
+    Returns:
+        Number of records written
+    """
+    records = store.dump()
+    payload = {"version": SNAPSHOT_VERSION, "saved_at": time.time(), "records": records}
+
+    target = Path(path)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp = target.with_name(target.name + ".tmp")
+    with gzip.open(tmp, "wt", encoding="utf-8", compresslevel=6) as f:
+        json.dump(payload, f, separators=(",", ":"))
+    # A crash mid-write leaves the previous snapshot intact
+    os.replace(tmp, target)
+
+    logger.debug(f"Saved session snapshot with {len(records)} records to {path}")
+    return len(records)
+
+
+def load_snapshot(store: SessionStore, path: str) -> int:
+    """
+    Load a snapshot file into a store, skipping expired and existing records.
+
+    Args:
+        store: Session store to fill
+        path: Snapshot file path
+
+    Returns:
+        Number of records restored (0 if there is no usable snapshot)
+    """
+    if not os.path.exists(path):
+        return 0
+
+    try:
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            payload = json.load(f)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Ignoring unreadable session snapshot {path}: {e}")
+        return 0
+
+    if payload.get("version") != SNAPSHOT_VERSION:
+        logger.warning(f"Ignoring session snapshot {path} with version {payload.get('version')}")
+        return 0
+
+    restored = store.load([tuple(record) for record in payload.get("records", [])])
+    age = time.time() - payload.get("saved_at", time.time())
+    logger.info(f"Restored {restored} session records from snapshot taken {age:.0f}s ago")
+    return restored
@@ -0,0 +1,627 @@
+"""
+Shared key-value store for playback cursors and trading accounts.
+
+Playback and trading state used to live only in module-level dicts, so every
+request for a playback_id had to reach the worker that created it and a restart
+wiped every replay. Services now keep small JSON records (cursor position,
+dataset key, account balances) in a pluggable store; bar data itself is never
+stored, only referenced by dataset key and reloaded through the bar caches.
+
+Backends are selected with ``settings.session_store_url``:
+
+- ``memory://`` (default): process-local, same behavior as before
+- ``sqlite:///data/sessions.db``: one file shared by workers on the same host (WAL mode)
+- ``redis://[:password@]host:6379/0``: any Redis-protocol server, shared across hosts
+"""
+
+import json
+import logging
+import random
+import socket
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import unquote, urlparse
+
+from sqlalchemy import (
+    Column,
+    Float,
+    MetaData,
+    String,
+    Table,
+    Text,
+    create_engine,
+    event,
+    func,
+    select,
+)
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+# Record field holding the stamp compared by compare_and_set
+REVISION_FIELD = "rev"
+
+# Read-modify-write attempts before update() gives up on a contended key
+UPDATE_ATTEMPTS = 8
+
+# Upper bound of the first retry delay after a conflict, doubled on every attempt
+UPDATE_BACKOFF_SECONDS = 0.005
+
+
+class SessionStoreError(Exception):
+    """Exception raised when the session store backend fails."""
+
+    pass
+
+
+def _dumps(value: Dict[str, Any]) -> str:
+    return json.dumps(value, separators=(",", ":"))
+
+
+def _revision(record: Optional[Dict[str, Any]]) -> Optional[str]:
+    return None if record is None else record.get(REVISION_FIELD)
+
+
+class SessionStore(ABC):
+    """
+    Key-value store of JSON records with per-key expiry.
+
+    Keys are namespaced by the caller (e.g. ``playback:<id>``). A TTL of zero or
+    less stores the record already expired, so it is removed by the next purge.
+    """
+
+    name = "base"
+    # True when records survive a process restart without snapshots
+    durable = True
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Get a live record, or None if missing or expired."""
+
+    @abstractmethod
+    def set(self, key: str, value: Dict[str, Any], ttl_seconds: float) -> None:
+        """Store a record that expires after ttl_seconds."""
+
+    @abstractmethod
+    def delete(self, key: str) -> bool:
+        """Delete a record. Returns True if it existed."""
+
+    @abstractmethod
+    def touch(self, key: str, ttl_seconds: float) -> bool:
+        """Reset the expiry of a record. Returns True if it exists."""
+
+    @abstractmethod
+    def compare_and_set(
+        self,
+        key: str,
+        value: Dict[str, Any],
+        ttl_seconds: float,
+        expected: Optional[Dict[str, Any]],
+    ) -> bool:
+        """
+        Store a record only if nobody else wrote the key since it was read.
+
+        Args:
+            key: Record key
+            value: New record
+            ttl_seconds: Time-to-live of the new record
+            expected: Record as it was read, or None if it was missing; the
+                write succeeds only if the live record still carries the same
+                revision stamp (or is still missing)
+
+        Returns:
+            True if the record was stored
+        """
+
+    def update(
+        self,
+        key: str,
+        change: Callable[[Optional[Dict[str, Any]]], Optional[Dict[str, Any]]],
+        ttl_seconds: float,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Read-modify-write a record with optimistic concurrency.
+
+        Each write stamps a fresh revision. When another worker writes the key
+        between the read and the write, the change is applied again to the
+        newer record.
+
+        Args:
+            key: Record key
+            change: Function receiving the live record (None if missing) and
+                returning the new record, or None to leave it unchanged; it
+                may run more than once
+            ttl_seconds: Time-to-live of the written record
+
+        Returns:
+            The written record, or None if change left the record unchanged
+
+        Raises:
+            SessionStoreError: If the key stayed contended for every attempt
+        """
+        for attempt in range(UPDATE_ATTEMPTS):
+            current = self.get(key)
+            value = change(current)
+            if value is None:
+                return None
+            value = {**value, REVISION_FIELD: uuid.uuid4().hex[:12]}
+            if self.compare_and_set(key, value, ttl_seconds, current):
+                return value
+            # Jittered backoff so writers contending for the key stop colliding
+            time.sleep(random.uniform(0, UPDATE_BACKOFF_SECONDS * 2**attempt))
+        raise SessionStoreError(f"Gave up updating {key} after {UPDATE_ATTEMPTS} conflicts")
+
+    def purge_expired(self) -> List[str]:
+        """
+        Remove expired records for backends without native expiry.
+
+        Returns:
+            Keys that were removed
+        """
+        return []
+
+    def dump(self) -> List[Tuple[str, Dict[str, Any], float]]:
+        """
+        Export live records for a snapshot.
+
+        Returns:
+            List of (key, value, expires_at) tuples
+
+        Raises:
+            NotImplementedError: For durable backends, which need no snapshots
+        """
+        raise NotImplementedError(f"{self.name} store does not support snapshots")
+
+    def load(self, records: List[Tuple[str, Dict[str, Any], float]]) -> int:
+        """
+        Import snapshot records, keeping their original expiry.
+
+        Expired records and keys that already exist are skipped, so a
+        snapshot never overwrites newer state.
+
+        Returns:
+            Number of records imported
+        """
+        now = time.time()
+        loaded = 0
+        for key, value, expires_at in records:
+            if expires_at > now and self.get(key) is None:
+                self.set(key, value, expires_at - now)
+                loaded += 1
+        return loaded
+
+    @abstractmethod
+    def close(self) -> None:
+        """Release connections."""
+
+
+class MemorySessionStore(SessionStore):
+    """Process-local store; records are kept serialized like the shared backends."""
+
+    name = "memory"
+    durable = False
+
+    def __init__(self) -> None:
+        """Initialize memory store."""
+        self._records: Dict[str, Tuple[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            record = self._records.get(key)
+        if record is None or record[1] <= time.time():
+            return None
+        return json.loads(record[0])
+
+    def set(self, key: str, value: Dict[str, Any], ttl_seconds: float) -> None:
+        with self._lock:
+            self._records[key] = (_dumps(value), time.time() + ttl_seconds)
+
+    def delete(self, key: str) -> bool:
+        with self._lock:
+            return self._records.pop(key, None) is not None
+
+    def touch(self, key: str, ttl_seconds: float) -> bool:
+        with self._lock:
+            record = self._records.get(key)
+            if record is None:
+                return False
+            self._records[key] = (record[0], time.time() + ttl_seconds)
+            return True
+
+    def compare_and_set(
+        self,
+        key: str,
+        value: Dict[str, Any],
+        ttl_seconds: float,
+        expected: Optional[Dict[str, Any]],
+    ) -> bool:
+        now = time.time()
+        with self._lock:
+            record = self._records.get(key)
+            live = json.loads(record[0]) if record is not None and record[1] > now else None
+            if (live is None) != (expected is None) or _revision(live) != _revision(expected):
+                return False
+            self._records[key] = (_dumps(value), now + ttl_seconds)
+            return True
+
+    def purge_expired(self) -> List[str]:
+        now = time.time()
+        with self._lock:
+            expired = [key for key, (_, expires_at) in self._records.items() if expires_at <= now]
+            for key in expired:
+                del self._records[key]
+        return expired
+
+    def dump(self) -> List[Tuple[str, Dict[str, Any], float]]:
+        now = time.time()
+        with self._lock:
+            records = list(self._records.items())
+        return [
+            (key, json.loads(value), expires_at)
+            for key, (value, expires_at) in records
+            if expires_at > now
+        ]
+
+    def close(self) -> None:
+        """Nothing to release; records live as long as the process."""
+
+
+_metadata = MetaData()
+
+_session_state = Table(
+    "session_state",
+    _metadata,
+    Column("key", String(200), primary_key=True),
+    Column("value", Text, nullable=False),
+    Column("expires_at", Float, nullable=False, index=True),
+)
+
+
+def _enable_wal(dbapi_connection: Any, connection_record: Any) -> None:
+    """Let readers in other workers proceed while one worker writes."""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA busy_timeout=5000")
+    cursor.close()
+
+
+class SQLiteSessionStore(SessionStore):
+    """SQLite store shared by all workers on one host."""
+
+    name = "sqlite"
+
+    def __init__(self, url: str) -> None:
+        """
+        Initialize SQLite store.
+
+        Args:
+            url: SQLAlchemy SQLite URL, e.g. ``sqlite:///data/sessions.db``
+        """
+        path = url.split("///", 1)[1] if "///" in url else ""
+        if path and path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+
+        self._engine = create_engine(url, connect_args={"check_same_thread": False})
+        event.listen(self._engine, "connect", _enable_wal)
+        _metadata.create_all(self._engine)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        query = select(_session_state.c.value).where(
+            _session_state.c.key == key, _session_state.c.expires_at > time.time()
+        )
+        with self._engine.connect() as conn:
+            value = conn.execute(query).scalar()
+        return json.loads(value) if value is not None else None
+
+    def set(self, key: str, value: Dict[str, Any], ttl_seconds: float) -> None:
+        row = {"key": key, "value": _dumps(value), "expires_at": time.time() + ttl_seconds}
+        stmt = sqlite_insert(_session_state).values(**row)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["key"],
+            set_={"value": stmt.excluded.value, "expires_at": stmt.excluded.expires_at},
+        )
+        with self._engine.begin() as conn:
+            conn.execute(stmt)
+
+    def delete(self, key: str) -> bool:
+        with self._engine.begin() as conn:
+            result = conn.execute(_session_state.delete().where(_session_state.c.key == key))
+        return result.rowcount > 0
+
+    def touch(self, key: str, ttl_seconds: float) -> bool:
+        stmt = (
+            _session_state.update()
+            .where(_session_state.c.key == key)
+            .values(expires_at=time.time() + ttl_seconds)
+        )
+        with self._engine.begin() as conn:
+            result = conn.execute(stmt)
+        return result.rowcount > 0
+
+    def compare_and_set(
+        self,
+        key: str,
+        value: Dict[str, Any],
+        ttl_seconds: float,
+        expected: Optional[Dict[str, Any]],
+    ) -> bool:
+        now = time.time()
+        row = {"key": key, "value": _dumps(value), "expires_at": now + ttl_seconds}
+        if expected is None:
+            # Insert, or take over a row that has expired but not been purged yet
+            stmt = sqlite_insert(_session_state).values(**row)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["key"],
+                set_={"value": stmt.excluded.value, "expires_at": stmt.excluded.expires_at},
+                where=_session_state.c.expires_at <= now,
+            )
+        else:
+            # One statement, so the revision check and the write are atomic
+            stmt = (
+                _session_state.update()
+                .where(
+                    _session_state.c.key == key,
+                    _session_state.c.expires_at > now,
+                    func.json_extract(_session_state.c.value, f"$.{REVISION_FIELD}").is_(
+                        _revision(expected)
+                    ),
+                )
+                .values(value=row["value"], expires_at=row["expires_at"])
+            )
+        with self._engine.begin() as conn:
+            result = conn.execute(stmt)
+        return result.rowcount > 0
+
+    def purge_expired(self) -> List[str]:
+        expired_rows = _session_state.c.expires_at <= time.time()
+        with self._engine.begin() as conn:
+            keys = conn.execute(select(_session_state.c.key).where(expired_rows)).scalars().all()
+            if keys:
+                conn.execute(_session_state.delete().where(_session_state.c.key.in_(keys)))
+        return list(keys)
+
+    def close(self) -> None:
+        self._engine.dispose()
+
+
+class _RespClient:
+    """Minimal blocking Redis protocol (RESP2) client over one socket."""
+
+    def __init__(
+        self, host: str, port: int, db: int, password: Optional[str], timeout: float
+    ) -> None:
+        self.host = host
+        self.port = port
+        self.db = db
+        self.password = password
+        self.timeout = timeout
+        self._sock: Optional[socket.socket] = None
+        self._file: Any = None
+        self._lock = threading.Lock()
+
+    def execute(self, *args: Any) -> Any:
+        """Send one command and read its reply, reconnecting once on a broken socket."""
+        with self._lock:
+            try:
+                return self._roundtrip(args)
+            except OSError:
+                self._disconnect()
+            try:
+                return self._roundtrip(args)
+            except OSError as e:
+                self._disconnect()
+                raise SessionStoreError(f"Redis at {self.host}:{self.port} unavailable: {e}") from e
+
+    def execute_if(
+        self, key: str, check: Callable[[Optional[bytes]], bool], *commands: Tuple[Any, ...]
+    ) -> bool:
+        """
+        Run commands in one MULTI/EXEC block if ``check`` accepts the key's value.
+
+        The key is WATCHed while it is read, so the block is discarded when
+        another client writes it before EXEC.
+
+        Returns:
+            True if the commands ran
+        """
+        with self._lock:
+            try:
+                self._roundtrip(("WATCH", key))
+                if not check(self._roundtrip(("GET", key))):
+                    self._roundtrip(("UNWATCH",))
+                    return False
+                self._roundtrip(("MULTI",))
+                for command in commands:
+                    self._roundtrip(command)
+                return self._roundtrip(("EXEC",)) is not None
+            except OSError as e:
+                self._disconnect()
+                raise SessionStoreError(f"Redis at {self.host}:{self.port} unavailable: {e}") from e
+
+    def _roundtrip(self, args: Tuple[Any, ...]) -> Any:
+        if self._sock is None:
+            self._connect()
+        self._sock.sendall(self._encode(args))
+        return self._read_reply()
+
+    def _connect(self) -> None:
+        self._sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        self._file = self._sock.makefile("rb")
+        if self.password:
+            self._sock.sendall(self._encode(("AUTH", self.password)))
+            self._read_reply()
+        if self.db:
+            self._sock.sendall(self._encode(("SELECT", self.db)))
+            self._read_reply()
+
+    def _disconnect(self) -> None:
+        if self._sock is not None:
+            try:
+                self._sock.close()
+            except OSError:
+                pass
+        self._sock = None
+        self._file = None
+
+    @staticmethod
+    def _encode(args: Tuple[Any, ...]) -> bytes:
+        parts = [b"*%d\r\n" % len(args)]
+        for arg in args:
+            data = arg if isinstance(arg, bytes) else str(arg).encode()
+            parts.append(b"$%d\r\n%s\r\n" % (len(data), data))
+        return b"".join(parts)
+
+    def _read_reply(self) -> Any:
+        line = self._file.readline()
+        if not line:
+            raise ConnectionError("Connection closed by server")
+        prefix, payload = line[:1], line[1:-2]
+
+        if prefix == b"+":
+            return payload.decode()
+        if prefix == b"-":
+            raise SessionStoreError(payload.decode())
+        if prefix == b":":
+            return int(payload)
+        if prefix == b"$":
+            length = int(payload)
+            if length < 0:
+                return None
+            data = self._file.read(length + 2)
+            return data[:-2]
+        if prefix == b"*":
+            length = int(payload)
+            return None if length < 0 else [self._read_reply() for _ in range(length)]
+        raise SessionStoreError(f"Unexpected reply {line!r}")
+
+    def close(self) -> None:
+        with self._lock:
+            self._disconnect()
+
+
+class RedisSessionStore(SessionStore):
+    """
+    Store on any Redis-protocol server; expiry is handled by the server.
+
+    Redis drops expired keys silently, so every write also records the key's
+    expiry in a sorted set. purge_expired scans that index for keys that are
+    gone, letting the sweep notify eviction listeners like the other backends.
+    """
+
+    name = "redis"
+
+    def __init__(self, url: str, prefix: str = "stockreplay:", timeout: float = 5.0) -> None:
+        """
+        Initialize Redis store.
+
+        Args:
+            url: ``redis://[:password@]host[:port][/db]``
+            prefix: Prefix added to every key
+            timeout: Socket timeout in seconds
+        """
+        parsed = urlparse(url)
+        db = int(parsed.path.lstrip("/") or 0)
+        password = unquote(parsed.password) if parsed.password else None
+        self.prefix = prefix
+        self._expiry_key = f"{prefix}__expiry__"
+        self._client = _RespClient(
+            parsed.hostname or "localhost", parsed.port or 6379, db, password, timeout
+        )
+
+    def _index(self, key: str, ttl_ms: int) -> Tuple[Any, ...]:
+        return ("ZADD", self._expiry_key, int(time.time() * 1000) + ttl_ms, key)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        value = self._client.execute("GET", self.prefix + key)
+        return json.loads(value) if value is not None else None
+
+    def set(self, key: str, value: Dict[str, Any], ttl_seconds: float) -> None:
+        ttl_ms = int(ttl_seconds * 1000)
+        if ttl_ms <= 0:
+            self.delete(key)
+            return
+        self._client.execute("SET", self.prefix + key, _dumps(value), "PX", ttl_ms)
+        self._client.execute(*self._index(key, ttl_ms))
+
+    def delete(self, key: str) -> bool:
+        self._client.execute("ZREM", self._expiry_key, key)
+        return self._client.execute("DEL", self.prefix + key) > 0
+
+    def touch(self, key: str, ttl_seconds: float) -> bool:
+        ttl_ms = max(int(ttl_seconds * 1000), 1)
+        if self._client.execute("PEXPIRE", self.prefix + key, ttl_ms) != 1:
+            return False
+        self._client.execute(*self._index(key, ttl_ms))
+        return True
+
+    def compare_and_set(
+        self,
+        key: str,
+        value: Dict[str, Any],
+        ttl_seconds: float,
+        expected: Optional[Dict[str, Any]],
+    ) -> bool:
+        def unchanged(current: Optional[bytes]) -> bool:
+            if current is None or expected is None:
+                return current is None and expected is None
+            return _revision(json.loads(current)) == _revision(expected)
+
+        ttl_ms = max(int(ttl_seconds * 1000), 1)
+        return self._client.execute_if(
+            self.prefix + key,
+            unchanged,
+            ("SET", self.prefix + key, _dumps(value), "PX", ttl_ms),
+            self._index(key, ttl_ms),
+        )
+
+    def purge_expired(self) -> List[str]:
+        now_ms = int(time.time() * 1000)
+        due = self._client.execute("ZRANGEBYSCORE", self._expiry_key, "-inf", now_ms) or []
+        expired = []
+        for member in due:
+            key = member.decode()
+            if self._client.execute("EXISTS", self.prefix + key):
+                continue  # Re-armed by a writer that has not updated the index yet
+            # Only the worker whose ZREM removes the entry reports the key
+            if self._client.execute("ZREM", self._expiry_key, key):
+                expired.append(key)
+        return expired
+
+    def close(self) -> None:
+        self._client.close()
+
+
+def create_session_store(url: str) -> SessionStore:
+    """
+    Create a session store from a URL.
+
+    Args:
+        url: ``memory://``, ``sqlite:///path`` or ``redis://host:port/db``
+
+    Returns:
+        SessionStore instance
+
+    Raises:
+        ValueError: If the scheme is not supported
+    """
+    scheme = url.split(":", 1)[0].lower()
+    if scheme == "memory":
+        return MemorySessionStore()
+    if scheme == "sqlite":
+        return SQLiteSessionStore(url)
+    if scheme == "redis":
+        return RedisSessionStore(url)
+    raise ValueError(f"Unsupported session store URL: {url}")
+
+
+# Global session store instance
+session_store = create_session_store(settings.session_store_url)
+logger.info(f"Using {session_store.name} session store")
@@ -4,19 +4,329 @@ Simple wrapper for Phase 1 MVP.
 """
 
 import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 import pandas as pd
 
-from ..helpers.yfinance import YFinanceService
+from ..config import settings
+from ..helpers.yfinance import (
+    EmptyDataError,
+    TickerNotFoundError,
+    YFinanceService,
+    validate_ticker_symbol,
+)
+from .bar_store import (
+    OHLCV_COLUMNS,
+    BarStore,
+    DateRange,
+    bar_store,
+    exchange_today,
+    normalize_bars,
+    period_to_date_range,
+)
+from .symbol_resolver import symbol_resolver
 
 logger = logging.getLogger(__name__)
 
+# (symbol, start_date, end_date, period, interval)
+CacheKey = Tuple[str, Optional[str], Optional[str], Optional[str], str]
+
+
+@dataclass
+class _CacheEntry:
+    """Cached DataFrame with its size and expiry."""
+
+    data: pd.DataFrame
+    nbytes: int
+    expires_at: float
+
+
+@dataclass
+class _InFlight:
+    """A fetch in progress that concurrent callers can wait on."""
+
+    done: threading.Event = field(default_factory=threading.Event)
+    result: Optional[pd.DataFrame] = None
+    error: Optional[BaseException] = None
+
+
+class DataFrameCache:
+    """
+    In-process LRU/TTL cache of fetched DataFrames.
+
+    The memory budget is measured in bytes. Concurrent misses for the same key
+    are coalesced: the first caller fetches, the rest wait for its result.
+    Cached frames are returned as shallow copies; callers may replace the index
+    or columns but must not modify values in place.
+    """
+
+    def __init__(self, max_bytes: int, ttl_seconds: float) -> None:
+        """
+        Initialize cache.
+
+        Args:
+            max_bytes: Total memory budget for cached frames
+            ttl_seconds: Time-to-live of each entry
+        """
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[CacheKey, _CacheEntry]" = OrderedDict()
+        self._inflight: Dict[CacheKey, _InFlight] = {}
+        self._lock = threading.Lock()
+        self._current_bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._coalesced = 0
+        self._evictions = 0
+
+    def get_or_fetch(
+        self,
+        key: CacheKey,
+        loader: Callable[[], Optional[pd.DataFrame]],
+        ttl_seconds: Optional[float] = None,
+    ) -> Optional[pd.DataFrame]:
+        """
+        Get a cached frame or load it, sharing one load among concurrent callers.
+
+        Args:
+            key: Normalized cache key
+            loader: Function performing the actual fetch
+            ttl_seconds: Time-to-live of a loaded entry, defaults to the cache TTL
+
+        Returns:
+            DataFrame, or None if the loader found no data
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry.expires_at > time.monotonic():
+                    self._hits += 1
+                    self._entries.move_to_end(key)
+                    return entry.data.copy(deep=False)
+                self._remove(key)
+
+            inflight = self._inflight.get(key)
+            if inflight is not None:
+                self._coalesced += 1
+                owner = False
+            else:
+                self._misses += 1
+                inflight = _InFlight()
+                self._inflight[key] = inflight
+                owner = True
+
+        if not owner:
+            inflight.done.wait()
+            if inflight.error is not None:
+                raise inflight.error
+            return None if inflight.result is None else inflight.result.copy(deep=False)
+
+        try:
+            inflight.result = loader()
+        except BaseException as e:
+            inflight.error = e
+            raise
+        finally:
+            with self._lock:
+                if inflight.result is not None:
+                    self._store(key, inflight.result, ttl_seconds)
+                del self._inflight[key]
+            inflight.done.set()
+
+        return None if inflight.result is None else inflight.result.copy(deep=False)
+
+    def put(self, key: CacheKey, data: pd.DataFrame, ttl_seconds: Optional[float] = None) -> None:
+        """
+        Insert a frame loaded elsewhere, replacing any cached entry.
+
+        Args:
+            key: Normalized cache key
+            data: Frame to cache; callers must not modify it afterwards
+            ttl_seconds: Time-to-live of the entry, defaults to the cache TTL
+        """
+        with self._lock:
+            self._store(key, data, ttl_seconds)
+
+    def _store(self, key: CacheKey, data: pd.DataFrame, ttl_seconds: Optional[float]) -> None:
+        """Insert an entry and evict least recently used ones over budget. Lock held."""
+        nbytes = int(data.memory_usage(index=True, deep=True).sum())
+        if nbytes > self.max_bytes:
+            return
+
+        if key in self._entries:
+            self._remove(key)
+
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        self._entries[key] = _CacheEntry(data, nbytes, time.monotonic() + ttl)
+        self._current_bytes += nbytes
+
+        while self._current_bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self._evictions += 1
+
+    def _remove(self, key: CacheKey) -> None:
+        """Remove an entry. Lock held."""
+        entry = self._entries.pop(key)
+        self._current_bytes -= entry.nbytes
+
+    def clear(self) -> None:
+        """Drop all cached entries."""
+        with self._lock:
+            self._entries.clear()
+            self._current_bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Get cache counters and memory usage."""
+        with self._lock:
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "coalesced": self._coalesced,
+                "evictions": self._evictions,
+                "entries": len(self._entries),
+                "in_flight": len(self._inflight),
+                "current_bytes": self._current_bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+
+# Global cache for upstream stock data; closed-day segments of daily ranges never expire
+stock_data_cache = DataFrameCache(
+    max_bytes=settings.stock_cache_max_bytes, ttl_seconds=settings.stock_cache_ttl_seconds
+)
+
+# Hot tier: the still-open session's bar per symbol, refetched after a few seconds
+current_bar_cache = DataFrameCache(
+    max_bytes=settings.stock_cache_hot_max_bytes, ttl_seconds=settings.stock_cache_hot_ttl_seconds
+)
+
+
+def make_cache_key(
+    symbol: str,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    period: Optional[str] = None,
+    interval: str = "1d",
+) -> CacheKey:
+    """Build a normalized cache key."""
+    if start_date:
+        start_date = pd.to_datetime(start_date).strftime("%Y-%m-%d")
+    if end_date:
+        end_date = pd.to_datetime(end_date).strftime("%Y-%m-%d")
+    return (validate_ticker_symbol(symbol), start_date, end_date, period, interval)
+
+
+def _load_resolved(
+    symbol: str, load: Callable[[str], pd.DataFrame], date_range: Optional[DateRange] = None
+) -> pd.DataFrame:
+    """
+    Load a ticker under the symbol serving it, correcting a mis-suffixed Taiwan code.
+    Symbols the bar store already holds are known to work and skip resolution.
+
+    Args:
+        symbol: Requested ticker symbol
+        load: Function loading the bars for an upstream symbol
+        date_range: Inclusive range the load covers, if known
+
+    Raises:
+        EmptyDataError: If the ticker has no data for the range
+    """
+    if settings.bar_store_enabled and bar_store.get_timezone(symbol) is not None:
+        return load(symbol)
+    return symbol_resolver.fetch(symbol, load, date_range)
+
+
+def _load_daily(symbol: str, start: datetime, end: datetime) -> pd.DataFrame:
+    """Load daily bars for an inclusive range from the bar store or upstream."""
+
+    def load(upstream: str) -> pd.DataFrame:
+        if settings.bar_store_enabled:
+            return bar_store.get_bars(upstream, start, end)
+        return YFinanceService.get_stock_data(
+            symbol=upstream,
+            start_date=start.strftime("%Y-%m-%d"),
+            end_date=end.strftime("%Y-%m-%d"),
+        )
+
+    return _load_resolved(symbol, load, (start, end))
+
+
+def _split_current(data: pd.DataFrame, today: datetime) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Split sorted daily bars into closed days and the still-open current day, as views."""
+    local_dates = data.index.tz_localize(None) if data.index.tz is not None else data.index
+    split = int(local_dates.searchsorted(pd.Timestamp(today)))
+    return data.iloc[:split], data.iloc[split:]
+
+
+def _fetch_tiered(key: CacheKey, symbol: str, start: datetime, end: datetime) -> pd.DataFrame:
+    """
+    Get daily bars as a cold segment of closed days plus a hot current-day bar.
+
+    Closed days never change, so their segment is cached until the exchange's
+    next midnight (indefinitely if the range ends before today). The current
+    session's partial bar is cached separately for a few seconds, so only that
+    one bar is refetched while the session trades.
+
+    Args:
+        key: Cache key of the whole range
+        symbol: Stock ticker symbol
+        start: Start date
+        end: End date (inclusive)
+
+    Returns:
+        DataFrame with closed days followed by the current bar, if any
+    """
+    tz = (bar_store.get_timezone(symbol) if settings.bar_store_enabled else None) or (
+        settings.default_exchange_timezone
+    )
+    today = exchange_today(tz)
+    if end < today:
+        return stock_data_cache.get_or_fetch(
+            key, lambda: _load_daily(symbol, start, end), ttl_seconds=float("inf")
+        )
+
+    day = today.strftime("%Y-%m-%d")
+    hot_key = make_cache_key(symbol, start_date=day, end_date=day)
+
+    def load_cold() -> pd.DataFrame:
+        closed, current = _split_current(_load_daily(symbol, start, end), today)
+        # The download already carries today's bar; seed the hot tier with it
+        current_bar_cache.put(hot_key, current)
+        return closed
+
+    def load_hot() -> pd.DataFrame:
+        try:
+            data = _load_daily(symbol, today, today)
+        except EmptyDataError:
+            return pd.DataFrame(columns=OHLCV_COLUMNS)
+        return _split_current(data, today)[1]
+
+    now = pd.Timestamp.now(tz=tz)
+    until_midnight = (now.normalize() + pd.Timedelta(days=1) - now).total_seconds()
+    closed = stock_data_cache.get_or_fetch(key, load_cold, ttl_seconds=until_midnight)
+    if start > today:
+        return closed
+    current = current_bar_cache.get_or_fetch(hot_key, load_hot)
+    if current is None or current.empty:
+        return closed
+    if closed is None or closed.empty:
+        return current
+    return pd.concat([closed, current])
+
 
 def fetch_stock_data(symbol: str, start_date: str, end_date: str) -> Optional[pd.DataFrame]:
     """
     Fetch stock data for the given symbol and date range.
+    Reads from the in-process cache, then the local bar store, and only
+    downloads missing ranges. A range reaching today is cached in two tiers
+    so only the current session's bar is refetched. Mis-suffixed Taiwan codes
+    are redirected and dead tickers are rejected without a round trip.
 
     Args:
         symbol: Stock ticker symbol (e.g., 'AAPL', '2330.TW')
@@ -27,7 +337,8 @@ def fetch_stock_data(symbol: str, start_date: str, end_date: str) -> Optional[pd
         DataFrame with stock data or None if failed
     """
     try:
-        df = YFinanceService.get_stock_data(symbol=symbol, start_date=start_date, end_date=end_date)
+        key = make_cache_key(symbol, start_date=start_date, end_date=end_date)
+        df = _fetch_tiered(key, symbol, pd.to_datetime(start_date), pd.to_datetime(end_date))
         logger.info(f"Fetched {len(df)} rows for {symbol}")
         return df
     except Exception as e:
@@ -38,20 +349,156 @@ def fetch_stock_data(symbol: str, start_date: str, end_date: str) -> Optional[pd
 def fetch_stock_data_by_period(symbol: str, period: str = "3mo") -> Optional[pd.DataFrame]:
     """
     Fetch stock data for the given symbol and period.
+    Periods expressible as a date range are served through the local bar store.
 
     Args:
         symbol: Stock ticker symbol
         period: Period string (e.g., '1mo', '3mo', '6mo', '1y')
 
     Returns:
-        DataFrame with stock data or None if failed
+        DataFrame with stock data, empty if the range has no bars (e.g. a
+        holiday), or None if the fetch failed
     """
-    try:
-        df = YFinanceService.get_stock_data(
-            symbol=symbol, start_date="", end_date="", period=period
+
+    def load() -> Optional[pd.DataFrame]:
+        return _load_resolved(
+            symbol,
+            lambda upstream: YFinanceService.get_stock_data(
+                symbol=upstream, start_date="", end_date="", period=period
+            ),
+            period_to_date_range(period),
         )
+
+    try:
+        key = make_cache_key(symbol, period=period)
+        date_range = period_to_date_range(period) if settings.bar_store_enabled else None
+        if date_range:
+            df = _fetch_tiered(key, symbol, *date_range)
+        else:
+            df = stock_data_cache.get_or_fetch(key, load)
         logger.info(f"Fetched {len(df)} rows for {symbol} ({period})")
         return df
     except Exception as e:
         logger.error(f"Error fetching data for {symbol}: {e}")
         return None
+
+
+def fetch_intraday_data(
+    symbol: str, start_date: str, end_date: str, interval: str
+) -> Optional[pd.DataFrame]:
+    """
+    Fetch intraday bars for an inclusive date range.
+    The local bar store only holds daily bars, so intraday ranges are served
+    from the in-process cache keyed by interval and otherwise go upstream.
+
+    Args:
+        symbol: Stock ticker symbol
+        start_date: First trading day (YYYY-MM-DD)
+        end_date: Last trading day (YYYY-MM-DD), inclusive
+        interval: Bar interval (e.g., '1m', '5m', '1h')
+
+    Returns:
+        DataFrame with stock data, empty if the range has no bars (e.g. a
+        holiday), or None if the fetch failed
+    """
+
+    def load() -> Optional[pd.DataFrame]:
+        return _load_resolved(
+            symbol,
+            lambda upstream: YFinanceService.get_stock_data(
+                symbol=upstream, start_date=start_date, end_date=end_date, interval=interval
+            ),
+            (pd.to_datetime(start_date).to_pydatetime(), pd.to_datetime(end_date).to_pydatetime()),
+        )
+
+    try:
+        key = make_cache_key(symbol, start_date=start_date, end_date=end_date, interval=interval)
+        df = stock_data_cache.get_or_fetch(key, load)
+        logger.info(f"Fetched {len(df)} {interval} rows for {symbol} {start_date}~{end_date}")
+        return df
+    except (EmptyDataError, TickerNotFoundError):
+        return pd.DataFrame(columns=OHLCV_COLUMNS)
+    except Exception as e:
+        logger.error(f"Error fetching {interval} data for {symbol}: {e}")
+        return None
+
+
+def plan_batch(
+    symbols: List[str], start_date: datetime, end_date: datetime
+) -> Tuple[List[str], Dict[str, List[DateRange]]]:
+    """
+    Split a batch into symbols served locally and symbols needing a download.
+
+    Args:
+        symbols: Stock ticker symbols
+        start_date: Start date
+        end_date: End date (inclusive)
+
+    Returns:
+        Tuple of (stored symbols, symbol to the ranges it is missing)
+    """
+    if settings.bar_store_enabled:
+        return bar_store.plan_batch(symbols, start_date, end_date)
+    symbols = list(dict.fromkeys(validate_ticker_symbol(symbol) for symbol in symbols))
+    return [], {symbol: [(start_date, end_date)] for symbol in symbols}
+
+
+def read_stored(symbol: str, start_date: datetime, end_date: datetime) -> pd.DataFrame:
+    """
+    Read a symbol served locally in a batch, as returned by plan_batch.
+
+    Args:
+        symbol: Stock ticker symbol
+        start_date: Start date
+        end_date: End date (inclusive)
+
+    Returns:
+        DataFrame with stock data
+
+    Raises:
+        EmptyDataError: If no bars are stored for the range
+    """
+    return bar_store.read_stored(symbol, start_date, end_date)
+
+
+def download_batch(misses: Dict[str, List[DateRange]]) -> Dict[str, pd.DataFrame]:
+    """
+    Download the missing ranges of a batch with one multi-ticker request.
+
+    Args:
+        misses: Symbol to missing ranges, as returned by plan_batch
+
+    Returns:
+        Symbol to downloaded bars; symbols without data are left out
+    """
+    return BarStore.download_batch(misses)
+
+
+def complete_batch(
+    symbol: str,
+    ranges: List[DateRange],
+    data: Optional[pd.DataFrame],
+    start_date: datetime,
+    end_date: datetime,
+) -> pd.DataFrame:
+    """
+    Store one symbol's share of a batch download and return its requested range.
+
+    Args:
+        symbol: Stock ticker symbol
+        ranges: Ranges the symbol was missing
+        data: Bars downloaded for the symbol, or None
+        start_date: Start date
+        end_date: End date (inclusive)
+
+    Returns:
+        DataFrame with stock data
+
+    Raises:
+        EmptyDataError: If no bars exist for the range
+    """
+    if settings.bar_store_enabled:
+        return bar_store.complete_batch(symbol, ranges, data, start_date, end_date)
+    if data is None or data.empty:
+        raise EmptyDataError(f"No data available for {symbol}")
+    return normalize_bars(data)
@@ -0,0 +1,286 @@
+"""
+Persistent resolution of requested tickers to the upstream symbol serving them.
+
+Taiwan codes are listed either on TWSE (``.TW``) or on TPEx (``.TWO``). A code
+requested with the wrong suffix comes back empty from Yahoo Finance, and
+without a record of that every retry pays for the same failed round trip.
+Resolution rides on the real fetch: the first time a ticker is seen it is
+loaded under the requested symbol, and only a Taiwan code that comes back
+empty is loaded again under its other suffix. The symbol that returned data
+is recorded in the ``symbol_resolutions`` table and later requests are
+redirected to it directly.
+
+A ticker whose every candidate is empty for the requested range is recorded
+as dead for that range, and requests within it are rejected locally until
+``settings.symbol_negative_ttl_seconds`` has passed. Other ranges are still
+fetched, so a delisted or suspended ticker keeps serving historical replays.
+"""
+
+import logging
+import re
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple, TypeVar
+
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from ..config import settings
+from ..database.connection import Base, SessionLocal
+from ..database.models import SymbolResolution
+from ..helpers.yfinance import EmptyDataError, TickerNotFoundError, validate_ticker_symbol
+from .bar_store import DateRange
+
+logger = logging.getLogger(__name__)
+
+# Bare or suffixed Taiwan code, e.g. '2330', '2330.TW', '6488.TWO', '00878.TW'
+TW_CODE_PATTERN = re.compile(r"^(\d{4,6}[A-Z]?)(\.TWO?)?$")
+TW_SUFFIXES = (".TW", ".TWO")
+
+T = TypeVar("T")
+
+
+@dataclass
+class Resolution:
+    """Recorded outcome for one ticker: the symbol serving it, or the range found empty."""
+
+    symbol: Optional[str]
+    checked_at: datetime
+    empty_range: Optional[DateRange] = None
+
+    def rejects(self, date_range: Optional[DateRange]) -> bool:
+        """Whether a dead record covers a requested range; unknown ranges are never covered."""
+        if self.symbol is not None or self.empty_range is None or date_range is None:
+            return False
+        return self.empty_range[0] <= date_range[0] and date_range[1] <= self.empty_range[1]
+
+
+def symbol_candidates(symbol: str) -> Tuple[str, List[str]]:
+    """
+    Get the resolution key of a ticker and the upstream symbols that may serve it.
+
+    Args:
+        symbol: Validated ticker symbol
+
+    Returns:
+        Tuple of (key, candidates in preference order); Taiwan codes are keyed
+        without suffix and try the requested suffix first, other tickers only
+        resolve to themselves
+    """
+    match = TW_CODE_PATTERN.match(symbol)
+    if match is None:
+        return symbol, [symbol]
+    code, requested = match.group(1), match.group(2) or TW_SUFFIXES[0]
+    suffixes = [requested, *(suffix for suffix in TW_SUFFIXES if suffix != requested)]
+    return code, [f"{code}{suffix}" for suffix in suffixes]
+
+
+class SymbolResolver:
+    """
+    Resolves tickers through an in-memory map backed by the SQLite cache.
+    Working symbols are remembered indefinitely; dead ranges expire after
+    the negative TTL and are then fetched again.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        negative_ttl_seconds: Optional[float] = None,
+        clock: Callable[[], datetime] = datetime.now,
+    ) -> None:
+        """
+        Initialize resolver.
+
+        Args:
+            session_factory: Factory returning SQLAlchemy sessions
+            negative_ttl_seconds: How long a dead range is rejected locally,
+                defaults to settings.symbol_negative_ttl_seconds
+            clock: Function returning the current time
+        """
+        self._session_factory = session_factory
+        self._negative_ttl = timedelta(
+            seconds=(
+                settings.symbol_negative_ttl_seconds
+                if negative_ttl_seconds is None
+                else negative_ttl_seconds
+            )
+        )
+        self._clock = clock
+        self._entries: Dict[str, Resolution] = {}
+        self._key_locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self._initialized = False
+        self._fallbacks = 0
+        self._negative_hits = 0
+
+    def _ensure_initialized(self, db: Session) -> None:
+        """Lazily create the resolution table on first use."""
+        if self._initialized:
+            return
+        with self._lock:
+            if not self._initialized:
+                Base.metadata.create_all(bind=db.get_bind(), tables=[SymbolResolution.__table__])
+                self._initialized = True
+
+    def fetch(
+        self,
+        symbol: str,
+        load: Callable[[str], T],
+        date_range: Optional[DateRange] = None,
+    ) -> T:
+        """
+        Load a ticker under the upstream symbol serving it.
+
+        Args:
+            symbol: Ticker symbol (e.g., '2330.TW', '6488.TW', 'AAPL')
+            load: Function loading the requested bars for an upstream symbol;
+                raises EmptyDataError or TickerNotFoundError when there are none
+            date_range: Inclusive range the load covers; without one an
+                empty result is not recorded
+
+        Returns:
+            Result of load, e.g. the bars of '6488.TWO' for an OTC code
+            requested as '6488.TW'
+
+        Raises:
+            EmptyDataError: If the ticker is recorded as dead for the range, or
+                no candidate has data for it
+        """
+        symbol = validate_ticker_symbol(symbol)
+        key, candidates = symbol_candidates(symbol)
+
+        resolution = self._lookup(key)
+        if self._unresolved(resolution, date_range):
+            # Concurrent first requests for a code resolve it once
+            with self._lock:
+                key_lock = self._key_locks.setdefault(key, threading.Lock())
+            with key_lock:
+                resolution = self._lookup(key)
+                if self._unresolved(resolution, date_range):
+                    return self._fetch_candidates(key, candidates, load, date_range)
+
+        if resolution.symbol is not None:
+            return load(resolution.symbol)
+        with self._lock:
+            self._negative_hits += 1
+        raise EmptyDataError(
+            f"No data available for {symbol} (checked {resolution.checked_at:%Y-%m-%d %H:%M})"
+        )
+
+    @staticmethod
+    def _unresolved(resolution: Optional[Resolution], date_range: Optional[DateRange]) -> bool:
+        """Whether a request must go through the candidates: unknown, or dead for another range."""
+        return resolution is None or (
+            resolution.symbol is None and not resolution.rejects(date_range)
+        )
+
+    def _lookup(self, key: str) -> Optional[Resolution]:
+        """Get a live resolution from memory or the table; None if unknown or expired."""
+        with self._lock:
+            resolution = self._entries.get(key)
+
+        if resolution is None:
+            db = self._session_factory()
+            try:
+                self._ensure_initialized(db)
+                row = db.query(SymbolResolution).filter(SymbolResolution.code == key).first()
+                if row is not None:
+                    empty_range = (
+                        (row.empty_from, row.empty_to) if row.empty_from is not None else None
+                    )
+                    resolution = Resolution(row.resolved_symbol, row.checked_at, empty_range)
+            finally:
+                db.close()
+            if resolution is None:
+                return None
+            with self._lock:
+                self._entries[key] = resolution
+
+        if (
+            resolution.symbol is None
+            and self._clock() - resolution.checked_at >= self._negative_ttl
+        ):
+            return None
+        return resolution
+
+    def _fetch_candidates(
+        self,
+        key: str,
+        candidates: List[str],
+        load: Callable[[str], T],
+        date_range: Optional[DateRange],
+    ) -> T:
+        """
+        Load candidates in order and record the first one with data.
+
+        Errors other than an empty result propagate without recording
+        anything, since an outage does not prove a dead ticker.
+        """
+        empty: Optional[Exception] = None
+        for attempt, candidate in enumerate(candidates):
+            if attempt:
+                with self._lock:
+                    self._fallbacks += 1
+            try:
+                data = load(candidate)
+            except (EmptyDataError, TickerNotFoundError) as e:
+                empty = e
+                continue
+            if candidate != candidates[0]:
+                logger.info(f"[SymbolResolver] Resolved {key} to {candidate}")
+            self._record(key, Resolution(candidate, self._clock()))
+            return data
+
+        if date_range is not None:
+            logger.info(
+                f"[SymbolResolver] No upstream data for {key} from {date_range[0]:%Y-%m-%d} "
+                f"to {date_range[1]:%Y-%m-%d}, rejecting that range locally"
+            )
+            self._record(key, Resolution(None, self._clock(), date_range))
+        raise EmptyDataError(f"No data available for {candidates[0]}") from empty
+
+    def _record(self, key: str, resolution: Resolution) -> None:
+        """Upsert a resolution into the table and the in-memory map."""
+        empty_from, empty_to = resolution.empty_range or (None, None)
+        db = self._session_factory()
+        try:
+            self._ensure_initialized(db)
+            stmt = sqlite_insert(SymbolResolution).values(
+                code=key,
+                resolved_symbol=resolution.symbol,
+                checked_at=resolution.checked_at,
+                empty_from=empty_from,
+                empty_to=empty_to,
+            )
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["code"],
+                set_={
+                    "resolved_symbol": stmt.excluded.resolved_symbol,
+                    "checked_at": stmt.excluded.checked_at,
+                    "empty_from": stmt.excluded.empty_from,
+                    "empty_to": stmt.excluded.empty_to,
+                },
+            )
+            db.execute(stmt)
+            db.commit()
+        finally:
+            db.close()
+
+        with self._lock:
+            self._entries[key] = resolution
+
+    def stats(self) -> Dict[str, Any]:
+        """Get resolution counters."""
+        with self._lock:
+            dead = sum(1 for resolution in self._entries.values() if resolution.symbol is None)
+            return {
+                "known": len(self._entries) - dead,
+                "dead": dead,
+                "fallbacks": self._fallbacks,
+                "negative_hits": self._negative_hits,
+            }
+
+
+# Global resolver instance
+symbol_resolver = SymbolResolver()
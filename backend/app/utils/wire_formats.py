@@ -0,0 +1,215 @@
+"""
+Wire formats for OHLCV DataFrames: row JSON, columnar JSON, msgpack and Arrow.
+
+Row JSON (the default) repeats every key per bar. The other formats send one
+array per column built straight from the DataFrame buffers, which is several
+times smaller and cheaper to encode for long series. msgpack and pyarrow are
+optional dependencies; requesting their format without them installed raises
+WireFormatUnavailableError.
+"""
+
+import importlib.util
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+JSON = "json"
+COLUMNAR = "columnar"
+MSGPACK = "msgpack"
+ARROW = "arrow"
+
+FORMATS = (JSON, COLUMNAR, MSGPACK, ARROW)
+
+MEDIA_TYPES = {
+    JSON: "application/json",
+    COLUMNAR: "application/json",
+    MSGPACK: "application/msgpack",
+    ARROW: "application/vnd.apache.arrow.stream",
+}
+
+_ACCEPT_FORMATS = {
+    "application/vnd.apache.arrow.stream": ARROW,
+    "application/msgpack": MSGPACK,
+    "application/x-msgpack": MSGPACK,
+}
+
+_REQUIRED_MODULES = {MSGPACK: "msgpack", ARROW: "pyarrow"}
+
+_COLUMNS = [("open", "Open"), ("high", "High"), ("low", "Low"), ("close", "Close")]
+
+
+class WireFormatUnavailableError(Exception):
+    """Exception raised when a format is unknown or its library is not installed."""
+
+    pass
+
+
+def negotiate_format(requested: Optional[str], accept: Optional[str] = None) -> str:
+    """
+    Pick the wire format from the ``format`` parameter or the Accept header.
+
+    Args:
+        requested: Explicit format parameter, takes precedence
+        accept: Accept header value
+
+    Returns:
+        One of FORMATS
+
+    Raises:
+        WireFormatUnavailableError: If the format is unknown or its library is missing
+    """
+    fmt = JSON
+    if requested:
+        fmt = requested.lower()
+        if fmt not in FORMATS:
+            raise WireFormatUnavailableError(
+                f"Unknown format {requested!r}, expected one of {', '.join(FORMATS)}"
+            )
+    else:
+        for media_type in (accept or "").split(","):
+            accepted = _ACCEPT_FORMATS.get(media_type.split(";")[0].strip().lower())
+            if accepted:
+                fmt = accepted
+                break
+
+    module = _REQUIRED_MODULES.get(fmt)
+    if module and importlib.util.find_spec(module) is None:
+        raise WireFormatUnavailableError(f"{fmt} format requires {module} to be installed")
+    return fmt
+
+
+def _float_list(values: np.ndarray) -> List[Optional[float]]:
+    """Convert a float column to a list with NaN as None (valid JSON)."""
+    result = values.tolist()
+    if np.isnan(values).any():
+        result = [None if v != v else v for v in result]
+    return result
+
+
+def _timezone(df: pd.DataFrame) -> Optional[str]:
+    tz = pd.DatetimeIndex(df.index).tz
+    return str(tz) if tz is not None else None
+
+
+def _volume(df: pd.DataFrame) -> np.ndarray:
+    """Get the volume column as int64, filling gaps only when there are any."""
+    volume = df["Volume"]
+    if volume.isna().any():
+        volume = volume.fillna(0)
+    return volume.to_numpy(dtype=np.int64)
+
+
+def to_columns(df: pd.DataFrame) -> Dict[str, List[Any]]:
+    """
+    Convert an OHLCV DataFrame to parallel column lists.
+
+    Timestamps are Unix epoch milliseconds (UTC for tz-aware indexes).
+
+    Args:
+        df: DataFrame with Open/High/Low/Close/Volume columns and a DatetimeIndex
+
+    Returns:
+        Dict of column name to list
+    """
+    index = pd.DatetimeIndex(df.index)
+    if index.tz is not None:
+        index = index.tz_convert("UTC").tz_localize(None)
+
+    columns: Dict[str, List[Any]] = {"timestamp": (index.as_unit("ms").asi8).tolist()}
+    for name, source in _COLUMNS:
+        columns[name] = _float_list(df[source].to_numpy(dtype=np.float64))
+    columns["volume"] = _volume(df).tolist()
+    return columns
+
+
+def to_records(df: pd.DataFrame) -> List[Dict[str, Any]]:
+    """
+    Convert an OHLCV DataFrame to candle dicts in one pass, without iterrows.
+
+    Args:
+        df: DataFrame with Open/High/Low/Close/Volume columns and a DatetimeIndex
+
+    Returns:
+        List of dicts with timestamp, open, high, low, close, volume
+    """
+    return [
+        {"timestamp": ts, "open": o, "high": h, "low": lo, "close": c, "volume": v}
+        for ts, o, h, lo, c, v in zip(
+            pd.DatetimeIndex(df.index).to_pydatetime(),
+            df["Open"].to_numpy(dtype=np.float64).tolist(),
+            df["High"].to_numpy(dtype=np.float64).tolist(),
+            df["Low"].to_numpy(dtype=np.float64).tolist(),
+            df["Close"].to_numpy(dtype=np.float64).tolist(),
+            _volume(df).tolist(),
+            strict=True,
+        )
+    ]
+
+
+def _encode_arrow(df: pd.DataFrame, symbol: str) -> bytes:
+    try:
+        import pyarrow as pa
+    except ImportError as e:
+        raise WireFormatUnavailableError("Arrow format requires pyarrow to be installed") from e
+
+    index = pd.DatetimeIndex(df.index)
+    arrays = [pa.array(index.as_unit("ms"))]
+    names = ["timestamp"]
+    for name, source in _COLUMNS:
+        arrays.append(pa.array(df[source].to_numpy(dtype=np.float64)))
+        names.append(name)
+    arrays.append(pa.array(_volume(df)))
+    names.append("volume")
+
+    table = pa.Table.from_arrays(arrays, names=names, metadata={"symbol": symbol})
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def encode_frame(
+    df: pd.DataFrame, symbol: str, fmt: str, extra: Optional[Dict[str, Any]] = None
+) -> Tuple[bytes, str]:
+    """
+    Encode an OHLCV DataFrame in a column-oriented wire format.
+
+    Args:
+        df: DataFrame with Open/High/Low/Close/Volume columns and a DatetimeIndex
+        symbol: Stock ticker symbol
+        fmt: COLUMNAR, MSGPACK or ARROW
+        extra: Additional top-level fields for the columnar and msgpack payloads
+
+    Returns:
+        Tuple of (body, media type)
+
+    Raises:
+        WireFormatUnavailableError: If the format's library is not installed
+    """
+    if fmt == ARROW:
+        return _encode_arrow(df, symbol), MEDIA_TYPES[ARROW]
+
+    payload = {
+        "symbol": symbol,
+        "total_count": len(df),
+        "timezone": _timezone(df),
+        **(extra or {}),
+        "data": to_columns(df),
+    }
+
+    if fmt == MSGPACK:
+        try:
+            import msgpack
+        except ImportError as e:
+            raise WireFormatUnavailableError(
+                "msgpack format requires msgpack to be installed"
+            ) from e
+        return msgpack.packb(payload), MEDIA_TYPES[MSGPACK]
+
+    if fmt == COLUMNAR:
+        body = json.dumps(payload, separators=(",", ":")).encode()
+        return body, MEDIA_TYPES[COLUMNAR]
+
+    raise WireFormatUnavailableError(f"Format {fmt!r} is not column-oriented")
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Pack the bar store into memory-mapped column files.
+
+Every symbol's closed daily bars are written symbol after symbol into
+fixed-width column files with an offset index (see app/utils/bar_pack.py).
+The new build is published atomically; running servers switch to it on their
+next lookup. Run it after scripts/prefetch_bar_store.py, e.g. nightly:
+
+    uv run python scripts/prefetch_bar_store.py --incremental
+    uv run python scripts/pack_bar_store.py
+"""
+
+import argparse
+import os
+import sys
+from pathlib import Path
+
+# Add parent directory to path so we can import app
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import logging
+
+import pandas as pd
+
+from app.config import settings
+from app.utils.bar_pack import build_bar_pack
+
+logging.basicConfig(level=logging.INFO)
+
+
+def main() -> None:
+    """Parse arguments and build the pack."""
+    parser = argparse.ArgumentParser(description="Pack the bar store into memory-mapped columns")
+    parser.add_argument(
+        "--dir", type=Path, default=Path(settings.bar_pack_dir), help="Pack directory"
+    )
+    parser.add_argument("--through", help="Last day to pack (YYYY-MM-DD), default: all logged days")
+    parser.add_argument("--keep", type=int, default=2, help="Builds kept on disk (default: 2)")
+    args = parser.parse_args()
+
+    through = pd.Timestamp(args.through).to_pydatetime() if args.through else None
+    totals = build_bar_pack(str(args.dir), through=through, keep_builds=args.keep)
+
+    print("\n" + "=" * 50)
+    print("Bar Pack Built Successfully!")
+    print("=" * 50)
+    print(f"Symbols: {totals['symbols']}")
+    print(f"Rows: {totals['rows']}")
+    print(f"Directory: {args.dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+"""
+Prefetch daily bars for every code in taiwan_stocks.json into the local bar store.
+
+Symbols are downloaded in chunks with one multi-ticker request each, on a few
+worker threads sharing a token bucket so Yahoo Finance is never hit faster
+than ``--rate`` requests per second. Progress is checkpointed per symbol after
+every chunk, so an interrupted run resumes where it stopped. ``--incremental``
+only appends the days since each symbol's checkpoint (normally just
+yesterday) and is meant to run daily after the close.
+
+Usage:
+    uv run python scripts/prefetch_bar_store.py --years 5
+    uv run python scripts/prefetch_bar_store.py --incremental
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+# Add parent directory to path so we can import app
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pandas as pd
+
+from app.config import settings
+from app.utils.bar_store import BarStore, bar_store
+from app.utils.rate_limit import TokenBucket
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+SCRIPT_DIR = Path(__file__).parent
+DEFAULT_UNIVERSE = SCRIPT_DIR / "data" / "taiwan_stocks.json"
+DEFAULT_CHECKPOINT = SCRIPT_DIR.parent / "data" / "prefetch_checkpoint.json"
+
+
+def load_universe(path: Path) -> List[str]:
+    """
+    Load the Yahoo Finance symbols of the stock database.
+
+    Args:
+        path: Path to taiwan_stocks.json
+
+    Returns:
+        Symbols (e.g. '2330.TW') in code order
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        database = json.load(f)
+    return [info["symbol"] for _, info in sorted(database.items())]
+
+
+class Checkpoint:
+    """
+    Per-symbol prefetch progress, saved as JSON after every chunk.
+
+    ``done`` maps a symbol to the last closed day (YYYY-MM-DD) its bars are
+    stored through; ``failed`` keeps the last error of symbols that had no
+    data, which are retried on the next run.
+    """
+
+    def __init__(self, path: Path) -> None:
+        """
+        Load a checkpoint file, starting empty if it does not exist.
+
+        Args:
+            path: Checkpoint file path
+        """
+        self.path = path
+        self.done: Dict[str, str] = {}
+        self.failed: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        if path.exists():
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    state = json.load(f)
+                self.done = state.get("done", {})
+                self.failed = state.get("failed", {})
+                logger.info(f"Loaded checkpoint with {len(self.done)} symbols done")
+            except Exception as e:
+                logger.warning(f"Failed to load checkpoint, starting over: {e}")
+
+    def through(self, symbol: str) -> Optional[str]:
+        """Get the last day a symbol is stored through, if known."""
+        with self._lock:
+            return self.done.get(symbol)
+
+    def mark_done(self, symbol: str, through: str) -> None:
+        """Record that a symbol is stored through a day."""
+        with self._lock:
+            if through > self.done.get(symbol, ""):
+                self.done[symbol] = through
+            self.failed.pop(symbol, None)
+
+    def mark_failed(self, symbol: str, error: str) -> None:
+        """Record a symbol that could not be stored."""
+        with self._lock:
+            self.failed[symbol] = error
+
+    def save(self) -> None:
+        """Write the checkpoint atomically."""
+        with self._lock:
+            state = {"done": dict(sorted(self.done.items())), "failed": self.failed}
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix(".tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(state, f, indent=2)
+            os.replace(tmp_path, self.path)
+
+
+def last_closed_day() -> datetime:
+    """Get yesterday's date (naive midnight) in the exchange timezone."""
+    today = pd.Timestamp.now(tz=settings.default_exchange_timezone).normalize().tz_localize(None)
+    return (today - timedelta(days=1)).to_pydatetime()
+
+
+def plan_chunks(
+    symbols: List[str],
+    checkpoint: Checkpoint,
+    start: datetime,
+    end: datetime,
+    chunk_size: int,
+    incremental: bool,
+) -> List[Tuple[datetime, List[str]]]:
+    """
+    Group the symbols still to fetch into chunks sharing a start day.
+
+    A full run starts every symbol at ``start`` (the bar store skips ranges it
+    already holds) and skips symbols checkpointed through ``end``. An
+    incremental run starts each symbol the day after its checkpoint, so one
+    download covers only the new days.
+
+    Args:
+        symbols: Universe symbols
+        checkpoint: Progress of earlier runs
+        start: First day of a full prefetch
+        end: Last day to prefetch (inclusive)
+        chunk_size: Symbols per multi-ticker download
+        incremental: Whether to start at each symbol's checkpoint
+
+    Returns:
+        List of (start day, symbols) chunks
+    """
+    end_str = end.strftime("%Y-%m-%d")
+    by_start: Dict[datetime, List[str]] = {}
+    for symbol in symbols:
+        through = checkpoint.through(symbol)
+        if through is not None and through >= end_str:
+            continue
+        symbol_start = start
+        if incremental and through is not None:
+            symbol_start = max(start, pd.Timestamp(through).to_pydatetime() + timedelta(days=1))
+        by_start.setdefault(symbol_start, []).append(symbol)
+
+    chunks = []
+    for symbol_start, group in sorted(by_start.items()):
+        for i in range(0, len(group), chunk_size):
+            chunks.append((symbol_start, group[i : i + chunk_size]))
+    return chunks
+
+
+def prefetch_chunk(
+    store: BarStore,
+    symbols: List[str],
+    start: datetime,
+    end: datetime,
+    bucket: TokenBucket,
+    checkpoint: Checkpoint,
+) -> Tuple[int, int, int]:
+    """
+    Store one chunk of symbols with at most one upstream download.
+
+    Returns:
+        Tuple of (already stored, downloaded, failed) symbol counts
+    """
+    end_str = end.strftime("%Y-%m-%d")
+    hits, misses = store.plan_batch(symbols, start, end)
+    for symbol in hits:
+        checkpoint.mark_done(symbol, end_str)
+
+    downloaded = failed = 0
+    if misses:
+        bucket.acquire()
+        try:
+            frames = store.download_batch(misses)
+        except Exception as e:
+            logger.error(f"Download of {len(misses)} symbols failed: {e}")
+            frames = {}
+
+        for symbol, ranges in misses.items():
+            data = frames.get(symbol)
+            if data is None:
+                checkpoint.mark_failed(symbol, "No data in download")
+                failed += 1
+                continue
+            try:
+                store.complete_batch(symbol, ranges, data, start, end)
+                checkpoint.mark_done(symbol, end_str)
+                downloaded += 1
+            except Exception as e:
+                checkpoint.mark_failed(symbol, str(e))
+                failed += 1
+
+    checkpoint.save()
+    return len(hits), downloaded, failed
+
+
+def prefetch_universe(
+    symbols: List[str],
+    checkpoint: Checkpoint,
+    years: int = 5,
+    end: Optional[datetime] = None,
+    incremental: bool = False,
+    chunk_size: int = 50,
+    workers: int = 4,
+    rate: float = 0.5,
+    burst: int = 2,
+    store: BarStore = bar_store,
+) -> Dict[str, int]:
+    """
+    Prefetch daily bars for a list of symbols into the bar store.
+
+    Args:
+        symbols: Symbols to prefetch
+        checkpoint: Checkpoint to resume from and update
+        years: Years of history for symbols without a checkpoint
+        end: Last day to prefetch, defaults to the last closed day
+        incremental: Only fetch the days after each symbol's checkpoint
+        chunk_size: Symbols per multi-ticker download
+        workers: Concurrent chunks
+        rate: Downloads per second allowed on average
+        burst: Downloads allowed back to back
+        store: Bar store to fill
+
+    Returns:
+        Counts of stored, downloaded and failed symbols and of chunks
+    """
+    end = end or last_closed_day()
+    start = (pd.Timestamp(end) - pd.DateOffset(years=years)).to_pydatetime()
+    chunks = plan_chunks(symbols, checkpoint, start, end, chunk_size, incremental)
+    bucket = TokenBucket(rate=rate, capacity=burst)
+    totals = {"stored": 0, "downloaded": 0, "failed": 0, "chunks": len(chunks)}
+
+    logger.info(
+        f"Prefetching {sum(len(group) for _, group in chunks)} of {len(symbols)} symbols "
+        f"through {end.date()} in {len(chunks)} chunks"
+    )
+
+    with ThreadPoolExecutor(max_workers=max(workers, 1), thread_name_prefix="prefetch") as pool:
+        futures = {
+            pool.submit(prefetch_chunk, store, group, chunk_start, end, bucket, checkpoint): group
+            for chunk_start, group in chunks
+        }
+        for done_count, future in enumerate(as_completed(futures), 1):
+            group = futures[future]
+            try:
+                stored, downloaded, failed = future.result()
+            except Exception as e:
+                logger.error(f"Chunk {group[0]}..{group[-1]} failed: {e}")
+                stored, downloaded, failed = 0, 0, len(group)
+            totals["stored"] += stored
+            totals["downloaded"] += downloaded
+            totals["failed"] += failed
+            logger.info(
+                f"[{done_count}/{len(chunks)}] {group[0]}..{group[-1]}: "
+                f"{stored} stored, {downloaded} downloaded, {failed} failed"
+            )
+
+    logger.info(f"Waited {bucket.waited_seconds:.1f}s on the rate limit")
+    return totals
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Parse arguments and run the prefetch."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--years", type=int, default=5, help="Years of history (default: 5)")
+    parser.add_argument("--end", help="Last day to fetch (YYYY-MM-DD), default: yesterday")
+    parser.add_argument(
+        "--incremental", action="store_true", help="Only append days after each checkpoint"
+    )
+    parser.add_argument("--chunk-size", type=int, default=50, help="Symbols per download")
+    parser.add_argument("--workers", type=int, default=4, help="Concurrent downloads")
+    parser.add_argument("--rate", type=float, default=0.5, help="Downloads per second")
+    parser.add_argument("--burst", type=int, default=2, help="Downloads allowed back to back")
+    parser.add_argument("--universe", type=Path, default=DEFAULT_UNIVERSE)
+    parser.add_argument("--checkpoint", type=Path, default=DEFAULT_CHECKPOINT)
+    parser.add_argument("--symbols", nargs="*", help="Only these symbols (e.g. 2330.TW)")
+    args = parser.parse_args(argv)
+
+    symbols = args.symbols or load_universe(args.universe)
+    checkpoint = Checkpoint(args.checkpoint)
+    totals = prefetch_universe(
+        symbols,
+        checkpoint,
+        years=args.years,
+        end=pd.Timestamp(args.end).to_pydatetime() if args.end else None,
+        incremental=args.incremental,
+        chunk_size=args.chunk_size,
+        workers=args.workers,
+        rate=args.rate,
+        burst=args.burst,
+    )
+
+    print("\n" + "=" * 50)
+    print("Bar Store Prefetch Finished")
+    print("=" * 50)
+    print(f"Chunks: {totals['chunks']}")
+    print(f"Already stored: {totals['stored']}")
+    print(f"Downloaded: {totals['downloaded']}")
+    print(f"Failed: {totals['failed']} (retried on the next run)")
+    print(f"Checkpoint: {args.checkpoint}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Test memory-mapped bar packs built from the bar store.
+
+Upstream Yahoo Finance calls are replaced with a synthetic business-day series,
+so this test runs offline.
+"""
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.helpers.yfinance import EmptyDataError
+from app.services.playback_service import PlaybackService
+from app.utils import bar_pack as bar_pack_module
+from app.utils import bar_store as bar_store_module
+from app.utils.bar_pack import build_bar_pack, get_bar_pack
+from app.utils.bar_store import BarStore
+from app.utils.session_store import MemorySessionStore
+from app.utils.wire_formats import to_columns
+
+
+def is_mapped(array: np.ndarray) -> bool:
+    """Check whether an array is a view onto a memory-mapped file."""
+    while isinstance(array, np.ndarray):
+        if isinstance(array, np.memmap):
+            return True
+        array = array.base
+    return False
+
+
+@pytest.fixture
+def upstream_calls(monkeypatch):
+    """Replace the upstream download with a deterministic series and record calls."""
+    calls = []
+
+    def fake_get_stock_data(symbol, start_date, end_date, period=None):
+        calls.append((symbol, start_date, end_date))
+        index = pd.bdate_range(start_date, end_date, tz="Asia/Taipei", name="Date")
+        if len(index) == 0:
+            raise EmptyDataError(f"No data available for {symbol}")
+        close = (index.day + 100).to_numpy(dtype=float)
+        return pd.DataFrame(
+            {"Open": close, "High": close + 1, "Low": close - 1, "Close": close, "Volume": 7},
+            index=index,
+        )
+
+    monkeypatch.setattr(
+        bar_store_module.YFinanceService, "get_stock_data", staticmethod(fake_get_stock_data)
+    )
+    return calls
+
+
+@pytest.fixture
+def packed_store(tmp_path, upstream_calls):
+    """Bar store holding two symbols, packed through the end of February 2024."""
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    factory = sessionmaker(bind=engine)
+    store = BarStore(session_factory=factory, pack_loader=lambda: None)
+    store.get_bars("2330.TW", "2024-01-01", "2024-03-29")
+    store.get_bars("2317.TW", "2024-02-01", "2024-03-29")
+
+    totals = build_bar_pack(
+        str(tmp_path), session_factory=factory, through=pd.Timestamp("2024-02-29")
+    )
+    assert totals == {"symbols": 2, "rows": len(pd.bdate_range("2024-01-01", "2024-02-29")) + 21}
+    return BarStore(session_factory=factory, pack_loader=lambda: get_bar_pack(str(tmp_path)))
+
+
+def test_pack_slices_are_views_of_the_mapped_files(tmp_path, packed_store):
+    """Packed columns are read-only views; dates and values match the store."""
+    pack = get_bar_pack(str(tmp_path))
+    columns = pack.columns("2330.TW", pd.Timestamp("2024-02-05"), pd.Timestamp("2024-02-09"))
+
+    assert is_mapped(columns["close"])
+    assert not columns["close"].flags.writeable
+    dates = columns["timestamps"].astype("datetime64[ns]").astype("datetime64[D]").astype(str)
+    assert dates.tolist() == ["2024-02-05", "2024-02-06", "2024-02-07", "2024-02-08", "2024-02-09"]
+    assert columns["close"].tolist() == [105.0, 106.0, 107.0, 108.0, 109.0]
+    assert pack.covers("2317.TW", pd.Timestamp("2024-02-01"))
+    assert not pack.covers("2317.TW", pd.Timestamp("2024-01-15"))
+
+    # A rebuild is picked up on the next lookup
+    build_bar_pack(str(tmp_path), session_factory=packed_store._session_factory)
+    assert get_bar_pack(str(tmp_path)).build_id != pack.build_id
+
+
+def test_store_reads_packed_days_and_only_the_tail_from_sqlite(packed_store, upstream_calls):
+    """Reads spanning the pack end combine packed days with stored days after it."""
+    upstream_calls.clear()
+    data = packed_store.get_bars("2330.TW", "2024-02-26", "2024-03-05")
+
+    assert not upstream_calls
+    assert str(data.index.tz) == "Asia/Taipei"
+    assert [d.day for d in data.index] == [26, 27, 28, 29, 1, 4, 5]
+
+
+def test_data_reads_of_packed_range_are_views(packed_store):
+    """Historical data reads inside the pack hand the mapped columns to the encoders."""
+    data = packed_store.get_bars("2330.TW", "2024-01-08", "2024-02-16")
+
+    assert str(data.index.tz) == "Asia/Taipei"
+    for column in ("Open", "High", "Low", "Close", "Volume"):
+        assert is_mapped(data[column].to_numpy())
+    assert to_columns(data)["close"][:3] == [108.0, 109.0, 110.0]
+
+
+def test_playback_loads_packed_range_without_copying(tmp_path, packed_store, monkeypatch):
+    """A historical replay inside the pack is a zero-copy view of the mapped files."""
+    monkeypatch.setattr(bar_pack_module.settings, "bar_pack_dir", str(tmp_path))
+    service = PlaybackService(store=MemorySessionStore())
+
+    bars = service.load_bars("2330.TW", "2024-01-08", "2024-02-16", None)
+    assert bars.dates()[0] == "2024-01-08" and bars.dates()[-1] == "2024-02-16"
+    assert is_mapped(bars.close) and is_mapped(bars.timestamps)
@@ -0,0 +1,168 @@
+"""
+Test the local bar store incremental range fill.
+
+Upstream Yahoo Finance calls are replaced with a synthetic business-day series,
+so this test runs offline.
+"""
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.helpers.yfinance import EmptyDataError
+from app.utils import bar_store as bar_store_module
+from app.utils.bar_store import BarStore, period_to_date_range
+
+
+@pytest.fixture
+def upstream_calls(monkeypatch):
+    """Replace the upstream download with a deterministic series and record calls."""
+    calls = []
+
+    def fake_get_stock_data(symbol, start_date, end_date, period=None):
+        calls.append((symbol, start_date, end_date))
+        index = pd.bdate_range(start_date, end_date, tz="Asia/Taipei", name="Date")
+        if len(index) == 0:
+            raise EmptyDataError(f"No data available for {symbol}")
+        close = np.arange(len(index), dtype=float) + 100.0
+        return pd.DataFrame(
+            {
+                "Open": close - 1,
+                "High": close + 1,
+                "Low": close - 2,
+                "Close": close,
+                "Volume": np.full(len(index), 1000),
+                "Dividends": 0.0,
+            },
+            index=index,
+        )
+
+    monkeypatch.setattr(
+        bar_store_module.YFinanceService, "get_stock_data", staticmethod(fake_get_stock_data)
+    )
+    return calls
+
+
+@pytest.fixture
+def store():
+    """Bar store on an in-memory SQLite database."""
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    return BarStore(session_factory=sessionmaker(bind=engine))
+
+
+def test_repeat_range_is_served_locally(store, upstream_calls):
+    """A second read of a closed range must not go upstream."""
+    first = store.get_bars("2330.tw", "2024-01-01", "2024-03-29")
+    second = store.get_bars("2330.TW", "2024-01-01", "2024-03-29")
+
+    assert len(upstream_calls) == 1
+    assert len(first) == len(second) == len(pd.bdate_range("2024-01-01", "2024-03-29"))
+    assert list(second.columns) == ["Open", "High", "Low", "Close", "Volume"]
+    assert str(second.index.tz) == "Asia/Taipei"
+
+
+def test_only_missing_ranges_are_fetched(store, upstream_calls):
+    """Extending a cached range fetches just the uncovered tail."""
+    store.get_bars("2330.TW", "2024-01-01", "2024-03-31")
+    data = store.get_bars("2330.TW", "2024-02-01", "2024-04-30")
+
+    assert upstream_calls[-1] == ("2330.TW", "2024-04-01", "2024-04-30")
+    assert data.index[0].date().isoformat() == "2024-02-01"
+    assert data.index[-1].date().isoformat() == "2024-04-30"
+
+
+def test_unknown_symbol_is_not_marked_covered(store, upstream_calls, monkeypatch):
+    """An empty answer for a never-seen symbol raises and is retried next time."""
+
+    def empty(symbol, start_date, end_date, period=None):
+        upstream_calls.append((symbol, start_date, end_date))
+        raise EmptyDataError(f"No data available for {symbol}")
+
+    monkeypatch.setattr(bar_store_module.YFinanceService, "get_stock_data", staticmethod(empty))
+
+    for _ in range(2):
+        with pytest.raises(EmptyDataError):
+            store.get_bars("9999.TW", "2024-01-01", "2024-01-31")
+
+    assert len(upstream_calls) == 2
+
+
+def test_batch_downloads_all_misses_at_once(store, upstream_calls, monkeypatch):
+    """Stored symbols are served locally; the rest share one multi-ticker download."""
+    bulk_calls = []
+
+    def fake_bulk(symbols, start_date, end_date):
+        bulk_calls.append((list(symbols), start_date, end_date))
+        index = pd.bdate_range(start_date, end_date, name="Date")  # Naive, like yf.download
+        close = np.arange(len(index), dtype=float) + 50.0
+        frame = pd.DataFrame(
+            {"Open": close, "High": close + 1, "Low": close - 1, "Close": close, "Volume": 10},
+            index=index,
+        )
+        return {symbol: frame for symbol in symbols if symbol != "9999.TW"}
+
+    monkeypatch.setattr(
+        bar_store_module.YFinanceService, "get_stock_data_bulk", staticmethod(fake_bulk)
+    )
+    store.get_bars("2330.TW", "2024-01-01", "2024-03-29")
+    store.get_bars("2317.TW", "2024-01-01", "2024-02-29")
+
+    hits, misses = store.plan_batch(
+        ["2330.tw", "2317.TW", "2454.TW", "9999.TW"], "2024-01-01", "2024-03-29"
+    )
+    assert hits == ["2330.TW"]
+    assert list(misses) == ["2317.TW", "2454.TW", "9999.TW"]
+    assert len(store.read_stored("2330.TW", "2024-01-01", "2024-03-29")) == len(
+        pd.bdate_range("2024-01-01", "2024-03-29")
+    )
+
+    frames = store.download_batch(misses)
+    assert bulk_calls == [(["2317.TW", "2454.TW", "9999.TW"], "2024-01-01", "2024-03-29")]
+
+    tail = store.complete_batch(
+        "2317.TW", misses["2317.TW"], frames["2317.TW"], "2024-01-01", "2024-03-29"
+    )
+    assert len(tail) == len(pd.bdate_range("2024-01-01", "2024-03-29"))
+    assert str(tail.index.tz) == "Asia/Taipei"
+    store.complete_batch(
+        "2454.TW", misses["2454.TW"], frames["2454.TW"], "2024-01-01", "2024-03-29"
+    )
+    with pytest.raises(EmptyDataError):
+        store.complete_batch("9999.TW", misses["9999.TW"], None, "2024-01-01", "2024-03-29")
+
+    hits, misses = store.plan_batch(["2317.TW", "2454.TW", "9999.TW"], "2024-01-01", "2024-03-29")
+    assert hits == ["2317.TW", "2454.TW"] and list(misses) == ["9999.TW"]
+    assert len(upstream_calls) == 2
+
+
+def test_batch_reaching_today_is_downloaded(store, upstream_calls):
+    """The still-open day is never stored, so a range reaching it is always downloaded."""
+    today = bar_store_module.exchange_today("Asia/Taipei")
+    start = today - pd.Timedelta(days=30)
+    store.get_bars("2330.TW", start, today)
+
+    hits, misses = store.plan_batch(["2330.TW"], start, today - pd.Timedelta(days=1))
+    assert hits == ["2330.TW"]
+    hits, misses = store.plan_batch(["2330.TW"], start, today)
+    if today.weekday() < 5:
+        assert hits == [] and misses == {"2330.TW": [(today, today)]}
+
+
+def test_period_to_date_range():
+    """Calendar periods map to ranges; trading-day periods are left to yfinance."""
+    start, end = period_to_date_range("3mo", today=pd.Timestamp("2024-06-15"))
+    assert start.date().isoformat() == "2024-03-15"
+    assert end.date().isoformat() == "2024-06-15"
+    assert period_to_date_range("5d") is None
+    assert period_to_date_range("max") is None
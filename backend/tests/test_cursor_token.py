@@ -0,0 +1,61 @@
+"""
+Test signed stateless playback cursor tokens.
+"""
+
+import os
+import sys
+
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.utils import cursor_token
+from app.utils.cursor_token import (
+    Cursor,
+    InvalidCursorTokenError,
+    decode_cursor,
+    encode_cursor,
+    is_cursor_token,
+    stateless_cursors_available,
+)
+
+
+def test_round_trip_is_compact():
+    """A token decodes back to its cursor and stays short enough for a URL path."""
+    cursor = Cursor("2330.TW", "2024-01-02", "2024-03-29", 42)
+    token = encode_cursor(cursor)
+
+    assert is_cursor_token(token)
+    assert decode_cursor(token) == cursor
+    assert len(token) < 120
+
+
+def test_tampered_tokens_are_rejected():
+    """Changing the payload or signature invalidates the token."""
+    token = encode_cursor(Cursor("2330.TW", "2024-01-02", "2024-03-29", 42))
+    other = encode_cursor(Cursor("2317.TW", "2024-01-02", "2024-03-29", 42))
+    payload, signature = token[3:].split(".")
+
+    for bad in (
+        f"c1.{other[3:].split('.')[0]}.{signature}",
+        f"c1.{payload}.{signature[:-2]}AA",
+        f"c1.{payload}",
+        "c1.garbage.garbage",
+        "not-a-token",
+    ):
+        with pytest.raises(InvalidCursorTokenError):
+            decode_cursor(bad)
+
+
+def test_stateless_needs_a_shared_secret_with_several_workers(monkeypatch):
+    """Per-process random keys are only acceptable for a single worker."""
+    monkeypatch.setattr(cursor_token.settings, "cursor_token_secret", "")
+    monkeypatch.setattr(cursor_token.settings, "web_concurrency", 1)
+    assert stateless_cursors_available()
+
+    monkeypatch.setattr(cursor_token.settings, "web_concurrency", 4)
+    assert not stateless_cursors_available()
+
+    monkeypatch.setattr(cursor_token.settings, "cursor_token_secret", "shared")
+    assert stateless_cursors_available()
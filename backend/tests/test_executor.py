@@ -0,0 +1,66 @@
+"""
+Test the bounded executor used for blocking upstream calls.
+"""
+
+import asyncio
+import os
+import sys
+import threading
+
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.utils.executor import BoundedExecutor, UpstreamSaturatedError, UpstreamTimeoutError
+
+
+def test_timeout_cancels_queued_calls():
+    """A call still waiting for a worker when it times out never runs."""
+    executor = BoundedExecutor(max_workers=1, max_queue=4, default_timeout=5)
+    release = threading.Event()
+    ran = []
+
+    async def scenario():
+        blocker = asyncio.ensure_future(executor.run(release.wait, 5))
+        await asyncio.sleep(0.05)
+
+        with pytest.raises(UpstreamTimeoutError):
+            await executor.run(ran.append, "queued", timeout=0.05)
+
+        release.set()
+        await blocker
+
+    asyncio.run(scenario())
+    executor.shutdown()
+
+    stats = executor.stats()
+    assert ran == []
+    assert stats["timed_out"] == 1
+    assert stats["cancelled"] == 1
+    assert stats["queue_depth"] == 0
+
+
+def test_full_queue_rejects_calls():
+    """Calls beyond the queue bound are rejected instead of piling up."""
+    executor = BoundedExecutor(max_workers=1, max_queue=1, default_timeout=5)
+    release = threading.Event()
+
+    async def scenario():
+        running = asyncio.ensure_future(executor.run(release.wait, 5))
+        await asyncio.sleep(0.05)
+        queued = asyncio.ensure_future(executor.run(lambda: "done"))
+        await asyncio.sleep(0)
+
+        with pytest.raises(UpstreamSaturatedError):
+            await executor.run(lambda: "rejected")
+
+        assert executor.stats()["queue_depth"] == 1
+        release.set()
+        await running
+        assert await queued == "done"
+
+    asyncio.run(scenario())
+    executor.shutdown()
+
+    assert executor.stats()["rejected"] == 1
@@ -0,0 +1,72 @@
+"""
+Test cursor-revealed technical indicators.
+"""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from test_playback_session import make_dataset
+
+from app.services.dataset_registry import Dataset
+from app.services.indicators import (
+    IndicatorError,
+    get_indicator,
+    parse_indicator,
+    parse_indicators,
+)
+from app.services.playback_service import PlaybackSession
+
+
+def test_parse_indicator():
+    """Missing parameters take defaults; bad specs are rejected."""
+    assert str(parse_indicator("MACD")) == "macd:12,26,9"
+    assert str(parse_indicator("bbands:10")) == "bbands:10,2"
+    assert str(parse_indicator("bbands:20,2.5")) == "bbands:20,2.5"
+    assert parse_indicators(["rsi", "rsi:14", "sma:5"]) == [
+        parse_indicator("rsi"),
+        parse_indicator("sma:5"),
+    ]
+
+    for bad in ("vwap", "sma:0", "sma:2.5", "sma:a", "macd:1,2,3,4"):
+        with pytest.raises(IndicatorError):
+            parse_indicator(bad)
+
+
+@pytest.mark.parametrize("spec", ["sma:5", "ema:5", "rsi:5", "macd:3,6,3", "bbands:5,2"])
+def test_indicators_are_causal(spec):
+    """Values over the full dataset equal values computed from the prefix alone."""
+    dataset = make_dataset(40)
+    noise = np.sin(np.arange(40)) * 3
+    bars = dataset.bars
+    bars = type(bars)(
+        bars.timestamps, bars.open, bars.high, bars.low, bars.close + noise, bars.volume
+    )
+    full = get_indicator(Dataset(dataset.key, bars), parse_indicator(spec))
+    prefix = get_indicator(Dataset(dataset.key, bars.slice(0, 25)), parse_indicator(spec))
+
+    for name, values in prefix.items():
+        np.testing.assert_allclose(full[name][:25], values)
+
+
+def test_session_reveals_up_to_cursor_and_shares_cache():
+    """Sessions on one dataset share the computation and only see revealed bars."""
+    dataset = make_dataset(30)
+    first = PlaybackSession("a", "2330.TW", dataset)
+    second = PlaybackSession("b", "2330.TW", dataset)
+    specs = parse_indicators(["sma:3"])
+
+    first.next(9)
+    assert first.indicator_values(specs)["sma:3"]["sma"] == pytest.approx(
+        dataset.bars.close[7:10].mean()
+    )
+    assert second.indicator_values(specs)["sma:3"]["sma"] is None  # warm-up at index 0
+    assert len(dataset.derived) == 1
+
+    series = first.indicator_window(specs, 0, 100)["sma:3"]["sma"]
+    assert len(series) == 10 and series[:2] == [None, None]
@@ -0,0 +1,108 @@
+"""
+Test synthetic intrabar paths and resting limit/stop orders.
+"""
+
+import os
+import sys
+
+import numpy as np
+from fastapi.testclient import TestClient
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from test_playback_session import make_bars, make_dataset
+
+from app.main import app
+from app.services.intrabar import bar_path, first_fill, synthesize_path
+from app.services.playback_service import PlaybackSession, playback_service
+from app.services.trading_service import trading_service
+
+client = TestClient(app)
+
+
+def test_path_touches_ohlc_and_stays_in_range():
+    """Paths run open to close, reach both extremes and never leave the bar."""
+    path = synthesize_path(100.0, 105.0, 97.0, 99.0, 60, np.random.default_rng(1))
+
+    assert len(path) == 60
+    assert path[0] == 100.0 and path[-1] == 99.0
+    assert path.max() == 105.0 and path.min() == 97.0
+
+
+def test_paths_are_deterministic_per_seed_and_symbol():
+    """Every worker synthesizes the same ticks for the same bar."""
+    bars = make_bars()
+
+    assert np.array_equal(bar_path(bars, 3, 30, 0, "2330.TW"), bar_path(bars, 3, 30, 0, "2330.TW"))
+    assert not np.array_equal(
+        bar_path(bars, 3, 30, 0, "2330.TW"), bar_path(bars, 3, 30, 1, "2330.TW")
+    )
+    assert not bar_path(bars, 3, 30, 0, "2330.TW").flags.writeable
+
+
+def test_first_fill_rules():
+    """Limits fill at or better than their price; gaps through the price fill at the open."""
+    path = np.array([100.0, 98.0, 96.0, 103.0, 101.0])
+
+    assert first_fill(path, "buy", "limit", 97.0) == (2, 97.0)
+    assert first_fill(path, "sell", "stop", 98.5) == (1, 98.5)
+    assert first_fill(path, "buy", "stop", 102.0) == (3, 102.0)
+    assert first_fill(path, "sell", "limit", 99.0) == (0, 100.0)  # Opened above the limit
+    assert first_fill(path, "buy", "limit", 90.0) is None
+
+
+def test_resting_orders_settle_on_revealed_bars():
+    """Orders fill only once a later bar is revealed, and can be cancelled while pending."""
+    playback_service.add_session(PlaybackSession("orders-pb", "2330.TW", make_dataset()))
+    try:
+        client.get("/api/playback/orders-pb/next?count=5")
+        account_id = trading_service.create_account("orders-pb", "2330.TW", 1000.0)
+
+        # Bar 6 opens around 105.2 and ranges down to about 104.2
+        limit = client.post(
+            f"/api/trading/account/{account_id}/orders",
+            json={"side": "buy", "order_type": "limit", "price": 104.5},
+        ).json()
+        assert limit["order"]["placed_index"] == 5
+        stop = client.post(
+            f"/api/trading/account/{account_id}/orders",
+            json={"side": "buy", "order_type": "stop", "price": 500.0},
+        ).json()
+
+        status = client.get(f"/api/trading/account/{account_id}/status").json()
+        assert len(status["pending_orders"]) == 2 and status["trade_count"] == 0
+
+        client.get("/api/playback/orders-pb/next?count=1")
+        status = client.get(f"/api/trading/account/{account_id}/status").json()
+        assert [o["order_type"] for o in status["pending_orders"]] == ["stop"]
+        history = client.get(f"/api/trading/account/{account_id}/history").json()["trades"]
+        assert [(t["type"], t["price"]) for t in history] == [("buy", 104.5)]
+
+        order_id = stop["order"]["id"]
+        assert (
+            client.delete(f"/api/trading/account/{account_id}/orders/{order_id}").status_code == 200
+        )
+        assert (
+            client.delete(f"/api/trading/account/{account_id}/orders/{order_id}").status_code == 404
+        )
+        assert (
+            client.get(f"/api/trading/account/{account_id}/status").json()["pending_orders"] == []
+        )
+    finally:
+        playback_service.delete_session("orders-pb")
+        trading_service.delete_accounts_for_playback("orders-pb")
+
+
+def test_intrabar_endpoint_reveals_only_past_candles():
+    """The tick path is available for revealed candles and hidden for future ones."""
+    playback_service.add_session(PlaybackSession("ticks-pb", "2330.TW", make_dataset()))
+    try:
+        client.get("/api/playback/ticks-pb/next?count=3")
+
+        body = client.get("/api/playback/ticks-pb/intrabar?steps=20").json()
+        assert body["index"] == 3 and len(body["ticks"]) == 20
+        assert body == client.get("/api/playback/ticks-pb/intrabar?index=3&steps=20").json()
+        assert client.get("/api/playback/ticks-pb/intrabar?index=4").status_code == 400
+    finally:
+        playback_service.delete_session("ticks-pb")
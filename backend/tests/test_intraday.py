@@ -0,0 +1,148 @@
+"""
+Test intraday playback over chunks loaded around the cursor.
+"""
+
+import os
+import sys
+import time
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from test_playback_session import make_dataset
+
+from app.helpers.yfinance import DataRetrievalError
+from app.services.bar_series import BarSeries
+from app.services.intraday import ChunkedBars
+from app.services.playback_service import IntradaySession, PlaybackService
+from app.utils.session_store import MemorySessionStore
+
+BARS_PER_DAY = 60
+
+
+def fake_intraday(calls: list[str]):
+    """Loader returning 60 five-minute bars per day, recording the days it was asked for."""
+
+    def load(symbol: str, first_day: str, last_day: str, interval: str) -> Optional[BarSeries]:
+        calls.append(first_day)
+        days = pd.bdate_range(first_day, last_day)
+        index = pd.DatetimeIndex(
+            [
+                day + pd.Timedelta(hours=9, minutes=5 * i)
+                for day in days
+                for i in range(BARS_PER_DAY)
+            ]
+        )
+        close = np.linspace(100.0, 101.0, len(index))
+        frame = pd.DataFrame(
+            {"Open": close, "High": close + 0.5, "Low": close - 0.5, "Close": close, "Volume": 10},
+            index=index,
+        )
+        return BarSeries.from_dataframe(frame)
+
+    return load
+
+
+def test_chunked_bars_locate_and_slice_across_chunks():
+    """Global positions map onto chunks; a slice spanning two chunks joins them."""
+    calls: list[str] = []
+    loader = fake_intraday(calls)
+    days = ["2024-01-01", "2024-01-02", "2024-01-03"]
+    chunks = ChunkedBars(days, lambda first, last: loader("2330.TW", first, last, "5m"), 1)
+
+    assert chunks.locate(70) == (1, 10)
+    assert calls == ["2024-01-01", "2024-01-02"]  # Only the chunks up to the index
+    assert chunks.estimated_length() == 3 * BARS_PER_DAY
+
+    window = chunks.slice(55, 65)
+    assert len(window) == 10
+    assert window.dates()[0] == "2024-01-01" and window.dates()[-1] == "2024-01-02"
+    assert chunks.locate(3 * BARS_PER_DAY) is None
+
+    chunks.evict(2, 2)
+    assert chunks.resident() == [2] and chunks.lengths == [BARS_PER_DAY] * 3
+
+
+def test_failed_chunk_load_records_no_length():
+    """A failed load leaves the chunk unknown; only a real empty result records zero bars."""
+    calls: list[str] = []
+    loader = fake_intraday(calls)
+    failures = ["2024-01-02"]
+
+    def flaky(first: str, last: str) -> Optional[BarSeries]:
+        if first in failures:
+            failures.remove(first)
+            raise DataRetrievalError("upstream unavailable")
+        if first == "2024-01-03":
+            return None  # Holiday
+        return loader("2330.TW", first, last, "5m")
+
+    chunks = ChunkedBars(["2024-01-01", "2024-01-02", "2024-01-03"], flaky, 1)
+
+    with pytest.raises(DataRetrievalError):
+        chunks.locate(70)
+    assert chunks.lengths == [BARS_PER_DAY, None, None]
+
+    assert chunks.locate(70) == (1, 10)
+    assert chunks.locate(2 * BARS_PER_DAY) is None
+    assert chunks.lengths == [BARS_PER_DAY, BARS_PER_DAY, 0]
+
+
+def test_unready_cursor_prefetches_instead_of_loading():
+    """Event-loop readers get 'not ready' and a prefetch rather than a blocking load."""
+    calls: list[str] = []
+    session = IntradaySession("ready", "2330.TW", make_dataset(10), "5m", fake_intraday(calls))
+
+    assert not session.chunks.ready(0, 2)
+    assert not session.is_ready()
+    deadline = time.monotonic() + 5
+    while not session.is_ready() and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    assert session.is_ready() and calls == [session.chunks.days[0]]
+    assert session.chunks.resident() == [0]
+
+    session.chunks.evict(1, 1)
+    assert not session.chunks.ready(0, 1)
+    assert session.chunks.ready(10_000, 10_001) is False  # Later lengths still unknown
+
+
+def test_intraday_session_keeps_only_chunks_near_cursor():
+    """Replayed chunks are dropped, and a restored session keeps positions without reloading them."""
+    calls: list[str] = []
+    loader = fake_intraday(calls)
+    service = PlaybackService(store=MemorySessionStore())
+    session = IntradaySession("intraday", "2330.TW", make_dataset(10), "5m", loader)
+    service.add_session(session)
+
+    for _ in range(5):
+        window = session.next(BARS_PER_DAY)
+        assert len(window) == BARS_PER_DAY
+
+    assert session.current_index == 5 * BARS_PER_DAY
+    # Cursor in chunk 5: one chunk kept behind, prefetch reaches past the next 100 bars
+    assert min(session.chunks.resident()) >= 4 and max(session.chunks.resident()) <= 8
+    assert session.get_total_count() == 10 * BARS_PER_DAY
+    assert session.window(0, 3).dates()[0] == "2024-01-01"  # Reloaded on demand
+    assert session.get_stats() is None and session.has_more()
+
+    state = session.to_state()
+    assert state["interval"] == "5m" and state["chunks"][:5] == [BARS_PER_DAY] * 5
+
+    restored_calls: list[str] = []
+    restored = IntradaySession(
+        "intraday",
+        "2330.TW",
+        make_dataset(10),
+        "5m",
+        fake_intraday(restored_calls),
+        state["chunks"],
+    )
+    restored.apply_state(state)
+    assert restored.get_current() == session.get_current()
+    assert restored_calls == ["2024-01-08"]  # Only the chunk at the cursor
@@ -0,0 +1,94 @@
+"""
+Test the playback REST endpoints.
+"""
+
+import os
+import sys
+
+from fastapi.testclient import TestClient
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from test_playback_session import make_bars, make_dataset
+
+from app.main import app
+from app.services.playback_service import PlaybackSession, playback_service
+
+client = TestClient(app)
+
+
+def register_session(playback_id: str, rows: int = 30) -> PlaybackSession:
+    """Put a session over synthetic bars into the global service."""
+    session = PlaybackSession(playback_id, "2330.TW", make_dataset(rows))
+    playback_service.add_session(session)
+    return session
+
+
+def test_next_return_all_and_window():
+    """/next?return_all returns every bar passed; /window replays revealed bars."""
+    register_session("api-window")
+    try:
+        body = client.get("/api/playback/api-window/next?count=5&return_all=true").json()
+        replay = client.get("/api/playback/api-window/window?from=0&to=5").json()
+        assert replay["candles"] == body["candles"]
+        assert body["current_data"] == body["candles"][-1]
+        assert body["current_index"] == 5
+
+        window = client.get("/api/playback/api-window/window?from=3&to=100").json()
+        assert (window["from_index"], window["to_index"]) == (3, 6)
+        assert len(window["candles"]) == 3
+        assert window["price_range"]["max_price"] == max(c["high"] for c in window["candles"])
+        assert body["stats"]["max_price"] == max(c["high"] for c in body["candles"])
+
+        assert client.get("/api/playback/api-window/window?from=4&to=2").status_code == 400
+        assert client.get("/api/playback/api-window/next").json()["candles"] is None
+    finally:
+        playback_service.delete_session("api-window")
+
+
+def test_stateless_cursor_flow(monkeypatch):
+    """Stateless playback returns a fresh token per step and keeps no session."""
+    monkeypatch.setattr(playback_service, "load_bars", lambda *args: make_bars())
+    before = playback_service.get_all_sessions()
+
+    start = client.post("/api/playback/start", json={"symbol": "2330.TW", "stateless": True})
+    token = start.json()["playback_id"]
+    assert start.status_code == 200 and token.startswith("c1.")
+
+    step = client.get(f"/api/playback/{token}/next?count=5").json()
+    assert step["current_index"] == 5 and step["playback_id"] != token
+
+    # Old tokens stay valid: the cursor lives only in the token
+    assert client.get(f"/api/playback/{token}/status").json()["current_index"] == 0
+
+    token = step["playback_id"]
+    seek = client.post(f"/api/playback/{token}/seek", json={"index": 20}).json()
+    assert client.get(f"/api/playback/{seek['playback_id']}/status").json()["current_index"] == 20
+    window = client.get(f"/api/playback/{seek['playback_id']}/window?from=18").json()
+    assert (window["from_index"], window["to_index"]) == (18, 21)
+
+    assert playback_service.get_all_sessions() == before
+    assert client.get(f"/api/playback/{token[:-4]}AAAA/status").status_code == 404
+
+
+def test_indicator_endpoints():
+    """Indicators follow the cursor on /next and /indicators, and bad specs are 400."""
+    register_session("api-indicators")
+    try:
+        body = client.get(
+            "/api/playback/api-indicators/next?count=10&indicator=sma:5&indicator=rsi"
+        ).json()
+        assert set(body["indicators"]) == {"sma:5", "rsi:14"}
+        assert body["indicators"]["sma:5"]["sma"] is not None
+
+        series = client.get(
+            "/api/playback/api-indicators/indicators?indicator=macd&from=5&to=500"
+        ).json()
+        assert (series["from_index"], series["to_index"]) == (5, 11)
+        assert set(series["indicators"]["macd:12,26,9"]) == {"macd", "signal", "histogram"}
+        assert len(series["indicators"]["macd:12,26,9"]["macd"]) == 6
+
+        assert client.get("/api/playback/api-indicators/status?indicator=vwap").status_code == 400
+    finally:
+        playback_service.delete_session("api-indicators")
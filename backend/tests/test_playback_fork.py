@@ -0,0 +1,84 @@
+"""
+Test forking playback sessions and copy-on-write trading accounts.
+"""
+
+import os
+import sys
+import threading
+
+from fastapi.testclient import TestClient
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from test_playback_session import make_dataset
+
+from app.main import app
+from app.services.playback_service import PlaybackSession, playback_service
+from app.services.trading_service import trading_service
+
+client = TestClient(app)
+
+
+def test_fork_shares_bars_and_copies_ledger_on_write():
+    """The child starts at the parent's cursor; later trades stay on their own branch."""
+    dataset = make_dataset()
+    parent = PlaybackSession("fork-parent", "2330.TW", dataset)
+    playback_service.add_session(parent)
+    try:
+        client.get("/api/playback/fork-parent/next?count=6")
+        account_id = trading_service.create_account("fork-parent", "2330.TW", 1000.0)
+        trading_service.execute_trade(account_id, "buy", 100.0)
+        trading_service.execute_trade(account_id, "buy", 101.0)
+
+        body = client.post("/api/playback/fork-parent/fork").json()
+        child_id, child_account_id = body["playback_id"], body["accounts"][account_id]
+        assert body["parent_id"] == "fork-parent" and body["current_index"] == 6
+
+        child = playback_service.get_session(child_id)
+        assert child.bars is parent.bars and dataset.refcount == 2
+
+        # Both accounts reference one frozen segment instead of copying the trades
+        for stored in (account_id, child_account_id):
+            state = trading_service.store.get(f"account:{stored}")
+            assert state["trades"] == [] and state["ledger"]
+
+        trading_service.execute_trade(child_account_id, "sell", 120.0)
+        client.get(f"/api/playback/{child_id}/next?count=3")
+
+        assert len(trading_service.get_account(child_account_id).get_history()) == 3
+        original = trading_service.get_account(account_id)
+        assert len(original.get_history()) == 2 and original.position_shares == 2
+        assert playback_service.get_session("fork-parent").current_index == 6
+
+        assert client.post("/api/playback/missing/fork").status_code == 404
+    finally:
+        playback_service.delete_session("fork-parent")
+        playback_service.delete_session(child_id)
+        trading_service.delete_accounts_for_playback("fork-parent")
+        trading_service.delete_accounts_for_playback(child_id)
+
+
+def test_concurrent_trades_are_not_lost():
+    """Trades racing on one account are re-applied on conflict instead of overwritten."""
+    dataset = make_dataset()
+    playback_service.add_session(PlaybackSession("trade-race", "2330.TW", dataset))
+    try:
+        account_id = trading_service.create_account("trade-race", "2330.TW", 100000.0)
+
+        def trade():
+            for _ in range(5):
+                trading_service.execute_trade(account_id, "buy", 100.0)
+
+        threads = [threading.Thread(target=trade) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        account = trading_service.get_account(account_id)
+        assert account.position_shares == 20 and len(account.get_history()) == 20
+        assert trading_service.execute_trade("missing", "buy", 100.0) is None
+    finally:
+        playback_service.delete_session("trade-race")
+        trading_service.delete_accounts_for_playback("trade-race")
@@ -0,0 +1,247 @@
+"""
+Test the array-backed playback session.
+"""
+
+import os
+import sys
+import threading
+
+import numpy as np
+import pandas as pd
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.services.bar_series import BarSeries, align_frames
+from app.services.dataset_registry import Dataset, DatasetKey, DatasetRegistry
+from app.services.playback_service import PlaybackService, PlaybackSession
+from app.utils.session_store import MemorySessionStore
+
+
+def make_bars(rows: int = 30) -> BarSeries:
+    """Build a tz-aware daily frame like yfinance returns and convert it."""
+    index = pd.bdate_range("2024-01-01", periods=rows, tz="Asia/Taipei", name="Date")
+    close = np.linspace(100.0, 130.0, rows)
+    frame = pd.DataFrame(
+        {
+            "Open": close - 1,
+            "High": close + 2,
+            "Low": close - 2,
+            "Close": close,
+            "Volume": np.arange(rows) * 1000,
+        },
+        index=index,
+    )
+    return BarSeries.from_dataframe(frame)
+
+
+def make_dataset(rows: int = 30) -> Dataset:
+    """Wrap bars in a dataset held by one session."""
+    return Dataset(
+        key=DatasetKey("2330.TW", "2024-01-01", "2024-02-09", None),
+        bars=make_bars(rows),
+        refcount=1,
+    )
+
+
+def test_bar_series_layout():
+    """Columns become contiguous, read-only arrays with naive int64 timestamps."""
+    bars = make_bars()
+
+    assert bars.timestamps.dtype == np.int64
+    assert bars.close.dtype == np.float64
+    assert bars.volume.dtype == np.int64
+    assert bars.close.flags.c_contiguous and not bars.close.flags.writeable
+    assert bars.dates()[:2] == ["2024-01-01", "2024-01-02"]
+
+
+def test_next_returns_zero_copy_window():
+    """Advancing returns a view onto the session arrays and moves the cursor."""
+    session = PlaybackSession("pb", "2330.TW", make_dataset())
+
+    window = session.next(10)
+
+    assert len(window) == 10
+    assert session.current_index == 10
+    assert np.shares_memory(window.close, session.bars.close)
+    assert window.last() == session.bars.candle_at(9)
+    assert session.get_current().timestamp.isoformat() == "2024-01-15T00:00:00"
+
+
+def test_next_stops_at_end():
+    """Windows are clipped at the end of the data."""
+    session = PlaybackSession("pb", "2330.TW", make_dataset(5))
+
+    assert len(session.next(100)) == 5
+    assert len(session.next(1)) == 0
+    assert not session.has_more()
+
+
+def test_idle_sessions_are_evicted_with_listeners():
+    """Sessions past the TTL are dropped and listeners are told which ones."""
+    service = PlaybackService(ttl_seconds=60, max_bytes=10_000_000, store=MemorySessionStore())
+    evicted = []
+    service.add_eviction_listener(evicted.append)
+
+    session = PlaybackSession("idle", "2330.TW", make_dataset())
+    session.last_access -= 120
+    service.add_session(session)
+    service.add_session(PlaybackSession("fresh", "2330.TW", make_dataset()))
+
+    assert service.get_session("idle") is None
+    assert evicted == ["idle"]
+    assert service.get_all_sessions() == ["fresh"]
+
+
+def test_listing_evicts_outside_the_lock():
+    """Eviction listeners triggered by list_sessions can take the service lock."""
+    service = PlaybackService(ttl_seconds=60, max_bytes=10_000_000, store=MemorySessionStore())
+    unlocked = []
+
+    def listener(playback_id):
+        def probe():
+            if service._lock.acquire(timeout=1):
+                service._lock.release()
+                unlocked.append(playback_id)
+
+        thread = threading.Thread(target=probe)
+        thread.start()
+        thread.join()
+
+    service.add_eviction_listener(listener)
+    session = PlaybackSession("idle", "2330.TW", make_dataset())
+    session.last_access -= 120
+    service.add_session(session)
+
+    assert service.list_sessions() == []
+    assert unlocked == ["idle"]
+
+
+def test_streamed_sessions_are_kept_alive():
+    """An open stream refreshes the store TTL and shields its session from eviction."""
+    service = PlaybackService(ttl_seconds=60, max_bytes=10_000_000, store=MemorySessionStore())
+    evicted = []
+    service.add_eviction_listener(evicted.append)
+
+    session = PlaybackSession("streamed", "2330.TW", make_dataset())
+    session.last_access -= 120
+    service.add_session(session)
+    service.stream_opened("streamed")
+
+    assert service.evict_expired() == 0
+    assert service.get_all_sessions() == ["streamed"] and evicted == []
+    assert service.store.get("playback:streamed") is not None
+
+    service.stream_closed("streamed")
+    service.sessions["streamed"].last_access -= 120
+    service.evict_expired()
+    assert service.get_all_sessions() == []
+
+
+def test_memory_budget_evicts_least_recently_used():
+    """Exceeding the byte budget evicts the least recently used session first."""
+    session_bytes = PlaybackSession("x", "2330.TW", make_dataset()).estimated_bytes()
+    service = PlaybackService(
+        ttl_seconds=3600, max_bytes=session_bytes * 2, store=MemorySessionStore()
+    )
+
+    for playback_id in ["a", "b"]:
+        service.add_session(PlaybackSession(playback_id, "2330.TW", make_dataset()))
+    service.get_session("a")  # "b" becomes least recently used
+    service.add_session(PlaybackSession("c", "2330.TW", make_dataset()))
+
+    assert service.get_all_sessions() == ["a", "c"]
+
+
+def test_sessions_share_one_dataset():
+    """Sessions on the same key reference one dataset; it is freed with the last one."""
+    registry = DatasetRegistry()
+    key = DatasetKey("2330.TW", "2024-01-01", "2024-02-09", None)
+    loads = []
+
+    def loader():
+        loads.append(key)
+        return make_bars()
+
+    first = registry.acquire(key, loader)
+    second = registry.acquire(key, loader)
+
+    assert first is second and first.refcount == 2 and len(loads) == 1
+    a = PlaybackSession("a", "2330.TW", first)
+    b = PlaybackSession("b", "2330.TW", second)
+    a.next(5)
+    assert (a.current_index, b.current_index) == (5, 0)
+    assert a.bars.close is b.bars.close
+
+    registry.release(first)
+    assert registry.get(key) is not None
+    registry.release(second)
+    assert registry.get(key) is None
+
+
+def test_window_never_exposes_future_bars():
+    """Windows are clamped to the bars up to the cursor and do not move it."""
+    session = PlaybackSession("pb", "2330.TW", make_dataset())
+    session.next(10)
+
+    assert len(session.window(0)) == 11
+    assert len(session.window(5, 50)) == 6
+    assert len(session.window(20, 25)) == 0
+    assert session.current_index == 10
+
+
+def test_align_frames_shares_calendar():
+    """Baskets join on the union of dates and fill gaps with flat, zero-volume bars."""
+    lead = make_bars(5)
+    index = pd.DatetimeIndex(["2024-01-03", "2024-01-05"], name="Date").tz_localize(
+        "America/New_York"
+    )
+    other = pd.DataFrame(
+        {"Open": 50.0, "High": 52.0, "Low": 49.0, "Close": [50.0, 51.0], "Volume": 7}, index=index
+    )
+    frames = {
+        "2330.TW": pd.DataFrame(
+            {
+                "Open": lead.open,
+                "High": lead.high,
+                "Low": lead.low,
+                "Close": lead.close,
+                "Volume": lead.volume,
+            },
+            index=pd.DatetimeIndex(lead.timestamps).rename("Date"),
+        ),
+        "AAPL": other,
+    }
+
+    aligned = align_frames(frames)
+
+    assert list(aligned) == ["2330.TW", "AAPL"]
+    assert aligned["AAPL"].dates() == aligned["2330.TW"].dates()
+    assert np.isnan(aligned["AAPL"].close[:2]).all()
+    # 2024-01-04 is missing for AAPL: flat bar at the previous close, no volume
+    assert aligned["AAPL"].close[3] == aligned["AAPL"].high[3] == 50.0
+    assert aligned["AAPL"].volume[3] == 0
+
+
+def test_basket_session_moves_all_symbols():
+    """One cursor advances every basket symbol and skips symbols not yet trading."""
+    bars = make_bars(10)
+    members = {
+        "2330.TW": bars,
+        "2317.TW": BarSeries(
+            bars.timestamps,
+            np.r_[np.nan, bars.open[1:]],
+            np.r_[np.nan, bars.high[1:]],
+            np.r_[np.nan, bars.low[1:]],
+            np.r_[np.nan, bars.close[1:]] * 2,
+            bars.volume,
+        ),
+    }
+    key = DatasetKey("2330.TW,2317.TW", "2024-01-01", "2024-01-12", None)
+    session = PlaybackSession("basket", "2330.TW", Dataset(key, bars, refcount=1, members=members))
+
+    assert session.get_basket() == {"2330.TW": bars.candle_at(0), "2317.TW": None}
+    session.next(4)
+    basket = session.get_basket(session.current_index - 1)
+    assert basket["2317.TW"].close == bars.close[3] * 2
+    assert session.to_state()["dataset"][0] == "2330.TW,2317.TW"
@@ -0,0 +1,122 @@
+"""
+Test the WebSocket playback stream and its scheduler.
+"""
+
+import asyncio
+import json
+import os
+import sys
+
+from fastapi.testclient import TestClient
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from test_playback_session import make_dataset
+
+from app.main import app
+from app.services.playback_scheduler import PlaybackScheduler
+from app.services.playback_service import PlaybackSession, playback_service
+from app.services.playback_stream import PlaybackStream
+
+
+def test_stream_frames_and_controls():
+    """Frames advance the cursor; seek and speed messages are acknowledged."""
+    stream = PlaybackStream(PlaybackSession("pb", "2330.TW", make_dataset(5)), speed=1000)
+
+    frame = stream.next_frame()
+    assert frame[0] == 0 and len(frame) == 7
+    assert frame[1] == 1704067200000  # 2024-01-01 naive exchange time
+    assert stream.session.current_index == 1
+    assert stream.speed == 50.0
+
+    assert stream.handle_message({"type": "seek", "index": 4})["current_index"] == 4
+    assert stream.next_frame()[0] == 4
+    assert stream.next_frame() is None
+    assert not stream.active
+
+    assert stream.handle_message({"type": "seek", "index": 99})["type"] == "error"
+    assert stream.handle_message({"type": "speed", "value": 2})["speed"] == 2.0
+    assert stream.handle_message({"type": "bogus"})["type"] == "error"
+
+
+def test_websocket_streams_until_end():
+    """The endpoint pushes every remaining bar, then an end message."""
+    session = PlaybackSession("ws-test", "2330.TW", make_dataset(3))
+    playback_service.add_session(session)
+
+    try:
+        with TestClient(app).websocket_connect(
+            f"/ws/playback/{session.playback_id}?speed=50&paused=true"
+        ) as websocket:
+            status = websocket.receive_json()
+            assert status["paused"] and status["total_count"] == 3
+
+            websocket.send_json({"type": "resume"})
+            assert websocket.receive_json()["paused"] is False
+
+            frames = [websocket.receive_json() for _ in range(3)]
+            assert [frame[0] for frame in frames] == [0, 1, 2]
+            assert websocket.receive_json()["type"] == "end"
+    finally:
+        playback_service.delete_session(session.playback_id)
+
+
+class Sink(list):
+    """Collects decoded frames; optionally blocks like a full socket buffer."""
+
+    def __init__(self, blocked: bool = False):
+        super().__init__()
+        self.unblocked = None if not blocked else asyncio.Event()
+
+    async def send(self, text: str) -> None:
+        if self.unblocked is not None:
+            await self.unblocked.wait()
+        self.append(json.loads(text))
+
+
+def test_scheduler_multiplexes_streams():
+    """One wheel task paces many streams and delivers every frame in order."""
+    scheduler = PlaybackScheduler(tick_seconds=0.005, slots=8)
+    sinks = [Sink() for _ in range(50)]
+
+    async def scenario():
+        for i, sink in enumerate(sinks):
+            session = PlaybackSession(f"pb{i}", "2330.TW", make_dataset(4))
+            scheduler.schedule(PlaybackStream(session, speed=50), sink.send)
+        await asyncio.sleep(0.4)
+        stats = scheduler.stats()
+        await scheduler.stop()
+        return stats
+
+    stats = asyncio.run(scenario())
+
+    for sink in sinks:
+        assert [frame[0] for frame in sink[:4]] == [0, 1, 2, 3]
+        assert sink[4]["type"] == "end"
+    assert stats["frames_sent"] == 200
+    assert stats["streams"] == 0
+
+
+def test_scheduler_defers_blocked_clients():
+    """A client that is not draining its socket does not advance its cursor."""
+    scheduler = PlaybackScheduler(tick_seconds=0.005, slots=8)
+    sink = Sink(blocked=True)
+    session = PlaybackSession("pb", "2330.TW", make_dataset(10))
+
+    async def scenario():
+        scheduler.schedule(PlaybackStream(session, speed=50), sink.send)
+        await asyncio.sleep(0.15)
+        stats = scheduler.stats()
+        assert stats["frames_sent"] == 1
+        assert stats["deferred_frames"] > 0
+        assert stats["pending_sends"] == 1
+        assert session.current_index == 1
+
+        sink.unblocked.set()
+        await asyncio.sleep(0.05)
+        await scheduler.stop()
+
+    asyncio.run(scenario())
+
+    assert [frame[0] for frame in sink[:2]] == [0, 1]
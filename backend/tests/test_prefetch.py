@@ -0,0 +1,98 @@
+"""
+Test the universe prefetch job and its token bucket.
+
+Multi-ticker downloads are replaced with a synthetic business-day series,
+so this test runs offline.
+"""
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.utils import bar_store as bar_store_module
+from app.utils.bar_store import BarStore
+from app.utils.rate_limit import TokenBucket
+from scripts.prefetch_bar_store import Checkpoint, prefetch_universe
+
+
+def test_token_bucket_paces_after_burst():
+    """A full bucket allows a burst, then one token per 1/rate seconds."""
+    now = [0.0]
+
+    def sleep(seconds):
+        now[0] += seconds
+
+    bucket = TokenBucket(rate=2.0, capacity=2, clock=lambda: now[0], sleep=sleep)
+    waits = [bucket.acquire() for _ in range(4)]
+
+    assert waits[:2] == [0.0, 0.0]
+    assert waits[2] == pytest.approx(0.5) and waits[3] == pytest.approx(0.5)
+    assert not bucket.try_acquire()
+    now[0] += 0.5
+    assert bucket.try_acquire()
+
+
+def test_prefetch_resumes_and_appends_new_days(tmp_path, monkeypatch):
+    """Checkpointed symbols are skipped; an incremental run downloads only the new days."""
+    downloads = []
+
+    def fake_bulk(symbols, start_date, end_date):
+        downloads.append((list(symbols), start_date, end_date))
+        index = pd.bdate_range(start_date, end_date, name="Date")
+        close = np.arange(len(index), dtype=float) + 10.0
+        frame = pd.DataFrame(
+            {"Open": close, "High": close + 1, "Low": close - 1, "Close": close, "Volume": 1},
+            index=index,
+        )
+        return {symbol: frame for symbol in symbols if symbol != "9999.TW"}
+
+    monkeypatch.setattr(
+        bar_store_module.YFinanceService, "get_stock_data_bulk", staticmethod(fake_bulk)
+    )
+    # A file database, so the worker threads get their own connections
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'bars.db'}", connect_args={"check_same_thread": False}
+    )
+    store = BarStore(session_factory=sessionmaker(bind=engine))
+    symbols = ["2330.TW", "2317.TW", "2454.TW", "9999.TW"]
+    path = tmp_path / "checkpoint.json"
+
+    def run(end, **kwargs):
+        return prefetch_universe(
+            symbols,
+            Checkpoint(path),
+            years=1,
+            end=pd.Timestamp(end).to_pydatetime(),
+            chunk_size=2,
+            workers=2,
+            rate=1000.0,
+            store=store,
+            **kwargs,
+        )
+
+    totals = run("2024-03-29")
+    assert totals == {"stored": 0, "downloaded": 3, "failed": 1, "chunks": 2}
+    assert len(downloads) == 2
+
+    checkpoint = Checkpoint(path)
+    assert checkpoint.through("2330.TW") == "2024-03-29" and "9999.TW" in checkpoint.failed
+
+    # Only the failed symbol is left for a rerun
+    downloads.clear()
+    assert run("2024-03-29")["chunks"] == 1
+    assert downloads == [(["9999.TW"], "2023-03-29", "2024-03-29")]
+
+    downloads.clear()
+    totals = run("2024-04-01", incremental=True)
+    assert ["2330.TW", "2317.TW"] in [d[0] for d in downloads]
+    assert all(d[1:] == ("2024-03-30", "2024-04-01") for d in downloads if "2330.TW" in d[0])
+    assert Checkpoint(path).through("2454.TW") == "2024-04-01"
+    assert len(store.get_bars("2330.TW", "2024-03-25", "2024-04-01")) == 6
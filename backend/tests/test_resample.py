@@ -0,0 +1,104 @@
+"""
+Test timeframe resampling of daily bars.
+"""
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from test_playback_session import make_dataset
+
+import app.services.resample as resample
+from app.main import app
+from app.services.bar_series import BarSeries
+from app.services.playback_service import PlaybackSession, playback_service
+from app.services.resample import ResampleError, parse_rule, resample_bars
+from app.utils.stock_fetcher import stock_data_cache
+
+client = TestClient(app)
+
+
+def make_frame(dates) -> pd.DataFrame:
+    """Daily frame whose close counts up from 1."""
+    index = pd.DatetimeIndex(dates, tz="Asia/Taipei", name="Date")
+    close = np.arange(1.0, len(index) + 1)
+    return pd.DataFrame(
+        {"Open": close, "High": close + 0.5, "Low": close - 0.5, "Close": close, "Volume": 100},
+        index=index,
+    )
+
+
+def test_parse_rule():
+    """Rules are normalized; unknown ones are rejected."""
+    assert parse_rule("w") == "W"
+    assert parse_rule("5d") == "5D"
+    assert parse_rule("1D") == "D"
+    for rule in ("H", "0D", "2W"):
+        with pytest.raises(ResampleError):
+            parse_rule(rule)
+
+
+def test_weeks_follow_the_trading_calendar():
+    """A week starting with a holiday is labelled by its first trading day."""
+    # Mon 2024-02-05 to Fri 2024-02-09, then Tue-Fri after a Monday holiday
+    dates = pd.bdate_range("2024-02-05", "2024-02-16").drop(pd.Timestamp("2024-02-12"))
+    bars = BarSeries.from_dataframe(make_frame(dates))
+
+    weekly = resample_bars(bars, "W")
+    assert weekly.bars.dates() == ["2024-02-05", "2024-02-13"]
+    assert weekly.bars.open.tolist() == [1.0, 6.0]
+    assert weekly.bars.close.tolist() == [5.0, 9.0]
+    assert weekly.bars.high.tolist() == [5.5, 9.5] and weekly.bars.low.tolist() == [0.5, 5.5]
+    assert weekly.bars.volume.tolist() == [500, 400]
+
+    assert resample_bars(bars, "4D").bars.close.tolist() == [4.0, 8.0, 9.0]
+    assert len(resample_bars(bars, "M").bars) == 1
+
+
+def test_window_timeframe_never_includes_future_bars():
+    """The candle holding the cursor is aggregated from revealed bars only."""
+    session = PlaybackSession("resample-pb", "2330.TW", make_dataset())
+    playback_service.add_session(session)
+    try:
+        session.seek(7)  # Revealed: Mon 2024-01-01 .. Tue 2024-01-09
+        body = client.get("/api/playback/resample-pb/window?timeframe=w").json()
+
+        assert body["timeframe"] == "W" and body["to_index"] == 8
+        assert [c["timestamp"][:10] for c in body["candles"]] == ["2024-01-01", "2024-01-08"]
+        assert body["candles"][-1]["close"] == pytest.approx(session.bars.close[7])
+        assert body["candles"][-1]["volume"] == int(session.bars.volume[5:8].sum())
+
+        bad = client.get("/api/playback/resample-pb/window?timeframe=H")
+        assert bad.status_code == 400
+    finally:
+        playback_service.delete_session("resample-pb")
+
+
+def test_historical_timeframe_reuses_daily_bars(monkeypatch):
+    """Switching timeframe aggregates the daily bars locally and caches the result."""
+    calls = []
+
+    def fake_daily(symbol, period):
+        calls.append(period)
+        return make_frame(pd.bdate_range("2024-01-01", periods=45))
+
+    monkeypatch.setattr(resample, "fetch_stock_data_by_period", fake_daily)
+    stock_data_cache.clear()
+    try:
+        for _ in range(2):
+            body = client.get("/api/data/historical/2330.TW?period=3mo&timeframe=M").json()
+            assert [c["timestamp"][:10] for c in body["data"]] == [
+                "2024-01-01",
+                "2024-02-01",
+                "2024-03-01",
+            ]
+        assert calls == ["3mo"]
+    finally:
+        stock_data_cache.clear()
@@ -0,0 +1,51 @@
+"""
+Test prefix statistics and sparse-table window queries.
+"""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from test_playback_session import make_dataset
+
+from app.services.playback_service import PlaybackSession
+from app.services.running_stats import SparseTable
+
+
+def test_sparse_table_matches_brute_force():
+    """Every window of a random array agrees with a direct min/max."""
+    values = np.random.default_rng(7).normal(size=37)
+    lows, highs = SparseTable(values, np.minimum), SparseTable(values, np.maximum)
+
+    for start in range(len(values)):
+        for stop in range(start + 1, len(values) + 1):
+            assert lows.query(start, stop) == values[start:stop].min()
+            assert highs.query(start, stop) == values[start:stop].max()
+
+    with pytest.raises(ValueError):
+        lows.query(3, 3)
+
+
+def test_session_stats_ignore_future_bars():
+    """Stats at the cursor only cover revealed bars and match a direct computation."""
+    dataset = make_dataset(30)
+    session = PlaybackSession("stats", "2330.TW", dataset)
+    bars = dataset.bars
+
+    session.seek(12)
+    stats = session.get_stats()
+    assert stats["max_price"] == bars.high[:13].max() < session.get_price_range()["max_price"]
+    assert stats["min_price"] == bars.low[:13].min()
+    assert stats["cum_volume"] == bars.volume[:13].sum()
+    assert stats["cum_return"] == pytest.approx(bars.close[12] / bars.close[0] - 1)
+
+    assert session.get_window_price_range(5, 100) == {
+        "min_price": bars.low[5:13].min(),
+        "max_price": bars.high[5:13].max(),
+    }
+    assert session.get_window_price_range(20, 25) is None
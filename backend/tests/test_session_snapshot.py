@@ -0,0 +1,59 @@
+"""
+Test session store snapshots across process restarts.
+"""
+
+import os
+import sys
+import time
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from test_playback_session import make_bars, make_dataset
+
+from app.services.playback_service import PlaybackService, PlaybackSession
+from app.utils.session_snapshot import load_snapshot, save_snapshot
+from app.utils.session_store import MemorySessionStore
+
+
+def test_restart_restores_cursor_lazily(tmp_path):
+    """A new process gets the cursor back and only loads bars on first access."""
+    path = str(tmp_path / "snapshot.json.gz")
+    before = PlaybackService(ttl_seconds=60, max_bytes=10_000_000, store=MemorySessionStore())
+    session = PlaybackSession("warm", "2330.TW", make_dataset())
+    before.add_session(session)
+    session.next(7)
+    before.save_session(session)
+    before.store.set("playback:stale", {"index": 1}, 0.001)
+    time.sleep(0.01)
+
+    assert save_snapshot(before.store, path) == 1
+
+    loads = []
+    after = PlaybackService(ttl_seconds=60, max_bytes=10_000_000, store=MemorySessionStore())
+    after.load_bars = lambda *args: loads.append(args) or make_bars()
+    assert load_snapshot(after.store, path) == 1
+    assert loads == []
+
+    restored = after.get_session("warm")
+    assert restored.current_index == 7
+    assert loads == [("2330.TW", "2024-01-01", "2024-02-09", None)]
+    assert after.get_session("stale") is None
+
+
+def test_snapshot_never_overwrites_newer_state(tmp_path):
+    """Existing keys win over the snapshot and unreadable files are ignored."""
+    path = str(tmp_path / "snapshot.json.gz")
+    store = MemorySessionStore()
+    store.set("account:a", {"cash": 1.0}, 60)
+    save_snapshot(store, path)
+
+    target = MemorySessionStore()
+    target.set("account:a", {"cash": 2.0}, 60)
+    assert load_snapshot(target, path) == 0
+    assert target.get("account:a") == {"cash": 2.0}
+
+    with open(path, "wb") as f:
+        f.write(b"not gzip")
+    assert load_snapshot(MemorySessionStore(), path) == 0
+    assert load_snapshot(MemorySessionStore(), str(tmp_path / "missing.gz")) == 0
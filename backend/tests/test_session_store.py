@@ -0,0 +1,238 @@
+"""
+Test the shared session store backends and cross-worker playback state.
+"""
+
+import os
+import socketserver
+import sys
+import threading
+import time
+
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from test_playback_session import make_bars, make_dataset
+
+from app.services.playback_service import PlaybackService, PlaybackSession
+from app.services.trading_service import TradingAccount
+from app.utils.session_store import (
+    MemorySessionStore,
+    RedisSessionStore,
+    SQLiteSessionStore,
+)
+
+
+class _RespHandler(socketserver.StreamRequestHandler):
+    """Parse RESP command arrays and answer from the server's dict."""
+
+    def handle(self):
+        self.watched = {}
+        self.queued = None
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            args = []
+            for _ in range(int(line[1:])):
+                length = int(self.rfile.readline()[1:])
+                args.append(self.rfile.read(length + 2)[:-2])
+            self.wfile.write(self.server.dispatch(self, args))
+
+
+def _bulk(value):
+    return b"$-1\r\n" if value is None else b"$%d\r\n%s\r\n" % (len(value), value)
+
+
+class FakeRedisServer(socketserver.ThreadingTCPServer):
+    """Local stand-in speaking the subset of Redis the store uses."""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _RespHandler)
+        self.data = {}
+        self.versions = {}  # Bumped on every write, checked by EXEC for WATCHed keys
+        self.zsets = {}
+        self.lock = threading.Lock()
+
+    def dispatch(self, conn, args):
+        command = args[0].upper()
+        with self.lock:
+            if command == b"MULTI":
+                conn.queued = []
+                return b"+OK\r\n"
+            if command == b"EXEC":
+                queued, conn.queued = conn.queued, None
+                watched, conn.watched = conn.watched, {}
+                if any(self.versions.get(key, 0) != v for key, v in watched.items()):
+                    return b"*-1\r\n"
+                replies = [self._apply(queued_args) for queued_args in queued]
+                return b"*%d\r\n%s" % (len(replies), b"".join(replies))
+            if conn.queued is not None:
+                conn.queued.append(args)
+                return b"+QUEUED\r\n"
+            if command == b"WATCH":
+                conn.watched[args[1]] = self.versions.get(args[1], 0)
+                return b"+OK\r\n"
+            if command == b"UNWATCH":
+                conn.watched = {}
+                return b"+OK\r\n"
+            return self._apply(args)
+
+    def _apply(self, args):
+        command, key = args[0].upper(), args[1] if len(args) > 1 else None
+        now = time.time()
+        if key in self.data and self.data[key][1] <= now:
+            del self.data[key]
+
+        if command in (b"PING", b"SELECT", b"AUTH"):
+            return b"+OK\r\n"
+        if command == b"GET":
+            return _bulk(self.data[key][0] if key in self.data else None)
+        if command == b"EXISTS":
+            return b":%d\r\n" % (key in self.data)
+        if command in (b"SET", b"DEL", b"PEXPIRE"):
+            self.versions[key] = self.versions.get(key, 0) + 1
+        if command == b"SET":
+            self.data[key] = (args[2], now + int(args[4]) / 1000)
+            return b"+OK\r\n"
+        if command == b"DEL":
+            return b":%d\r\n" % (self.data.pop(key, None) is not None)
+        if command == b"PEXPIRE":
+            if key not in self.data:
+                return b":0\r\n"
+            self.data[key] = (self.data[key][0], now + int(args[2]) / 1000)
+            return b":1\r\n"
+        if command == b"ZADD":
+            self.zsets.setdefault(key, {})[args[3]] = float(args[2])
+            return b":1\r\n"
+        if command == b"ZREM":
+            return b":%d\r\n" % (self.zsets.get(key, {}).pop(args[2], None) is not None)
+        if command == b"ZRANGEBYSCORE":
+            members = [m for m, score in self.zsets.get(key, {}).items() if score <= float(args[3])]
+            return b"*%d\r\n%s" % (len(members), b"".join(_bulk(m) for m in members))
+        return b"-ERR unknown command\r\n"
+
+
+@pytest.fixture(params=["memory", "sqlite", "redis"])
+def store(request, tmp_path):
+    """Each backend behind the same interface."""
+    if request.param == "memory":
+        yield MemorySessionStore()
+    elif request.param == "sqlite":
+        store = SQLiteSessionStore(f"sqlite:///{tmp_path}/sessions.db")
+        yield store
+        store.close()
+    else:
+        server = FakeRedisServer()
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        store = RedisSessionStore(f"redis://127.0.0.1:{server.server_address[1]}/1")
+        yield store
+        store.close()
+        server.shutdown()
+        server.server_close()
+
+
+def test_store_contract(store):
+    """All backends round-trip records, expire them and report deletions."""
+    store.set("playback:a", {"index": 3, "dataset": ["2330.TW", None]}, 60)
+    assert store.get("playback:a") == {"index": 3, "dataset": ["2330.TW", None]}
+    assert store.touch("playback:a", 60)
+    assert not store.touch("playback:missing", 60)
+
+    store.set("playback:b", {"index": 0}, 0.01)
+    time.sleep(0.05)
+    assert store.get("playback:b") is None
+    assert store.purge_expired() == ["playback:b"]
+    assert store.purge_expired() == []
+
+    assert store.delete("playback:a")
+    assert not store.delete("playback:a")
+    assert store.get("playback:a") is None
+
+
+def test_concurrent_updates_are_not_lost(store):
+    """Read-modify-write from several threads keeps every increment."""
+    store.set("account:a", {"cash": 0}, 60)
+
+    def deposit():
+        for _ in range(10):
+            store.update("account:a", lambda record: {"cash": record["cash"] + 1}, 60)
+
+    threads = [threading.Thread(target=deposit) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert store.get("account:a")["cash"] == 40
+
+    stale = store.get("account:a")
+    store.update("account:a", lambda record: {**record, "cash": 0}, 60)
+    assert not store.compare_and_set("account:a", {"cash": -1}, 60, stale)
+    assert not store.compare_and_set("account:a", {"cash": -1}, 60, None)
+    assert store.compare_and_set("account:new", {"cash": 5}, 60, None)
+
+
+def test_cursor_moves_between_workers(tmp_path):
+    """Two services on one store serve the same playback_id without affinity."""
+    store = SQLiteSessionStore(f"sqlite:///{tmp_path}/sessions.db")
+    worker_a = PlaybackService(ttl_seconds=60, max_bytes=10_000_000, store=store)
+    worker_b = PlaybackService(ttl_seconds=60, max_bytes=10_000_000, store=store)
+    worker_b.load_bars = lambda *args: make_bars()
+
+    session = PlaybackSession("shared", "2330.TW", make_dataset())
+    worker_a.add_session(session)
+    session.next(5)
+    worker_a.save_session(session)
+
+    restored = worker_b.get_session("shared")
+    assert restored is not session
+    assert restored.current_index == 5
+    restored.next(3)
+    worker_b.save_session(restored)
+
+    assert worker_a.get_session("shared").current_index == 8
+
+    worker_b.delete_session("shared")
+    assert worker_a.get_session("shared") is None
+    store.close()
+
+
+def test_read_does_not_overwrite_concurrent_cursor_move(tmp_path):
+    """A read that races another worker's save leaves the newer cursor in the store."""
+    store = SQLiteSessionStore(f"sqlite:///{tmp_path}/sessions.db")
+    worker_a = PlaybackService(ttl_seconds=60, max_bytes=10_000_000, store=store)
+    worker_b = PlaybackService(ttl_seconds=60, max_bytes=10_000_000, store=store)
+    worker_b.load_bars = lambda *args: make_bars()
+
+    session = PlaybackSession("shared", "2330.TW", make_dataset())
+    worker_a.add_session(session)
+    remote = worker_b.get_session("shared")
+
+    def advance_elsewhere():
+        # Worker B moves the cursor after worker A has loaded the record
+        remote.next(4)
+        worker_b.save_session(remote)
+
+    session.ensure_ready = advance_elsewhere
+    worker_a.get_session("shared")
+
+    assert store.get("playback:shared")["index"] == 4
+    assert worker_a.get_session("shared").current_index == 4
+    store.close()
+
+
+def test_account_state_round_trip():
+    """Accounts serialize compactly and rebuild with trades and position intact."""
+    account = TradingAccount("acc", "pb", "2330.TW", 1000.0)
+    account.buy(100.0)
+    account.buy(110.0)
+    account.sell(120.0)
+
+    restored = TradingAccount.from_state("acc", account.to_state())
+
+    assert restored.get_status(125.0) == account.get_status(125.0)
+    assert restored.get_history() == account.get_history()
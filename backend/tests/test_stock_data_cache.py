@@ -0,0 +1,118 @@
+"""
+Test the in-process DataFrame cache used by the stock fetcher.
+"""
+
+import os
+import sys
+import threading
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.utils import stock_fetcher
+from app.utils.stock_fetcher import DataFrameCache, fetch_stock_data
+
+
+def make_frame(rows: int) -> pd.DataFrame:
+    """Build a small OHLCV-like frame."""
+    return pd.DataFrame(
+        {"Close": np.arange(rows, dtype=float)},
+        index=pd.date_range("2024-01-01", periods=rows),
+    )
+
+
+def test_concurrent_misses_share_one_fetch():
+    """N concurrent callers for the same key trigger a single load."""
+    cache = DataFrameCache(max_bytes=10_000_000, ttl_seconds=60)
+    key = ("2330.TW", None, None, "3mo", "1d")
+    load_count = 0
+    release = threading.Event()
+
+    def slow_load():
+        nonlocal load_count
+        load_count += 1
+        release.wait(timeout=5)
+        return make_frame(10)
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(cache.get_or_fetch(key, slow_load)))
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.1)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    stats = cache.stats()
+    assert load_count == 1
+    assert len(results) == 8 and all(len(df) == 10 for df in results)
+    assert stats["misses"] == 1
+    assert stats["coalesced"] == 7
+
+    cache.get_or_fetch(key, slow_load)
+    assert cache.stats()["hits"] == 1
+
+
+def test_byte_budget_evicts_least_recently_used():
+    """Entries are evicted once the byte budget is exceeded."""
+    frame_bytes = int(make_frame(100).memory_usage(index=True, deep=True).sum())
+    cache = DataFrameCache(max_bytes=frame_bytes * 2, ttl_seconds=60)
+
+    for symbol in ["A", "B", "C"]:
+        cache.get_or_fetch((symbol, None, None, "1y", "1d"), lambda: make_frame(100))
+
+    stats = cache.stats()
+    assert stats["entries"] == 2
+    assert stats["evictions"] == 1
+    assert stats["current_bytes"] <= stats["max_bytes"]
+
+
+def test_expired_entries_are_refetched():
+    """Entries older than the TTL count as misses."""
+    cache = DataFrameCache(max_bytes=10_000_000, ttl_seconds=0)
+    key = ("2330.TW", "2024-01-01", "2024-01-31", None, "1d")
+
+    cache.get_or_fetch(key, lambda: make_frame(5))
+    cache.get_or_fetch(key, lambda: make_frame(5))
+
+    assert cache.stats()["misses"] == 2
+
+
+def test_only_the_current_bar_is_refetched(monkeypatch):
+    """Closed days stay cached while today's partial bar expires on its own."""
+    calls = []
+    last_price = [100.0]
+
+    def fake_load(symbol, start, end):
+        calls.append((start.strftime("%Y-%m-%d"), end.strftime("%Y-%m-%d")))
+        index = pd.bdate_range(start, end, tz="Asia/Taipei", name="Date")
+        close = np.arange(len(index), dtype=float)
+        close[index.tz_localize(None) == pd.Timestamp("2024-03-06")] = last_price[0]
+        return pd.DataFrame({"Close": close}, index=index)
+
+    monkeypatch.setattr(stock_fetcher, "_load_daily", fake_load)
+    monkeypatch.setattr(stock_fetcher, "exchange_today", lambda tz: datetime(2024, 3, 6))
+    monkeypatch.setattr(stock_fetcher.settings, "bar_store_enabled", False)
+    monkeypatch.setattr(stock_fetcher, "stock_data_cache", DataFrameCache(10_000_000, 60))
+    monkeypatch.setattr(stock_fetcher, "current_bar_cache", DataFrameCache(10_000_000, 60))
+
+    first = fetch_stock_data("2330.TW", "2024-03-01", "2024-03-06")
+    second = fetch_stock_data("2330.TW", "2024-03-01", "2024-03-06")
+    assert calls == [("2024-03-01", "2024-03-06")]  # Today's bar came with the range
+    assert len(first) == len(second) == 4 and first["Close"].iloc[-1] == 100.0
+
+    # The hot tier expires: only today's bar goes upstream again
+    last_price[0] = 101.5
+    stock_fetcher.current_bar_cache.clear()
+    third = fetch_stock_data("2330.TW", "2024-03-01", "2024-03-06")
+    assert calls[1:] == [("2024-03-06", "2024-03-06")]
+    assert third["Close"].tolist()[:3] == first["Close"].tolist()[:3]
+    assert third["Close"].iloc[-1] == 101.5
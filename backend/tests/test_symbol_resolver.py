@@ -0,0 +1,127 @@
+"""
+Test the persistent ticker resolver and its negative cache.
+
+Upstream fetches are replaced with a fake that records calls, so this test
+runs offline.
+"""
+
+import os
+import sys
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.helpers.yfinance import EmptyDataError
+from app.utils.symbol_resolver import SymbolResolver
+
+
+@pytest.fixture
+def session_factory():
+    """In-memory SQLite database shared across threads."""
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    return sessionmaker(bind=engine)
+
+
+RECENT = (datetime(2024, 2, 6), datetime(2024, 3, 6))
+HISTORY = (datetime(2015, 1, 1), datetime(2015, 12, 31))
+
+
+def recording_loader(listed=(), outage=None):
+    """Loader returning bars for listed symbols and recording every upstream call."""
+    calls = []
+    lock = threading.Lock()
+
+    def load(symbol):
+        with lock:
+            calls.append(symbol)
+        if outage is not None and outage[0]:
+            raise ConnectionError("upstream down")
+        if symbol not in listed:
+            raise EmptyDataError(f"No data available for {symbol}")
+        return f"bars of {symbol}"
+
+    return load, calls
+
+
+def test_correct_symbols_cost_a_single_fetch(session_factory):
+    """Tickers with data under the requested symbol never pay for a probe."""
+    load, calls = recording_loader(listed={"AAPL", "2330.TW", "6488.TWO"})
+    resolver = SymbolResolver(session_factory=session_factory)
+
+    assert resolver.fetch("AAPL", load, RECENT) == "bars of AAPL"
+    assert resolver.fetch("2330.TW", load, RECENT) == "bars of 2330.TW"
+    assert resolver.fetch("6488.TWO", load, RECENT) == "bars of 6488.TWO"
+    assert calls == ["AAPL", "2330.TW", "6488.TWO"]
+    assert resolver.stats()["fallbacks"] == 0
+
+
+def test_mis_suffixed_code_falls_back_once_and_is_remembered(session_factory):
+    """An OTC code requested as .TW resolves to .TWO; the answer survives a restart."""
+    load, calls = recording_loader(listed={"6488.TWO"})
+    resolver = SymbolResolver(session_factory=session_factory)
+
+    assert resolver.fetch("6488.tw", load, RECENT) == "bars of 6488.TWO"
+    assert calls == ["6488.TW", "6488.TWO"]
+
+    assert resolver.fetch("6488.TW", load, RECENT) == "bars of 6488.TWO"
+    assert resolver.fetch("6488", load, HISTORY) == "bars of 6488.TWO"
+
+    restarted = SymbolResolver(session_factory=session_factory)
+    assert restarted.fetch("6488.TW", load, RECENT) == "bars of 6488.TWO"
+    assert calls == ["6488.TW", "6488.TWO", "6488.TWO", "6488.TWO", "6488.TWO"]
+    assert restarted.stats()["known"] == 1
+
+
+def test_dead_range_is_rejected_locally_per_ttl(session_factory):
+    """An empty range is rejected locally until the TTL runs out; other ranges still load."""
+    now = [datetime(2024, 3, 6, 9, 0)]
+    outage = [True]
+    load, calls = recording_loader(outage=outage)
+    resolver = SymbolResolver(
+        session_factory=session_factory,
+        negative_ttl_seconds=24 * 60 * 60,
+        clock=lambda: now[0],
+    )
+
+    # A failed fetch proves nothing and is not recorded
+    with pytest.raises(ConnectionError):
+        resolver.fetch("NOSUCH", load, RECENT)
+    outage[0] = False
+
+    for _ in range(3):
+        with pytest.raises(EmptyDataError):
+            resolver.fetch("NOSUCH", load, RECENT)
+    assert calls == ["NOSUCH", "NOSUCH"]
+    assert resolver.stats() == {"known": 0, "dead": 1, "fallbacks": 0, "negative_hits": 2}
+
+    now[0] += timedelta(hours=23)
+    with pytest.raises(EmptyDataError):
+        resolver.fetch("NOSUCH", load, (RECENT[0] + timedelta(days=7), RECENT[1]))
+    assert len(calls) == 2
+
+    now[0] += timedelta(hours=1)
+    with pytest.raises(EmptyDataError):
+        resolver.fetch("NOSUCH", load, RECENT)
+    assert len(calls) == 3
+
+
+def test_delisted_ticker_still_replays_its_history(session_factory):
+    """A ticker with no recent bars is only dead for the range that came back empty."""
+    resolver = SymbolResolver(session_factory=session_factory)
+    recent, calls = recording_loader()
+    with pytest.raises(EmptyDataError):
+        resolver.fetch("1234.TW", recent, RECENT)
+    assert calls == ["1234.TW", "1234.TWO"]
+
+    history, _ = recording_loader(listed={"1234.TW"})
+    assert resolver.fetch("1234.TW", history, HISTORY) == "bars of 1234.TW"
+    assert resolver.stats()["known"] == 1
@@ -0,0 +1,83 @@
+"""
+Test the column-oriented wire formats of /api/data/historical.
+"""
+
+import json
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.utils.wire_formats import (
+    ARROW,
+    COLUMNAR,
+    JSON,
+    MSGPACK,
+    WireFormatUnavailableError,
+    encode_frame,
+    negotiate_format,
+    to_records,
+)
+
+
+def make_frame(rows: int = 5) -> pd.DataFrame:
+    """Build a tz-aware daily OHLCV frame like yfinance returns."""
+    index = pd.bdate_range("2024-01-01", periods=rows, tz="Asia/Taipei", name="Date")
+    close = np.linspace(100.0, 110.0, rows)
+    return pd.DataFrame(
+        {
+            "Open": close - 1,
+            "High": close + 2,
+            "Low": close - 2,
+            "Close": close,
+            "Volume": np.arange(rows) * 1000,
+        },
+        index=index,
+    )
+
+
+def test_negotiate_format():
+    """The format parameter wins over Accept; unknown formats are rejected."""
+    assert negotiate_format(None) == JSON
+    assert negotiate_format("Columnar", "application/msgpack") == COLUMNAR
+    assert negotiate_format(None, "text/html, application/msgpack;q=0.9") == MSGPACK
+
+    with pytest.raises(WireFormatUnavailableError):
+        negotiate_format("csv")
+
+
+def test_columnar_matches_records():
+    """Columnar JSON carries the same values as the row format, keys sent once."""
+    df = make_frame()
+    df.iloc[2, df.columns.get_loc("Close")] = np.nan
+
+    body, media_type = encode_frame(df, "2330.TW", COLUMNAR)
+    payload = json.loads(body)
+    records = to_records(df)
+
+    assert media_type == "application/json"
+    assert payload["timezone"] == "Asia/Taipei"
+    assert payload["data"]["timestamp"][0] == int(df.index[0].timestamp() * 1000)
+    assert payload["data"]["close"][2] is None
+    assert payload["data"]["open"] == [record["open"] for record in records]
+    assert len(body) < len(json.dumps(records, default=str))
+
+
+def test_binary_formats_round_trip():
+    """msgpack and Arrow decode back to the original columns."""
+    msgpack = pytest.importorskip("msgpack")
+    pa = pytest.importorskip("pyarrow")
+    df = make_frame()
+
+    payload = msgpack.unpackb(encode_frame(df, "2330.TW", MSGPACK)[0])
+    assert payload["data"]["volume"] == df["Volume"].tolist()
+
+    table = pa.ipc.open_stream(encode_frame(df, "2330.TW", ARROW)[0]).read_all()
+    assert table.column_names == ["timestamp", "open", "high", "low", "close", "volume"]
+    assert table.column("close").to_pylist() == df["Close"].tolist()
+    assert table.schema.metadata[b"symbol"] == b"2330.TW"
@@ -8,11 +8,18 @@ Phase 2: Stock Data API（一次回傳所有 K 線）
 import logging
 from typing import Optional
 
-from fastapi import FastAPI, HTTPException, Query
+from fastapi import FastAPI, Header, HTTPException, Query, Response
 from fastapi.middleware.cors import CORSMiddleware
 
 from lib.config import settings
-from lib.stock_fetcher import fetch_stock_data
+from lib.stock_fetcher import fetch_stock_frame
+from lib.wire_formats import (
+    JSON,
+    WireFormatUnavailableError,
+    encode_frame,
+    negotiate_format,
+    to_records,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -69,6 +76,10 @@ async def get_stock_data(
     period: Optional[str] = Query("1mo", description="Period: 1mo, 3mo, 6mo, 1y"),
     start_date: Optional[str] = Query(None, description="Start date YYYY-MM-DD"),
     end_date: Optional[str] = Query(None, description="End date YYYY-MM-DD"),
+    format: Optional[str] = Query(
+        None, description="Wire format: json (default), columnar, msgpack, arrow"
+    ),
+    accept: Optional[str] = Header(None),
 ) -> dict:
     """
     一次回傳指定股票的所有 K 線數據。
@@ -78,38 +89,55 @@ async def get_stock_data(
     - serverless: GET /api/stock/{symbol}（一次全部回傳）
 
     前端拿到所有數據後，自己管理 playback index。
+    format=columnar / msgpack / arrow（或 Accept header）回傳欄位導向格式，體積更小。
     """
     try:
-        candles = fetch_stock_data(
+        wire_format = negotiate_format(format, accept)
+    except WireFormatUnavailableError as e:
+        raise HTTPException(status_code=406, detail=str(e))
+
+    try:
+        data = fetch_stock_frame(
             symbol=symbol,
             period=period,
             start_date=start_date,
             end_date=end_date,
         )
 
-        if not candles:
+        if data.empty:
             raise HTTPException(
                 status_code=404,
                 detail=f"No data found for {symbol}",
             )
 
         # Calculate price range (same as backend)
-        all_highs = [c["high"] for c in candles]
-        all_lows = [c["low"] for c in candles]
+        price_range = {
+            "min_price": float(data["Low"].min()),
+            "max_price": float(data["High"].max()),
+        }
+
+        if wire_format != JSON:
+            body, media_type = encode_frame(
+                data, symbol.upper(), wire_format, extra={"price_range": price_range}
+            )
+            return Response(content=body, media_type=media_type)
+
+        candles = to_records(data)
+        for candle in candles:
+            candle["timestamp"] = candle["timestamp"].isoformat()
 
         return {
             "symbol": symbol.upper(),
             "data": candles,
             "total_count": len(candles),
-            "price_range": {
-                "min_price": min(all_lows),
-                "max_price": max(all_highs),
-            },
+            "price_range": price_range,
             "all_dates": [c["timestamp"][:10] for c in candles],
         }
 
     except HTTPException:
         raise
+    except WireFormatUnavailableError as e:
+        raise HTTPException(status_code=406, detail=str(e))
     except Exception as e:
         logger.error(f"Error fetching stock data for {symbol}: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -30,6 +30,10 @@ class Settings(BaseSettings):
     tavily_api_key: str = ""
     rapidapi_key: str = ""
 
+    # Taiwan code -> .TW/.TWO resolution table (only /tmp is writable on Vercel)
+    symbol_resolution_path: str = "/tmp/symbol_resolutions.json"
+    symbol_negative_ttl_seconds: float = 24 * 60 * 60  # Dead codes are not re-probed
+
     model_config = SettingsConfigDict(
         env_file=".env",
         env_file_encoding="utf-8",
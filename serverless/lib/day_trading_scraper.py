@@ -10,27 +10,21 @@ import logging
 from typing import List, Dict, Any, Optional
 
 import requests
-import yfinance as yf
 from bs4 import BeautifulSoup
 
+from lib.symbol_resolution import resolve_tw_code
+
 logger = logging.getLogger(__name__)
 
 
 def _detect_symbol(code: str) -> Optional[str]:
     """
     Auto-detect the correct yfinance symbol for a Taiwan stock code.
-    Tries .TW (上市) first, then .TWO (上櫃).
+    Probes .TW (上市) and .TWO (上櫃) in parallel on first sight and remembers
+    the answer, including codes without data, in the resolution table.
     Returns the symbol string if data exists, None otherwise.
     """
-    for suffix in [".TW", ".TWO"]:
-        symbol = f"{code}{suffix}"
-        try:
-            df = yf.Ticker(symbol).history(period="1d")
-            if not df.empty:
-                return symbol
-        except Exception:
-            continue
-    return None
+    return resolve_tw_code(code)
 
 
 def get_top3_day_trading_losers() -> List[Dict[str, Any]]:
@@ -9,20 +9,24 @@ from typing import List, Optional
 import pandas as pd
 import yfinance as yf
 
+from lib.wire_formats import to_records
+
 log = logging.getLogger(__name__)
 
+PRICE_COLUMNS = ["Open", "High", "Low", "Close"]
 
-def fetch_stock_data(
+
+def fetch_stock_frame(
     symbol: str,
     period: Optional[str] = None,
     start_date: Optional[str] = None,
     end_date: Optional[str] = None,
-) -> List[dict]:
+) -> pd.DataFrame:
     """
-    Fetch stock OHLCV data and return ALL candles at once.
+    Fetch stock OHLCV data as a cleaned DataFrame.
 
-    Unlike the backend (which stores in memory and returns one-by-one),
-    this returns everything in a single response — perfect for serverless.
+    Rows with null OHLC values are dropped, prices are rounded to 2 decimals
+    and the index is made timezone-naive.
 
     Args:
         symbol: Ticker symbol (e.g., 'AAPL', '2330.TW', 'BTC-USD')
@@ -31,7 +35,7 @@ def fetch_stock_data(
         end_date: End date in YYYY-MM-DD format
 
     Returns:
-        List of candle dictionaries with timestamp, open, high, low, close, volume
+        DataFrame with Open/High/Low/Close/Volume columns, empty if no data
     """
     symbol = symbol.strip().upper()
     ticker = yf.Ticker(symbol)
@@ -39,9 +43,9 @@ def fetch_stock_data(
     try:
         if start_date and end_date:
             # Add one day to end_date to make the range inclusive
-            end_date_inclusive = (
-                pd.to_datetime(end_date) + pd.DateOffset(days=1)
-            ).strftime("%Y-%m-%d")
+            end_date_inclusive = (pd.to_datetime(end_date) + pd.DateOffset(days=1)).strftime(
+                "%Y-%m-%d"
+            )
             data = ticker.history(start=start_date, end=end_date_inclusive)
         elif period:
             data = ticker.history(period=period)
@@ -49,30 +53,48 @@ def fetch_stock_data(
             data = ticker.history(period="3mo")
 
         if data is None or data.empty:
-            return []
+            return pd.DataFrame()
 
         # Remove timezone info to avoid serialization issues
         if data.index.tz is not None:
             data.index = data.index.tz_localize(None)
 
-        # Convert DataFrame to list of dicts, skipping rows with null/NaN OHLC values
-        import math
-        candles = []
-        for timestamp, row in data.iterrows():
-            o, h, l, c = row["Open"], row["High"], row["Low"], row["Close"]
-            if any(v is None or (isinstance(v, float) and math.isnan(v)) for v in (o, h, l, c)):
-                continue
-            candles.append({
-                "timestamp": timestamp.isoformat(),
-                "open": round(float(o), 2),
-                "high": round(float(h), 2),
-                "low": round(float(l), 2),
-                "close": round(float(c), 2),
-                "volume": int(row["Volume"]),
-            })
-
-        return candles
+        data = data.dropna(subset=PRICE_COLUMNS)
+        data[PRICE_COLUMNS] = data[PRICE_COLUMNS].round(2)
+        data["Volume"] = data["Volume"].fillna(0).astype("int64")
+        return data[PRICE_COLUMNS + ["Volume"]]
 
     except Exception as e:
         log.error(f"Error fetching data for {symbol}: {e}")
         raise
+
+
+def fetch_stock_data(
+    symbol: str,
+    period: Optional[str] = None,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+) -> List[dict]:
+    """
+    Fetch stock OHLCV data and return ALL candles at once.
+
+    Unlike the backend (which stores in memory and returns one-by-one),
+    this returns everything in a single response — perfect for serverless.
+
+    Args:
+        symbol: Ticker symbol (e.g., 'AAPL', '2330.TW', 'BTC-USD')
+        period: Period string (e.g., '1mo', '3mo', '6mo', '1y')
+        start_date: Start date in YYYY-MM-DD format
+        end_date: End date in YYYY-MM-DD format
+
+    Returns:
+        List of candle dictionaries with timestamp, open, high, low, close, volume
+    """
+    data = fetch_stock_frame(symbol, period, start_date, end_date)
+    if data.empty:
+        return []
+
+    candles = to_records(data)
+    for candle in candles:
+        candle["timestamp"] = candle["timestamp"].isoformat()
+    return candles
@@ -0,0 +1,110 @@
+"""
+Taiwan stock code to yfinance symbol resolution with a persistent table.
+
+A code is listed either on TWSE (.TW, 上市) or TPEx (.TWO, 上櫃). The first
+time a code is seen both suffixes are probed in parallel; the working symbol
+is recorded in a JSON table and reused on later invocations. Codes with no
+data are recorded as dead and skipped until the negative TTL runs out, so a
+bad code costs at most one upstream round trip per TTL.
+
+The table lives on the function's writable /tmp by default and survives for
+as long as the instance stays warm.
+"""
+
+import json
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+import yfinance as yf
+
+from lib.config import settings
+
+logger = logging.getLogger(__name__)
+
+SUFFIXES = (".TW", ".TWO")
+
+_table: Optional[Dict[str, Dict[str, Optional[str]]]] = None
+_lock = threading.Lock()
+_pool = ThreadPoolExecutor(max_workers=len(SUFFIXES), thread_name_prefix="symbol-probe")
+
+
+def _probe(symbol: str) -> bool:
+    """Check whether yfinance has recent bars for a symbol."""
+    try:
+        return not yf.Ticker(symbol).history(period="1mo").empty
+    except Exception as e:
+        logger.warning(f"Probe of {symbol} failed: {e}")
+        raise
+
+
+def _load_table() -> Dict[str, Dict[str, Optional[str]]]:
+    """Load the resolution table once per instance. Lock held."""
+    global _table
+    if _table is None:
+        try:
+            with open(settings.symbol_resolution_path, "r", encoding="utf-8") as f:
+                _table = json.load(f)
+        except (OSError, ValueError):
+            _table = {}
+    return _table
+
+
+def _save_table(table: Dict[str, Dict[str, Optional[str]]]) -> None:
+    """Write the resolution table atomically. Lock held."""
+    path = settings.symbol_resolution_path
+    try:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+            json.dump(table, f)
+        os.replace(f"{path}.tmp", path)
+    except OSError as e:
+        logger.warning(f"Could not persist symbol resolutions to {path}: {e}")
+
+
+def resolve_tw_code(code: str) -> Optional[str]:
+    """
+    Resolve a Taiwan stock code to its yfinance symbol.
+
+    Args:
+        code: Stock code without suffix (e.g., '2330', '6488')
+
+    Returns:
+        '<code>.TW' or '<code>.TWO', or None if the code has no data
+    """
+    code = code.strip().upper()
+    now = datetime.now()
+
+    with _lock:
+        entry = _load_table().get(code)
+    if entry is not None:
+        if entry["symbol"] is not None:
+            return entry["symbol"]
+        checked_at = datetime.fromisoformat(entry["checked_at"])
+        if now - checked_at < timedelta(seconds=settings.symbol_negative_ttl_seconds):
+            return None
+
+    candidates = [f"{code}{suffix}" for suffix in SUFFIXES]
+    futures = [_pool.submit(_probe, symbol) for symbol in candidates]
+    resolved = None
+    failed = False
+    for symbol, future in zip(candidates, futures):
+        try:
+            if future.result():
+                resolved = symbol
+                break
+        except Exception:
+            failed = True
+
+    if resolved is None and failed:
+        # An upstream error does not prove the code is dead; do not record it
+        return None
+
+    with _lock:
+        table = _load_table()
+        table[code] = {"symbol": resolved, "checked_at": now.isoformat()}
+        _save_table(table)
+    return resolved